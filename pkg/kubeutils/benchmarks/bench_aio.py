@@ -0,0 +1,173 @@
+"""
+Benchmark of monitoring many applications with AsyncKubeutils against the sync KubeutilsV1
+
+Both paths download secrets, find the driver pod and stream its log from a mock API
+with injected latency: the sync one application after another, the async one all at once.
+
+python -m benchmarks.bench_aio --applications 50 --latency-ms 10
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import time
+from unittest.mock import patch
+
+from kubernetes.client import (
+    V1ListMeta,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodList,
+    V1PodStatus,
+    V1Secret,
+)
+
+from kubeutils.aio import AsyncKubeutils
+from kubeutils.kube import KubeutilsV1
+
+SECRETS = {"prefect": {"secret1": ["key1", "key2"]}}
+LOG_LINES = [b"line 1\n", b"line 2\n", b"line 3\n"]
+
+# kept before time.sleep is patched in the sync path
+api_sleep = time.sleep
+
+
+def make_pod() -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(name="driver", resource_version="1"),
+        status=V1PodStatus(phase="Running"),
+    )
+
+
+def make_secret() -> V1Secret:
+    return V1Secret(
+        data={
+            key: base64.b64encode(b"value").decode("utf-8") for key in ("key1", "key2")
+        },
+    )
+
+
+class LogResponse:
+    def stream(self, decode_content=False):
+        yield from LOG_LINES
+
+
+class AsyncLogResponse:
+    def __init__(self) -> None:
+        self.content = self
+
+    async def __aiter__(self):
+        for line in LOG_LINES:
+            await asyncio.sleep(0)
+            yield line
+
+    def release(self) -> None:
+        pass
+
+
+class LatencyApi:
+    "Every call answers after `latency_s`."
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    def read_namespaced_secret(self, name, namespace, **kwargs):
+        api_sleep(self.latency_s)
+        return make_secret()
+
+    def list_namespaced_pod(self, namespace, label_selector=None, **kwargs):
+        api_sleep(self.latency_s)
+        return V1PodList(items=[make_pod()], metadata=V1ListMeta(resource_version="1"))
+
+    def read_namespaced_pod(self, name, namespace, **kwargs):
+        api_sleep(self.latency_s)
+        return make_pod()
+
+    def read_namespaced_pod_log(self, name, namespace, **kwargs):
+        api_sleep(self.latency_s)
+        return LogResponse()
+
+
+class AsyncLatencyApi:
+    "Async twin of LatencyApi."
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    async def read_namespaced_secret(self, name, namespace, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return make_secret()
+
+    async def list_namespaced_pod(self, namespace, label_selector=None, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return V1PodList(items=[make_pod()], metadata=V1ListMeta(resource_version="1"))
+
+    async def read_namespaced_pod(self, name, namespace, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return make_pod()
+
+    async def read_namespaced_pod_log(self, name, namespace, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        return AsyncLogResponse()
+
+
+def run_sync(applications: int, latency_s: float) -> float:
+    kutils = KubeutilsV1(logging.getLogger(__name__))
+    kutils.config = True
+    kutils.api = LatencyApi(latency_s)
+
+    # skip the fixed poll sleep, only api latency is compared
+    with patch("kubeutils.kube.time.sleep"):
+        start = time.perf_counter()
+        for _ in range(applications):
+            kutils.download_secrets(SECRETS, materialize=True)
+            pod_name = kutils.get_pod_name("spark", "app=a")
+            list(
+                kutils.while_running(
+                    func=kutils.stream_pod_log,
+                    pending_timeout_s=1,
+                    pod_name=pod_name,
+                    namespace="spark",
+                ),
+            )
+        return time.perf_counter() - start
+
+
+async def run_async(applications: int, latency_s: float) -> float:
+    kutils = AsyncKubeutils.new(logging.getLogger(__name__), AsyncLatencyApi(latency_s))
+
+    async def monitor() -> list:
+        await kutils.download_secrets(SECRETS)
+        pod_name = await kutils.get_pod_name("spark", "app=a")
+        logs = await kutils.while_running(
+            func=kutils.stream_pod_log,
+            pending_timeout_s=1,
+            pod_name=pod_name,
+            namespace="spark",
+        )
+        return [line async for line in logs]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(monitor() for _ in range(applications)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--applications", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    latency_s = args.latency_ms / 1000
+    sync_s = run_sync(args.applications, latency_s)
+    async_s = asyncio.run(run_async(args.applications, latency_s))
+
+    print(f"{'path':>6} {'seconds':>8} {'apps/s':>8}")
+    print(f"{'sync':>6} {sync_s:>8.3f} {args.applications / sync_s:>8.1f}")
+    print(f"{'async':>6} {async_s:>8.3f} {args.applications / async_s:>8.1f}")
+    print(f"speedup {sync_s / async_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
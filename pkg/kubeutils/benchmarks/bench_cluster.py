@@ -0,0 +1,228 @@
+"""
+Benchmark of KubeutilsV1 over HTTP against a local fake API server
+
+Scenarios: concurrent secret downloads, concurrent monitored applications
+and log streaming throughput. Results are written as JSON to track regressions.
+
+python -m benchmarks.bench_cluster --secrets 64 --applications 16 --log-mb 256 \
+    --latency-ms 5 --output bench_cluster.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import platform
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kubernetes.client import Configuration
+
+from kubeutils.api import KubeApiV1
+from kubeutils.application import SparkApplicationV1
+from kubeutils.kube import SPARK_APPLICATION, KubeutilsV1
+from kubeutils.ratelimit import DEFAULT_RATE_LIMITS, ApiRateLimiter
+from kubeutils.watch import KubeWatch
+
+from benchmarks.fake_apiserver import APP_NAME_LABEL, FakeApiServer, Lifecycle
+
+NAMESPACE = "spark"
+MB = 1024**2
+
+
+def new_kutils(server: FakeApiServer, qps: float) -> KubeutilsV1:
+    "KubeutilsV1 with a pooled KubeApiV1 and a watch, pointed at the fake server."
+    api = KubeApiV1(
+        rate_limiter=ApiRateLimiter(
+            limits={priority: (qps, qps) for priority in DEFAULT_RATE_LIMITS},
+        ),
+        configuration=Configuration(host=server.url),
+    )
+    kutils = KubeutilsV1(logging.getLogger(__name__))
+    kutils.config = True
+    kutils.api = api
+    kutils.watch = KubeWatch()
+    return kutils
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    values = sorted(values)
+    return {
+        "mean": statistics.fmean(values),
+        "p50": values[len(values) // 2],
+        "p95": values[min(int(len(values) * 0.95), len(values) - 1)],
+        "max": values[-1],
+    }
+
+
+def bench_secrets(server: FakeApiServer, args: argparse.Namespace) -> dict:
+    for i in range(args.secrets):
+        server.add_secret(NAMESPACE, f"secret-{i}", {"key": f"value-{i}"})
+    kutils = new_kutils(server, args.qps)
+    secret_dict = {NAMESPACE: {f"secret-{i}": ["key"] for i in range(args.secrets)}}
+
+    start = time.perf_counter()
+    kutils.download_secrets(secret_dict, max_workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "secrets": args.secrets,
+        "workers": args.workers,
+        "seconds": elapsed,
+        "secrets_per_s": args.secrets / elapsed,
+        "pool": kutils.api.pool_stats(),
+        "server": server.stats(),
+    }
+
+
+def monitor(kutils: KubeutilsV1, name: str, timeout_s: int) -> tuple[float, int]:
+    "Submits and follows one application like the template flow, returns seconds and log lines."
+    group, version, plural = SPARK_APPLICATION
+    app = SparkApplicationV1.default()
+    app.patch({"metadata": {"name": name, "namespace": NAMESPACE}})
+
+    start = time.perf_counter()
+    kutils.create_namespaced_custom_object(group, version, NAMESPACE, plural, app)
+    kutils.wait_for_application(name, NAMESPACE, timeout_s, until=("RUNNING",))
+    pod_name = kutils.get_pod_name(
+        NAMESPACE,
+        f"spark-role=driver,{APP_NAME_LABEL}={name}",
+        timeout_s=timeout_s,
+    )
+    lines = kutils.while_running(
+        func=lambda **kwargs: sum(1 for _ in kutils.stream_pod_log(**kwargs)),
+        pending_timeout_s=timeout_s,
+        pod_name=pod_name,
+        namespace=NAMESPACE,
+        timeout_s=timeout_s,
+        decode=False,
+    )
+    kutils.wait_for_application(name, NAMESPACE, timeout_s)
+    return time.perf_counter() - start, lines or 0
+
+
+def bench_applications(server: FakeApiServer, args: argparse.Namespace) -> dict:
+    kutils = new_kutils(server, args.qps)
+    timeout_s = int(server.lifecycle.duration_s * 10) + 60
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.applications) as executor:
+        runs = list(
+            executor.map(
+                lambda i: monitor(kutils, f"app-{i}", timeout_s),
+                range(args.applications),
+            ),
+        )
+    elapsed = time.perf_counter() - start
+
+    server_stats = server.stats()
+    requests = sum(server_stats["requests"].values())
+    return {
+        "applications": args.applications,
+        "seconds": elapsed,
+        "lifecycle_s": server.lifecycle.duration_s,
+        # time the client spent above the emulated phases: detection lag and overhead
+        "overhead_s": percentiles(
+            [seconds - server.lifecycle.duration_s for seconds, _ in runs],
+        ),
+        "log_lines": sum(lines for _, lines in runs),
+        "requests_per_application": requests / args.applications,
+        "pool": kutils.api.pool_stats(),
+        "server": server_stats,
+    }
+
+
+def bench_logs(server: FakeApiServer, args: argparse.Namespace) -> dict:
+    size = int(args.log_mb * MB)
+    server.add_pod(NAMESPACE, "driver", "Succeeded", log_bytes=size)
+    kutils = new_kutils(server, args.qps)
+
+    start = time.perf_counter()
+    lines = sum(1 for _ in kutils.stream_pod_log("driver", NAMESPACE, decode=False))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mb": args.log_mb,
+        "chunk_kb": args.chunk_kb,
+        "rate_limit_mb_per_s": args.log_rate_mbps,
+        "seconds": elapsed,
+        "mb_per_s": args.log_mb / elapsed,
+        "lines": lines,
+        "server": server.stats(),
+    }
+
+
+SCENARIOS = {
+    "secrets": bench_secrets,
+    "applications": bench_applications,
+    "logs": bench_logs,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--secrets", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--applications", type=int, default=16)
+    parser.add_argument("--allocate-s", type=float, default=0.5)
+    parser.add_argument("--pending-s", type=float, default=0.5)
+    parser.add_argument("--run-s", type=float, default=2)
+    parser.add_argument("--app-log-kb", type=int, default=256)
+    parser.add_argument("--log-mb", type=float, default=256)
+    parser.add_argument("--log-rate-mbps", type=float, default=0, help="0 is unlimited")
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=503)
+    # client-side limits are high, so the transport and kubeutils are measured
+    parser.add_argument("--qps", type=float, default=1000)
+    parser.add_argument("--output", default="bench_cluster.json")
+    args = parser.parse_args()
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "args": vars(args),
+    }
+    for scenario in args.scenarios:
+        server = FakeApiServer(
+            latency_s=args.latency_ms / 1000,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            log_rate_bps=args.log_rate_mbps * MB,
+            log_chunk_bytes=args.chunk_kb * 1024,
+            lifecycle=Lifecycle(
+                allocate_s=args.allocate_s,
+                pending_s=args.pending_s,
+                run_s=args.run_s,
+                log_bytes=args.app_log_kb * 1024,
+            ),
+        )
+        with server:
+            results[scenario] = SCENARIOS[scenario](server, args)
+
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+
+    print(f"{'scenario':>13} {'seconds':>8} {'result':>24}")
+    if "secrets" in results:
+        r = results["secrets"]
+        print(
+            f"{'secrets':>13} {r['seconds']:>8.3f} {r['secrets_per_s']:>15.1f} secrets/s"
+        )
+    if "applications" in results:
+        r = results["applications"]
+        overhead = r["overhead_s"]["p95"]
+        print(f"{'applications':>13} {r['seconds']:>8.3f} {overhead:>13.3f} s p95 lag")
+    if "logs" in results:
+        r = results["logs"]
+        print(f"{'logs':>13} {r['seconds']:>8.3f} {r['mb_per_s']:>19.1f} MB/s")
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
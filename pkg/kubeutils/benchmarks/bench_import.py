@@ -0,0 +1,68 @@
+"""
+Benchmark of kubeutils import time with `python -X importtime`
+
+Every run imports the modules in a fresh interpreter, the fastest run is reported
+with the slowest imports under it. The kubernetes client should not be among them.
+
+python -m benchmarks.bench_import --modules kubeutils.kube kubeutils.aio --runs 5
+"""
+
+import argparse
+import subprocess
+import sys
+
+# loaded on first use of the client, see kubeutils._kubernetes
+HEAVY_MODULES = ("kubernetes", "urllib3", "yaml", "http.server")
+
+
+def import_times(module: str) -> dict[str, int]:
+    "Cumulative import microseconds of every module imported by `import module`."
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def best_of(module: str, runs: int) -> dict[str, int]:
+    return min(
+        (import_times(module) for _ in range(runs)),
+        key=lambda times: times[module],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        default=["kubeutils.kube", "kubeutils.api", "kubeutils.application"],
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'module':>24} {'ms':>8} {'heavy modules':>16}")
+    slowest = {}
+    for module in args.modules:
+        times = best_of(module, args.runs)
+        heavy = [name for name in HEAVY_MODULES if name in times]
+        print(f"{module:>24} {times[module] / 1000:>8.1f} {','.join(heavy) or '-':>16}")
+        slowest.update(times)
+
+    print(f"\nslowest imports (ms, cumulative, best of {args.runs} runs)")
+    for name, us in sorted(slowest.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{name:>40} {us / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
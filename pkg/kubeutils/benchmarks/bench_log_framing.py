@@ -0,0 +1,157 @@
+"""
+Benchmark of pod log framing on a synthetic spark driver log
+
+python -m benchmarks.bench_log_framing --size-mb 4096 --chunk-kb 64
+"""
+
+import argparse
+import itertools
+import random
+import time
+from typing import Callable, Iterator
+
+from kubeutils.framing import LineFramer
+from kubeutils.logfilter import LogFilter
+
+LOG_LEVELS = ["WARN", "ERROR"]
+BLOCK_BYTES = 8 * 2**20
+
+
+def synthetic_block(seed: int = 0) -> bytes:
+    "8 MB of log4j lines, mostly INFO, with non-ascii messages."
+    rng = random.Random(seed)
+    levels = ["INFO"] * 97 + ["WARN"] * 2 + ["ERROR"]
+    messages = [
+        "TaskSetManager: Finished task {n}.0 in stage 3.0 (TID {n}) in 123 ms",
+        "BlockManagerInfo: Added broadcast_{n}_piece0 in memory on 10.0.0.1:7079",
+        "DAGScheduler: ResultStage {n} (collect at app.py:{n}) finished",
+        "JdbcUtils: загружено {n} строк из таблицы",
+    ]
+    lines = []
+    size = 0
+    while size < BLOCK_BYTES:
+        line = "24/05/01 10:00:{s:02d} {level} {message}\n".format(
+            s=rng.randrange(60),
+            level=rng.choice(levels),
+            message=rng.choice(messages).format(n=rng.randrange(10000)),
+        ).encode()
+        lines.append(line)
+        size += len(line)
+    return b"".join(lines)
+
+
+def chunks(block: bytes, size_bytes: int, chunk_bytes: int) -> Iterator[bytes]:
+    "Chunks of `block` repeated up to `size_bytes`, like urllib3 stream() returns them."
+    sent = 0
+    offset = 0
+    while sent < size_bytes:
+        chunk = block[offset : offset + chunk_bytes]
+        offset = (offset + chunk_bytes) % len(block)
+        sent += len(chunk)
+        yield chunk
+
+
+def raw_chunks(stream: Iterator[bytes]) -> int:
+    "The old path: decode every chunk and search levels in it."
+    matched = 0
+    for chunk in stream:
+        log = chunk.decode("utf-8", "replace")
+        if any(level in log for level in LOG_LEVELS):
+            matched += 1
+    return matched
+
+
+def frame_only_str(stream: Iterator[bytes]) -> int:
+    "Cost of framing and decoding without filtering."
+    framer = LineFramer()
+    return sum(len(framer.feed(chunk)) for chunk in stream)
+
+
+def frame_only_bytes(stream: Iterator[bytes]) -> int:
+    "Cost of framing without decoding and filtering."
+    framer = LineFramer(decode=False)
+    return sum(len(framer.feed(chunk)) for chunk in stream)
+
+
+def framed_str(stream: Iterator[bytes]) -> int:
+    framer = LineFramer()
+    matched = 0
+    for line in itertools.chain.from_iterable(map(framer.feed, stream)):
+        if any(level in line for level in LOG_LEVELS):
+            matched += 1
+    return matched
+
+
+def framed_bytes(stream: Iterator[bytes]) -> int:
+    "Lines are filtered as bytes and only matched ones are decoded."
+    # bytes.find is cheaper than `in`, which also has to accept ints
+    framer = LineFramer(decode=False)
+    levels = [level.encode() for level in LOG_LEVELS]
+    matched = 0
+    for line in itertools.chain.from_iterable(map(framer.feed, stream)):
+        if any(line.find(level) >= 0 for level in levels):
+            line.decode("utf-8", "replace")
+            matched += 1
+    return matched
+
+
+def log_filter_str(stream: Iterator[bytes]) -> int:
+    "Lines are filtered with one compiled regex of LogFilter."
+    framer = LineFramer()
+    log_filter = LogFilter(levels=LOG_LEVELS)
+    lines = itertools.chain.from_iterable(map(framer.feed, stream))
+    return sum(1 for _ in log_filter.filter(lines))
+
+
+def log_filter_bytes(stream: Iterator[bytes]) -> int:
+    "Only lines passed the filter are decoded."
+    framer = LineFramer(decode=False)
+    log_filter = LogFilter(levels=LOG_LEVELS)
+    lines = itertools.chain.from_iterable(map(framer.feed, stream))
+    matched = 0
+    for line in log_filter.filter(lines):
+        line.decode("utf-8", "replace")
+        matched += 1
+    return matched
+
+
+def run(
+    reader: Callable[[Iterator[bytes]], int],
+    block: bytes,
+    size_bytes: int,
+    chunk_bytes: int,
+) -> tuple[float, int]:
+    start = time.perf_counter()
+    matched = reader(chunks(block, size_bytes, chunk_bytes))
+    return time.perf_counter() - start, matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    args = parser.parse_args()
+
+    block = synthetic_block()
+    size_bytes = args.size_mb * 2**20
+    chunk_bytes = args.chunk_kb * 2**10
+
+    print(f"{'reader':>16} {'seconds':>8} {'MB/s':>8} {'lines':>10}")
+    for reader in (
+        raw_chunks,
+        frame_only_str,
+        frame_only_bytes,
+        framed_str,
+        framed_bytes,
+        log_filter_str,
+        log_filter_bytes,
+    ):
+        elapsed, matched = run(reader, block, size_bytes, chunk_bytes)
+        print(
+            f"{reader.__name__:>16} {elapsed:>8.2f} "
+            f"{args.size_mb / elapsed:>8.0f} {matched:>10}",
+        )
+
+
+if __name__ == "__main__":
+    main()
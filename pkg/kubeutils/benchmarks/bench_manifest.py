@@ -0,0 +1,103 @@
+"""
+Benchmark of SparkApplication manifest build time per submission
+
+python -m benchmarks.bench_manifest --submissions 200
+"""
+
+import argparse
+import importlib.resources as pkg_resources
+import os
+import shutil
+import tempfile
+import time
+
+import yaml
+
+from kubeutils.application import SparkApplicationV1
+from kubeutils.manifest import MANIFEST_CACHE
+
+APP_MANIFEST = {
+    "spec": {
+        "driver": {"cores": 2, "memory": "2g"},
+        "executor": {"instances": 4, "memory": "4g"},
+    },
+}
+ENV_VARS = [
+    {"name": "FLOW_NAME", "value": "bench"},
+    {"name": "NUM_EXECUTORS", "value": "4"},
+]
+ENV_FROM = [{"secretRef": {"name": "s3-secret"}}]
+HADOOP_CONF = {"fs.s3a.path.style.access": "true"}
+
+
+def legacy(based_path: str, app_path: str, i: int) -> dict:
+    "Merge written to disk and parsed again, then one mutation per field."
+    app = SparkApplicationV1()
+    app.merge_and_update_manifest(app_path, based_path)
+    with open(app_path, encoding="utf-8") as fh:
+        app.manifest = yaml.load(fh, Loader=yaml.FullLoader)
+    app.define_script_path(f"s3a://spark/scripts/app-{i}.py")
+    app.define_hadoop_manifest(HADOOP_CONF)
+    app.define_app_name(f"app-{i}")
+    app.define_namespace("spark")
+    app.define_container_env_from(ENV_FROM)
+    app.define_container_env(ENV_VARS)
+    return app()
+
+
+def compiled(based_path: str, app_path: str, i: int) -> dict:
+    "Copy of the cached template with one patch set."
+    env = {"env": ENV_VARS, "envFrom": ENV_FROM}
+    app = SparkApplicationV1.from_template(
+        based_path,
+        app_path,
+        patch={
+            "metadata": {"name": f"app-{i}", "namespace": "spark"},
+            "spec": {
+                "mainApplicationFile": f"s3a://spark/scripts/app-{i}.py",
+                "hadoopConf": HADOOP_CONF,
+                "driver": env,
+                "executor": env,
+            },
+        },
+    )
+    return app()
+
+
+def run(build, submissions: int, dirpath: str) -> float:
+    based_path = os.path.join(dirpath, "based.yaml")
+    app_path = os.path.join(dirpath, "app.yaml")
+    with pkg_resources.path("kubeutils.manifests", "sparkV1.yaml") as fpath:
+        shutil.copy(fpath, based_path)
+
+    elapsed = 0.0
+    for i in range(submissions):
+        # the legacy merge overwrites the application manifest, every run starts from the original
+        with open(app_path, "w", encoding="utf-8") as fh:
+            yaml.dump(APP_MANIFEST, fh)
+        start = time.perf_counter()
+        build(based_path, app_path, i)
+        elapsed += time.perf_counter() - start
+    return elapsed / submissions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submissions", type=int, default=200)
+    args = parser.parse_args()
+
+    dirpath = tempfile.mkdtemp()
+    try:
+        baseline = run(legacy, args.submissions, dirpath)
+        MANIFEST_CACHE.clear()
+        elapsed = run(compiled, args.submissions, dirpath)
+    finally:
+        shutil.rmtree(dirpath)
+
+    print(f"{'build':>10} {'ms/submission':>14} {'speedup':>8}")
+    print(f"{'legacy':>10} {baseline * 1000:>14.3f} {1:>8.1f}")
+    print(f"{'compiled':>10} {elapsed * 1000:>14.3f} {baseline / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark of download_secrets against a mock API with injected latency
+
+python -m benchmarks.bench_secrets --secrets 32 --latency-ms 50
+"""
+
+import argparse
+import base64
+import logging
+import time
+
+from kubernetes.client import V1Secret
+
+from kubeutils.kube import KubeutilsV1
+
+
+class LatencyApi:
+    "read_namespaced_secret answers after `latency_s`."
+
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+
+    def read_namespaced_secret(self, name: str, namespace: str, **kwargs) -> V1Secret:
+        time.sleep(self.latency_s)
+        return V1Secret(data={"key": base64.b64encode(name.encode()).decode("utf-8")})
+
+
+def run(secrets: int, latency_s: float, workers: int) -> float:
+    kutils = KubeutilsV1(logging.getLogger(__name__))
+    kutils.config = True
+    kutils.api = LatencyApi(latency_s)
+    secret_dict = {"prefect": {f"secret-{i}": ["key"] for i in range(secrets)}}
+
+    start = time.perf_counter()
+    kutils.download_secrets(secret_dict, max_workers=workers)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--secrets", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    latency_s = args.latency_ms / 1000
+    baseline = run(args.secrets, latency_s, workers=1)
+    print(f"{'workers':>8} {'seconds':>8} {'speedup':>8}")
+    for workers in (1, 2, 4, 8, 16, 32):
+        elapsed = baseline if workers == 1 else run(args.secrets, latency_s, workers)
+        print(f"{workers:>8} {elapsed:>8.3f} {baseline / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Local fake Kubernetes API server for benchmarks
+
+Serves secrets, pods, pod logs and custom objects over HTTP/1.1 with keep-alive,
+watches of every collection, and a SparkApplication lifecycle emulating the operator.
+Latency and errors can be injected into every request.
+"""
+
+import base64
+import bisect
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+# /api/v1/namespaces/ns/pods, /apis/group/version/namespaces/ns/plural[/name][/log]
+RESOURCE_PATH = re.compile(
+    r"^(/api/v1|/apis/[^/]+/[^/]+)/namespaces/([^/]+)/([^/]+)(?:/([^/]+))?(/log)?$",
+)
+SPARK_APPLICATIONS = "sparkapplications"
+APP_NAME_LABEL = "sparkoperator.k8s.io/app-name"
+LOG_LINE = "24/05/01 10:00:00 INFO TaskSetManager: Finished task {i}.0 in stage 3.0 (TID {i}) in 123 ms\n"
+KINDS = {"secrets": "Secret", "pods": "Pod"}
+
+
+class Lifecycle(NamedTuple):
+    """
+    Phases of a SparkApplication played by the fake operator after it is created.
+
+    Attributes:
+        allocate_s (float): seconds before the driver pod appears, Pending.
+        pending_s (float): seconds the driver pod is Pending.
+        run_s (float): seconds the driver pod is Running.
+        log_bytes (int): size of the driver log.
+    """
+
+    allocate_s: float = 0.5
+    pending_s: float = 0.5
+    run_s: float = 2
+    log_bytes: int = 256 * 1024
+
+    @property
+    def duration_s(self) -> float:
+        return self.allocate_s + self.pending_s + self.run_s
+
+
+class FakeApiServer:
+    """
+    In-memory API server answering the requests of KubeApiV1 and KubeWatch.
+
+    Attributes:
+        latency_s (float): delay before every response.
+        error_rate (float): share of GET requests answered with `error_status`.
+        error_status (int): f.e. 503 (retried by the transport) or 429 (retried by the limiter).
+        log_rate_bps (float): log streaming rate, 0 is unlimited.
+        log_chunk_bytes (int): size of the log chunks.
+        lifecycle (Lifecycle): phases of created SparkApplications.
+
+    Methods:
+        start() -> str: Serve in a thread, returns the url.
+        stop() -> None: Stop serving.
+        add_secret(namespace: str, name: str, data: dict[str, str], labels: dict | None) -> None: Create a secret.
+        add_pod(namespace: str, name: str, phase: str, labels: dict | None, log_bytes: int) -> None: Create a pod.
+        stats() -> dict: Requests by kind, injected errors and bytes sent.
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        log_rate_bps: float = 0,
+        log_chunk_bytes: int = 64 * 1024,
+        lifecycle: Lifecycle = Lifecycle(),
+        seed: int = 0,
+    ) -> None:
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.log_rate_bps = log_rate_bps
+        self.log_chunk_bytes = log_chunk_bytes
+        self.lifecycle = lifecycle
+
+        # collection path -> name -> object
+        self._objects: dict[str, dict[str, dict]] = {}
+        # (resourceVersion, collection, type, object json), kept for the whole run,
+        # so no watch expires
+        self._events: list[tuple[int, str, str, str]] = []
+        self._log_bytes: dict[tuple[str, str], int] = {}
+        self._version = 0
+        self._stopped = False
+        self._changed = threading.Condition()
+        self._random = random.Random(seed)
+        self._requests: dict[str, int] = {}
+        self._errors = 0
+        self._bytes_sent = 0
+        self._stats_lock = threading.Lock()
+        # ~750 KB of log lines repeated in the streamed logs
+        lines = (LOG_LINE.format(i=i) for i in range(8192))
+        self._log_block = "".join(lines).encode("utf-8")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> str:
+        threading.Thread(
+            target=self._server.serve_forever,
+            name="fake-apiserver",
+            daemon=True,
+        ).start()
+        return self.url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        # wakes up watches and followed logs
+        with self._changed:
+            self._stopped = True
+            self._changed.notify_all()
+
+    def __enter__(self) -> "FakeApiServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def add_secret(
+        self,
+        namespace: str,
+        name: str,
+        data: dict[str, str],
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        self._put(
+            f"/api/v1/namespaces/{namespace}/secrets",
+            {
+                "apiVersion": "v1",
+                "kind": "Secret",
+                "metadata": {
+                    "name": name,
+                    "namespace": namespace,
+                    "labels": labels or {},
+                },
+                "data": {
+                    key: base64.b64encode(value.encode("utf-8")).decode("ascii")
+                    for key, value in data.items()
+                },
+            },
+        )
+
+    def add_pod(
+        self,
+        namespace: str,
+        name: str,
+        phase: str = "Running",
+        labels: dict[str, str] | None = None,
+        log_bytes: int = 0,
+    ) -> None:
+        self._log_bytes[(namespace, name)] = log_bytes
+        self._put(
+            f"/api/v1/namespaces/{namespace}/pods",
+            {
+                "apiVersion": "v1",
+                "kind": "Pod",
+                "metadata": {
+                    "name": name,
+                    "namespace": namespace,
+                    "labels": labels or {},
+                },
+                "status": {"phase": phase},
+            },
+        )
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "requests": dict(sorted(self._requests.items())),
+                "injected_errors": self._errors,
+                "bytes_sent": self._bytes_sent,
+            }
+
+    # state
+
+    def _put(self, collection: str, obj: dict) -> dict:
+        "Creates or replaces the object with a new resourceVersion."
+        with self._changed:
+            objects = self._objects.setdefault(collection, {})
+            name = obj["metadata"]["name"]
+            event = "MODIFIED" if name in objects else "ADDED"
+            self._version += 1
+            obj["metadata"]["resourceVersion"] = str(self._version)
+            objects[name] = obj
+            self._events.append((self._version, collection, event, json.dumps(obj)))
+            self._changed.notify_all()
+            return obj
+
+    def _update(self, collection: str, name: str, **fields) -> None:
+        with self._changed:
+            obj = json.loads(json.dumps(self._objects[collection][name]))
+        obj.update(fields)
+        self._put(collection, obj)
+
+    def _get(self, collection: str, name: str) -> dict | None:
+        with self._changed:
+            return self._objects.get(collection, {}).get(name)
+
+    def _list(self, collection: str, query: dict) -> tuple[list[dict], int]:
+        with self._changed:
+            items = [
+                obj
+                for obj in self._objects.get(collection, {}).values()
+                if _matches(obj, query)
+            ]
+            return items, self._version
+
+    def _create_application(self, collection: str, namespace: str, obj: dict) -> dict:
+        obj.setdefault("status", {})
+        self._put(collection, obj)
+        threading.Thread(
+            target=self._operate,
+            args=(collection, namespace, obj["metadata"]["name"]),
+            daemon=True,
+        ).start()
+        return obj
+
+    def _operate(self, collection: str, namespace: str, name: str) -> None:
+        "Plays the lifecycle of the application like the spark operator."
+        pods = f"/api/v1/namespaces/{namespace}/pods"
+        driver = f"{name}-driver"
+        lifecycle = self.lifecycle
+
+        time.sleep(lifecycle.allocate_s)
+        self.add_pod(
+            namespace,
+            driver,
+            "Pending",
+            {"spark-role": "driver", APP_NAME_LABEL: name},
+            log_bytes=lifecycle.log_bytes,
+        )
+        self._update(
+            collection, name, status={"applicationState": {"state": "SUBMITTED"}}
+        )
+
+        time.sleep(lifecycle.pending_s)
+        self._update(pods, driver, status={"phase": "Running"})
+        self._update(
+            collection, name, status={"applicationState": {"state": "RUNNING"}}
+        )
+
+        time.sleep(lifecycle.run_s)
+        self._update(pods, driver, status={"phase": "Succeeded"})
+        self._update(
+            collection, name, status={"applicationState": {"state": "COMPLETED"}}
+        )
+
+    # requests
+
+    def _count(self, kind: str) -> bool:
+        "Counts the request, True if an error should be injected."
+        with self._stats_lock:
+            self._requests[kind] = self._requests.get(kind, 0) + 1
+            inject = kind != "create" and self._random.random() < self.error_rate
+            if inject:
+                self._errors += 1
+            return inject
+
+    def _sent(self, size: int) -> None:
+        with self._stats_lock:
+            self._bytes_sent += size
+
+    def _watch(self, collection: str, query: dict, write) -> None:
+        "Writes events of the collection after resourceVersion until timeoutSeconds."
+        since = int(query.get("resourceVersion") or 0)
+        timeout_s = float(query.get("timeoutSeconds") or 3600)
+        deadline = time.monotonic() + timeout_s
+
+        if not since:
+            # current objects first, like a watch without resourceVersion
+            items, since = self._list(collection, query)
+            for obj in items:
+                write(json.dumps({"type": "ADDED", "object": obj}).encode() + b"\n")
+
+        with self._changed:
+            position = bisect.bisect_right(self._events, since, key=lambda e: e[0])
+        while not self._stopped:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with self._changed:
+                events = self._events[position:]
+                position += len(events)
+                if not events:
+                    self._changed.wait(min(remaining, 1))
+                    continue
+            for _, event_collection, event, obj in events:
+                if event_collection != collection:
+                    continue
+                if not _matches(json.loads(obj), query):
+                    continue
+                write(f'{{"type": "{event}", "object": {obj}}}\n'.encode())
+
+    def _stream_log(self, namespace: str, name: str, query: dict, write) -> None:
+        "Writes the log at `log_rate_bps`, a followed log ends when the pod stops running."
+        size = self._log_bytes.get((namespace, name), 0)
+        block = self._log_block
+        chunk = self.log_chunk_bytes
+        start = time.monotonic()
+        sent = 0
+        for offset in range(0, size, chunk):
+            data = _slice(block, offset, min(chunk, size - offset))
+            write(data)
+            sent += len(data)
+            if self.log_rate_bps:
+                ahead = sent / self.log_rate_bps - (time.monotonic() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+        if not _flag(query, "follow"):
+            return
+        pods = f"/api/v1/namespaces/{namespace}/pods"
+        with self._changed:
+            while not self._stopped:
+                pod = self._objects.get(pods, {}).get(name)
+                if not pod or pod["status"]["phase"] not in ("Pending", "Running"):
+                    return
+                self._changed.wait(1)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, like the Go API server no write waits for an ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _handle(self, method: str) -> None:
+        fake: FakeApiServer = self.server.fake
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        match = RESOURCE_PATH.match(url.path)
+        if not match:
+            self._json(404, _status(404, "NotFound"))
+            return
+        prefix, namespace, plural, name, log = match.groups()
+        collection = f"{prefix}/namespaces/{namespace}/{plural}"
+
+        if method == "POST":
+            kind = "create"
+        elif log:
+            kind = "log"
+        elif _flag(query, "watch"):
+            kind = "watch"
+        else:
+            kind = "get" if name else "list"
+
+        inject = fake._count(kind)
+        if fake.latency_s:
+            time.sleep(fake.latency_s)
+        if inject:
+            self._json(fake.error_status, _status(fake.error_status, "Injected"))
+            return
+
+        if kind == "create":
+            obj = json.loads(body)
+            if fake._get(collection, obj["metadata"]["name"]):
+                self._json(409, _status(409, "AlreadyExists"))
+            elif plural == SPARK_APPLICATIONS:
+                self._json(201, fake._create_application(collection, namespace, obj))
+            else:
+                self._json(201, fake._put(collection, obj))
+        elif kind == "log":
+            if not fake._get(collection, name):
+                self._json(404, _status(404, "NotFound"))
+            else:
+                self._stream(
+                    "text/plain",
+                    lambda write: fake._stream_log(namespace, name, query, write),
+                )
+        elif kind == "watch":
+            self._stream(
+                "application/json",
+                lambda write: fake._watch(collection, query, write),
+            )
+        elif kind == "get":
+            obj = fake._get(collection, name)
+            if obj is None:
+                self._json(404, _status(404, "NotFound"))
+            else:
+                self._json(200, obj)
+        else:
+            items, version = fake._list(collection, query)
+            self._json(
+                200,
+                {
+                    "kind": f"{KINDS.get(plural, 'Object')}List",
+                    "metadata": {"resourceVersion": str(version)},
+                    "items": items,
+                },
+            )
+
+    def _json(self, status: int, obj: dict) -> None:
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.fake._sent(len(data))
+
+    def _stream(self, content_type: str, produce) -> None:
+        "Chunked response written by `produce(write)`."
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+            self.server.fake._sent(len(data))
+
+        try:
+            produce(write)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # the client closed the stream
+            self.close_connection = True
+
+
+def _slice(block: bytes, offset: int, size: int) -> bytes:
+    "`size` bytes of the endlessly repeated block from `offset`."
+    start = offset % len(block)
+    data = block[start : start + size]
+    while len(data) < size:
+        data += block[: size - len(data)]
+    return data
+
+
+def _flag(query: dict, name: str) -> bool:
+    "Boolean query parameter, the python client sends True."
+    return query.get(name, "").lower() in ("true", "1")
+
+
+def _matches(obj: dict, query: dict) -> bool:
+    "Equality label and field selectors, f.e. `spark-role=driver,app=x` and `metadata.name=x`."
+    labels = obj["metadata"].get("labels") or {}
+    for selector in filter(None, query.get("labelSelector", "").split(",")):
+        key, _, value = selector.partition("=")
+        if labels.get(key) != value:
+            return False
+    for selector in filter(None, query.get("fieldSelector", "").split(",")):
+        key, _, value = selector.partition("=")
+        if key == "metadata.name" and obj["metadata"]["name"] != value:
+            return False
+    return True
+
+
+def _status(code: int, reason: str) -> dict:
+    return {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "status": "Failure",
+        "reason": reason,
+        "code": code,
+    }
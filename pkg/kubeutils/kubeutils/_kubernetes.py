@@ -0,0 +1,42 @@
+"""
+Lazy access to the kubernetes client and urllib3 for kubeutils
+
+`import kubernetes` loads every model, API and auth plugin and takes ~0.5 s,
+so kubeutils modules reach it through the attributes of this module (PEP 562)
+and the client is imported on first use, f.e. `_kubernetes.ApiException`.
+"""
+
+import importlib
+
+# attribute -> (module, name in the module or None for the module itself)
+ATTRIBUTES = {
+    "ApiClient": ("kubernetes.client", "ApiClient"),
+    "ApiException": ("kubernetes.client.rest", "ApiException"),
+    "Configuration": ("kubernetes.client", "Configuration"),
+    "CoreV1Api": ("kubernetes.client", "CoreV1Api"),
+    "CustomObjectsApi": ("kubernetes.client", "CustomObjectsApi"),
+    "config": ("kubernetes.config", None),
+    "watch": ("kubernetes.watch", None),
+    "HTTPConnection": ("urllib3.connection", "HTTPConnection"),
+    "HTTPError": ("urllib3.exceptions", "HTTPError"),
+    "Retry": ("urllib3.util.retry", "Retry"),
+}
+
+__all__ = list(ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    try:
+        module_name, attribute = ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = importlib.import_module(module_name)
+    if attribute is not None:
+        value = getattr(value, attribute)
+    # the next lookups don't reach __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return __all__
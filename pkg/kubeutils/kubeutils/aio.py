@@ -0,0 +1,703 @@
+"""
+Asyncio implementations of kubeutils
+
+Requires `kubernetes_asyncio` (`pip install kubeutils[asyncio]`) for AsyncKubeApi and AsyncKubeWatch,
+AsyncKubeutils works with any AsyncApiInterface implementation.
+"""
+
+import asyncio
+import base64
+import inspect
+import os
+import time
+from logging import Logger
+from typing import Any, AsyncGenerator, Callable
+
+from interface import Interface, implements
+
+from kubeutils.application import ApplicationInterface
+from kubeutils.kube import (
+    CLIENT_NOT_INITIALIZED,
+    POD_ALLOCATING_TIMEOUT,
+    POD_DELETED,
+    POD_PENDING_TIMOUT,
+    POD_RUNNING_TIMEOUT,
+)
+from kubeutils.watch import WATCH_EXPIRED
+
+ASYNC_CLIENT_NOT_INSTALLED = "kubernetes_asyncio is not installed. \
+    install kubeutils[asyncio]"
+
+
+def _import_kubernetes_asyncio():
+    try:
+        import kubernetes_asyncio
+        import kubernetes_asyncio.config  # noqa: F401
+        import kubernetes_asyncio.watch  # noqa: F401
+    except ImportError as e:
+        raise ImportError(ASYNC_CLIENT_NOT_INSTALLED) from e
+    return kubernetes_asyncio
+
+
+class AsyncApiInterface(Interface):
+    async def read_namespaced_secret(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        "read secret from k8s"
+
+    async def list_namespaced_secret(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> object:
+        "list k8s namespace secrets"
+
+    async def list_namespaced_pod(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> object:
+        "list k8s namespace pod"
+
+    async def read_namespaced_pod(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        "read k8s namespace pod"
+
+    async def read_namespaced_pod_log(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        "read k8s pod log"
+
+    async def create_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        application: ApplicationInterface,
+        **kwargs,
+    ) -> object:
+        "create k8s object"
+
+    async def list_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        **kwargs,
+    ) -> dict:
+        "list k8s namespace objects"
+
+    async def get_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        name: str,
+        **kwargs,
+    ) -> dict:
+        "get k8s object"
+
+    async def list_pod_for_all_namespaces(
+        self,
+        **kwargs,
+    ) -> object:
+        "get list of all pods"
+
+    async def list_namespaced_resource_quota(
+        self,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        "list k8s namespace resource quotas"
+
+    async def delete_namespaced_pod(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> None:
+        "delete pod"
+
+
+class AsyncWatchInterface(Interface):
+    def stream(
+        self,
+        func: Callable,
+        return_type: str | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[dict, None]:
+        "stream k8s watch events produced by async list function"
+
+
+class AsyncKubeApi(implements(AsyncApiInterface)):
+    """
+    AsyncKubeApi class implementing the AsyncApiInterface interface on top of kubernetes_asyncio.
+
+    The kubernetes config is loaded on the first call (in-cluster, then kube config),
+    all API objects share one ApiClient. Close it with `await api.close()`.
+    """
+
+    def __init__(self):
+        self._api_client = None
+        self._core_v1_api = None
+        self._custom_objects_api = None
+        self._lock = asyncio.Lock()
+
+    async def _client(self):
+        if self._api_client:
+            return self._api_client
+        async with self._lock:
+            if not self._api_client:
+                kubernetes_asyncio = _import_kubernetes_asyncio()
+                try:
+                    kubernetes_asyncio.config.load_incluster_config()
+                except kubernetes_asyncio.config.ConfigException:
+                    await kubernetes_asyncio.config.load_kube_config()
+                self._api_client = kubernetes_asyncio.client.ApiClient()
+                self._core_v1_api = kubernetes_asyncio.client.CoreV1Api(
+                    self._api_client,
+                )
+                self._custom_objects_api = kubernetes_asyncio.client.CustomObjectsApi(
+                    self._api_client,
+                )
+        return self._api_client
+
+    async def core_v1_api(self):
+        await self._client()
+        return self._core_v1_api
+
+    async def custom_objects_api(self):
+        await self._client()
+        return self._custom_objects_api
+
+    async def close(self) -> None:
+        if self._api_client:
+            await self._api_client.close()
+            self._api_client = None
+
+    async def read_namespaced_secret(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.read_namespaced_secret(
+            name=name,
+            namespace=namespace,
+            **kwargs,
+        )
+
+    async def list_namespaced_secret(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.list_namespaced_secret(
+            namespace=namespace,
+            label_selector=label_selector,
+            **kwargs,
+        )
+
+    async def list_namespaced_pod(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.list_namespaced_pod(
+            namespace=namespace,
+            label_selector=label_selector,
+            **kwargs,
+        )
+
+    async def read_namespaced_pod(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.read_namespaced_pod(
+            name=name,
+            namespace=namespace,
+            **kwargs,
+        )
+
+    async def read_namespaced_pod_log(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.read_namespaced_pod_log(
+            name=name,
+            namespace=namespace,
+            **kwargs,
+        )
+
+    async def create_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        application: ApplicationInterface,
+        **kwargs,
+    ) -> object:
+        api = await self.custom_objects_api()
+        return await api.create_namespaced_custom_object(
+            group=group,
+            version=version,
+            namespace=namespace,
+            plural=plural,
+            body=application(),
+            **kwargs,
+        )
+
+    async def list_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        **kwargs,
+    ) -> dict:
+        api = await self.custom_objects_api()
+        return await api.list_namespaced_custom_object(
+            group=group,
+            version=version,
+            namespace=namespace,
+            plural=plural,
+            **kwargs,
+        )
+
+    async def get_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        name: str,
+        **kwargs,
+    ) -> dict:
+        api = await self.custom_objects_api()
+        return await api.get_namespaced_custom_object(
+            group=group,
+            version=version,
+            namespace=namespace,
+            plural=plural,
+            name=name,
+            **kwargs,
+        )
+
+    async def list_pod_for_all_namespaces(
+        self,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.list_pod_for_all_namespaces(**kwargs)
+
+    async def list_namespaced_resource_quota(
+        self,
+        namespace: str,
+        **kwargs,
+    ) -> object:
+        api = await self.core_v1_api()
+        return await api.list_namespaced_resource_quota(
+            namespace=namespace,
+            **kwargs,
+        )
+
+    async def delete_namespaced_pod(
+        self,
+        name: str,
+        namespace: str,
+        **kwargs,
+    ) -> None:
+        api = await self.core_v1_api()
+        await api.delete_namespaced_pod(
+            name=name,
+            namespace=namespace,
+            **kwargs,
+        )
+
+
+class AsyncKubeWatch(implements(AsyncWatchInterface)):
+    "AsyncKubeWatch class implementing the AsyncWatchInterface interface on top of kubernetes_asyncio."
+
+    async def stream(
+        self,
+        func: Callable,
+        return_type: str | None = None,
+        **kwargs,
+    ) -> AsyncGenerator[dict, None]:
+        kubernetes_asyncio = _import_kubernetes_asyncio()
+        async with kubernetes_asyncio.watch.Watch(return_type=return_type) as watch:
+            async for event in watch.stream(func, **kwargs):
+                yield event
+
+
+class AsyncKubeutils:
+    """
+    Asyncio version of KubeutilsV1: hundreds of applications can be monitored from one event loop.
+
+    Attributes:
+        logger (Logger): An instance of the Logger class for logging purposes.
+        api (AsyncApiInterface | None): An instance of the AsyncApiInterface class for interacting with Kubernetes API.
+        watch (AsyncWatchInterface | None): An instance of the AsyncWatchInterface class for watching Kubernetes resources.
+
+    Methods:
+        new(logger: Logger, api: AsyncApiInterface, watch: AsyncWatchInterface | None) -> AsyncKubeutils:
+            Creates a new instance of the AsyncKubeutils class.
+
+        download_secret(secret_name: str, secret_key: str, namespace: str = "prefect") -> str:
+            Downloads a secret from Kubernetes and returns its value.
+
+        download_secrets(secret_dict: dict[str, dict]) -> list:
+            Downloads multiple secrets concurrently, reading every secret once.
+
+        get_pod_name(namespace: str, label_selector: str, timeout_s: int = 10800) -> str:
+            Retrieves the name of a pod based on the namespace and label selector.
+
+        get_pod_phase(pod_name: str, namespace: str) -> str:
+            Retrieves the phase of a pod based on the pod name and namespace.
+
+        stream_pod_log(pod_name: str, namespace: str, timeout_s: int = 3600) -> AsyncGenerator[str, None]:
+            Streams the logs of a specified pod line by line.
+
+        while_running(func: Callable, pending_timeout_s: int | None, **kwargs) -> Any:
+            Executes a given function when the pod is running.
+    """
+
+    def __init__(self, logger: Logger) -> None:
+        self.logger: Logger = logger
+        self.api: AsyncApiInterface | None = None
+        self.watch: AsyncWatchInterface | None = None
+
+    @staticmethod
+    def new(
+        logger: Logger,
+        api: AsyncApiInterface,
+        watch: AsyncWatchInterface | None = None,
+    ) -> "AsyncKubeutils":
+        """
+        Creates a new instance of the AsyncKubeutils class.
+
+        The kubernetes config is loaded by the api (see AsyncKubeApi), so no I/O is done here.
+
+        Args:
+            logger (Logger): An instance of the Logger class for logging purposes.
+            api (AsyncApiInterface): An instance of the AsyncApiInterface class for interacting with Kubernetes API.
+            watch (AsyncWatchInterface | None): If passed, pods are discovered and tracked with watch streams.
+
+        Returns:
+            AsyncKubeutils: A new instance of the AsyncKubeutils class.
+        """
+        kubeclass = AsyncKubeutils(logger=logger)
+        kubeclass.api = api
+        kubeclass.watch = watch
+        return kubeclass
+
+    async def download_secret(
+        self,
+        secret_name: str,
+        secret_key: str,
+        namespace: str = "prefect",
+        to_env: bool = False,
+    ) -> str:
+        """
+        secret_name: str -- имя секрета
+        secret_key: str -- ключ значения секрета
+        namespace: str default "prefect" -- namespace секрета
+        to_env: bool default false -- записывает секрет в переменную окружения
+
+        return: str -- значение секрета
+        """
+        self.logger.info(f"download secret: {secret_name} {secret_key}")
+
+        if not self.api:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
+
+        secret = await self.api.read_namespaced_secret(
+            name=secret_name,
+            namespace=namespace,
+        )
+
+        decoded_secret = base64.b64decode(secret.data[secret_key]).decode("utf-8")
+
+        if to_env:
+            os.environ[secret_key] = decoded_secret
+
+        return decoded_secret
+
+    async def download_secrets(
+        self,
+        secret_dict: dict[str, dict[str, list]],
+        to_env: bool = False,
+    ) -> list:
+        """
+        secret_dict: dict -- словарь вида \n
+            {"namespace": {"secret_name": ["secret_key", ...], ...}, ...}
+        to_env: bool default false -- записывает секрет в переменную окружения
+
+        return [["namespace", "secret_key", "secret_value"],...]
+        """
+        if not secret_dict:
+            return []
+
+        self.logger.info("download secrets...")
+
+        if not self.api:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
+
+        # every secret is read once, all requested keys are decoded from one response
+        space = [
+            (namespace, name, keys)
+            for namespace, secrets in secret_dict.items()
+            for name, keys in secrets.items()
+        ]
+        secrets = await asyncio.gather(
+            *(
+                self.api.read_namespaced_secret(name=name, namespace=namespace)
+                for namespace, name, _ in space
+            ),
+        )
+
+        return_list = []
+        for (namespace, name, keys), secret in zip(space, secrets):
+            self.logger.info(f"download secret: {name} {keys}")
+            for key in keys:
+                value = base64.b64decode(secret.data[key]).decode("utf-8")
+                if to_env:
+                    os.environ[key] = value
+                return_list.append([namespace, key, value])
+        return return_list
+
+    async def get_pod_name(
+        self,
+        namespace: str,
+        label_selector: str,
+        timeout_s: int = 10800,
+        poll_interval_s: float = 5,
+    ) -> str:
+        """
+        namespace: str -- namespace пода
+        label_selector: str
+        timeout_s: int -- количество секунд для аллокации пода. \
+            По истечению поднимает ошибку TimeoutError
+        poll_interval_s: float -- интервал опроса, если watch не передан
+
+        return driver_pod_name: str -- имя пода в кластере
+        """
+        start = time.monotonic()
+        try:
+            driver_pod_name = await asyncio.wait_for(
+                self.__wait_pod_name(namespace, label_selector, poll_interval_s),
+                timeout=timeout_s,
+            )
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(POD_ALLOCATING_TIMEOUT) from e
+
+        self.logger.info(
+            f"pod was allocated ~ {time.monotonic() - start} seconds",
+        )
+        return driver_pod_name
+
+    async def __wait_pod_name(
+        self,
+        namespace: str,
+        label_selector: str,
+        poll_interval_s: float,
+    ) -> str:
+        while True:
+            pods = await self.api.list_namespaced_pod(
+                namespace=namespace,
+                label_selector=label_selector,
+            )
+            if pods.items:
+                return pods.items[0].metadata.name
+
+            if not self.watch:
+                await asyncio.sleep(poll_interval_s)
+                continue
+
+            try:
+                async for event in self.watch.stream(
+                    self.api.list_namespaced_pod,
+                    return_type="V1Pod",
+                    namespace=namespace,
+                    label_selector=label_selector,
+                    resource_version=pods.metadata.resource_version,
+                ):
+                    if event["type"] in ("ADDED", "MODIFIED"):
+                        return event["object"].metadata.name
+            except Exception as e:
+                if getattr(e, "status", None) != WATCH_EXPIRED:
+                    raise
+                self.logger.info("pod watch expired, relisting...")
+
+    async def get_pod_phase(
+        self,
+        pod_name: str,
+        namespace: str,
+    ) -> str:
+        """
+        pod_name: str -- the name of the pod
+        namespace: str -- the namespace of the pod
+
+        return: str -- the phase of the pod
+        """
+        pod = await self.api.read_namespaced_pod(
+            name=pod_name,
+            namespace=namespace,
+        )
+        return pod.status.phase
+
+    async def stream_pod_log(
+        self,
+        pod_name: str,
+        namespace: str,
+        timeout_s: int = 3600,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Async generator that streams the logs of a specified pod line by line.
+
+        Args:
+            pod_name (str): The name of the pod whose logs to stream.
+            namespace (str): The namespace of the pod.
+            timeout_s (int, optional): The maximum time (in seconds) to stream the logs. Defaults to 3600.
+
+        Raises:
+            TimeoutError: If the streaming of logs exceeds the specified timeout_s.
+
+        Yields:
+            str: A line from the pod's logs
+        """
+        start = time.monotonic()
+
+        response = await self.api.read_namespaced_pod_log(
+            name=pod_name,
+            namespace=namespace,
+            _preload_content=False,
+            follow=True,
+        )
+        try:
+            async for line in response.content:
+                if time.monotonic() - start > timeout_s:
+                    raise TimeoutError(POD_RUNNING_TIMEOUT)
+
+                yield line.decode("utf-8")
+        finally:
+            response.release()
+
+    async def while_running(
+        self,
+        func: Callable,
+        pending_timeout_s: int | None,
+        poll_interval_s: float = 30,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Executes a given function when the pod is running.
+
+        Coroutine functions are awaited, other results (f.e. the async generator of
+        `stream_pod_log`) are returned as is.
+
+        Args:
+            func (Callable): The function to execute.
+            pending_timeout_s (int | None): The maximum time to wait for the pod phase to change.
+            poll_interval_s (float): The interval of phase polling, if watch is not passed.
+            **kwargs (Any): Additional keyword arguments to pass to the function.
+                pod_name (str): pod name
+                namespace (str): pod namespace
+
+        Raises:
+            TimeoutError: If the pending timeout is exceeded while waiting for the pod phase to change.
+            ChildProcessError: If the pod phase is 'Failed' or the watched pod was deleted.
+
+        Returns:
+            Any: result of the function, None if the job has done before it was running
+        """
+        self.logger.info(kwargs)
+
+        try:
+            phase = await asyncio.wait_for(
+                self.__wait_phase_change(
+                    kwargs["pod_name"],
+                    kwargs["namespace"],
+                    poll_interval_s,
+                ),
+                timeout=pending_timeout_s,
+            )
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(f"waiting pod timeout {POD_PENDING_TIMOUT}") from e
+
+        if phase == "Running":
+            self.logger.info("pod is running...")
+            result = func(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        elif phase == "Failed":
+            raise ChildProcessError("something went wrong")
+        elif phase is None:
+            raise ChildProcessError(POD_DELETED)
+        self.logger.info("job has done")
+        return None
+
+    async def __wait_phase_change(
+        self,
+        pod_name: str,
+        namespace: str,
+        poll_interval_s: float,
+    ) -> str | None:
+        "Waits until the pod leaves the Pending phase, returns None if the pod was deleted."
+        self.logger.info("pending...")
+        while True:
+            pod = await self.api.read_namespaced_pod(
+                name=pod_name,
+                namespace=namespace,
+            )
+            if pod.status.phase != "Pending":
+                return pod.status.phase
+
+            if not self.watch:
+                await asyncio.sleep(poll_interval_s)
+                continue
+
+            try:
+                async for event in self.watch.stream(
+                    self.api.list_namespaced_pod,
+                    return_type="V1Pod",
+                    namespace=namespace,
+                    field_selector=f"metadata.name={pod_name}",
+                    resource_version=pod.metadata.resource_version,
+                ):
+                    if event["type"] == "DELETED":
+                        return None
+                    if (phase := event["object"].status.phase) != "Pending":
+                        return phase
+            except Exception as e:
+                if getattr(e, "status", None) != WATCH_EXPIRED:
+                    raise
+                self.logger.info("pod watch expired, rereading pod...")
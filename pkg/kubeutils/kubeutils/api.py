@@ -2,15 +2,38 @@
 General api interface for kubeutils
 """
 
+import time
+from typing import TYPE_CHECKING
+
 from interface import Interface, implements
-import urllib3
-import kubernetes
-from kubernetes.client import (
-    CoreV1Api,
-    CustomObjectsApi,
-)
 
+from kubeutils import _kubernetes
 from kubeutils.application import ApplicationInterface
+from kubeutils.client import (
+    ClientConfig,
+    PoolMetrics,
+    build_api_client,
+    received_bytes,
+)
+from kubeutils.metrics import (
+    API_REQUEST_DURATION,
+    API_REQUESTS,
+    API_RESPONSE_BYTES,
+    API_RETRIES,
+    NOOP_EXPORTER,
+    ExporterInterface,
+)
+from kubeutils.ratelimit import (
+    PRIORITY_MUTATION,
+    PRIORITY_READ,
+    PRIORITY_WATCH,
+    ApiRateLimiter,
+)
+
+if TYPE_CHECKING:
+    # the kubernetes client is imported on the first request, see kubeutils._kubernetes
+    import kubernetes
+    import urllib3
 
 
 class ApiInterface(Interface):
@@ -19,15 +42,23 @@ class ApiInterface(Interface):
         name: str,
         namespace: str,
         **kwargs,
-    ) -> kubernetes.client.V1Secret:
+    ) -> "kubernetes.client.V1Secret":
         "read secret from k8s"
 
+    def list_namespaced_secret(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> "kubernetes.client.V1SecretList":
+        "list k8s namespace secrets"
+
     def list_namespaced_pod(
         self,
         namespace: str,
-        label_selector: str,
+        label_selector: str | None = None,
         **kwargs,
-    ) -> kubernetes.client.V1PodList:
+    ) -> "kubernetes.client.V1PodList":
         "list k8s namespace pod"
 
     def read_namespaced_pod(
@@ -35,7 +66,7 @@ class ApiInterface(Interface):
         name: str,
         namespace: str,
         **kwargs,
-    ) -> kubernetes.client.V1Pod:
+    ) -> "kubernetes.client.V1Pod":
         "read k8s namespace pod"
 
     def read_namespaced_pod_log(
@@ -57,12 +88,40 @@ class ApiInterface(Interface):
     ) -> object:
         "create k8s object"
 
+    def list_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        **kwargs,
+    ) -> dict:
+        "list k8s namespace objects"
+
+    def get_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        name: str,
+        **kwargs,
+    ) -> dict:
+        "get k8s object"
+
     def list_pod_for_all_namespaces(
         self,
         **kwargs,
-    ) -> kubernetes.client.V1PodList:
+    ) -> "kubernetes.client.V1PodList":
         "get list of all pods"
 
+    def list_namespaced_resource_quota(
+        self,
+        namespace: str,
+        **kwargs,
+    ) -> "kubernetes.client.V1ResourceQuotaList":
+        "list k8s namespace resource quotas"
+
     def delete_namespaced_pod(
         self,
         name: str,
@@ -76,52 +135,193 @@ class KubeApiV1(implements(ApiInterface)):
     """
     KubeApi class implementing the ApiInterface interface, providing methods to interact with Kubernetes resources using CoreV1Api and CustomObjectsApi.
 
+    Both API objects share one pooled ApiClient built from `client_config`. Every request gets \
+        the connect and read timeouts of the config unless `_request_timeout` is passed.
+
+    Every request waits for the budget of its priority in `rate_limiter`: mutations, \
+        watches and followed logs, or reads. Throttled (429) reads and watches are retried after \
+        Retry-After, mutations are retried by their callers (f.e. KubeutilsV1.submit_many).
+
+    With an exporter every request reports its latency (rate limit waits included), \
+        response bytes, status and retries, see `instrument`.
+
     Attributes:
-        None
+        client_config (ClientConfig): pool size, timeouts, retries and keep-alive settings.
+        pool_metrics (PoolMetrics): connection checkout wait time and reuse ratio.
+        rate_limiter (ApiRateLimiter): limiter shared by all instances of the process by default.
+        exporter (ExporterInterface): request metrics, NOOP_EXPORTER by default.
+        configuration (Configuration | None): cluster host and credentials, \
+            the loaded kube config by default.
 
     Methods:
-        read_namespaced_secret(name: str, namespace: str) -> kubernetes.client.V1Secret: Read a secret from Kubernetes.
-        list_namespaced_pod(namespace: str, label_selector: str) -> kubernetes.client.V1PodList: List pods in a Kubernetes namespace.
-        read_namespaced_pod(name: str, namespace: str) -> kubernetes.client.V1Pod: Read a pod in a Kubernetes namespace.
+        read_namespaced_secret(name: str, namespace: str) -> "kubernetes.client.V1Secret": Read a secret from Kubernetes.
+        list_namespaced_secret(namespace: str, label_selector: str | None) -> "kubernetes.client.V1SecretList": List secrets in a Kubernetes namespace.
+        list_namespaced_pod(namespace: str, label_selector: str) -> "kubernetes.client.V1PodList": List pods in a Kubernetes namespace.
+        read_namespaced_pod(name: str, namespace: str) -> "kubernetes.client.V1Pod": Read a pod in a Kubernetes namespace.
         read_namespaced_pod_log(name: str, namespace: str) -> str: Read logs of a pod in a Kubernetes namespace.
         create_namespaced_custom_object(group: str, version: str, namespace: str, plural: str, application: ApplicationInterface): Create a custom object in a Kubernetes namespace.
+        list_namespaced_custom_object(group: str, version: str, namespace: str, plural: str) -> dict: List custom objects in a Kubernetes namespace, also used to watch them.
+        get_namespaced_custom_object(group: str, version: str, namespace: str, plural: str, name: str) -> dict: Get a custom object in a Kubernetes namespace.
+        list_namespaced_resource_quota(namespace: str) -> "kubernetes.client.V1ResourceQuotaList": List resource quotas of a Kubernetes namespace.
+        pool_stats() -> dict[str, float]: Connection pool metrics.
+        instrument(exporter: ExporterInterface) -> None: Export request metrics.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        client_config: ClientConfig | None = None,
+        rate_limiter: ApiRateLimiter | None = None,
+        exporter: ExporterInterface | None = None,
+        configuration: "kubernetes.client.Configuration | None" = None,
+    ):
+        self.client_config = client_config or ClientConfig()
+        self.configuration = configuration
+        self.pool_metrics = PoolMetrics()
+        self.rate_limiter = rate_limiter or ApiRateLimiter.shared()
+        self.exporter = NOOP_EXPORTER
+        if exporter:
+            self.instrument(exporter)
+        self._api_client = None
         self._core_v1_api = None
         self._custom_objects_api = None
 
+    @property
+    def api_client(self) -> "kubernetes.client.ApiClient":
+        # built on the first request, after the kube config is loaded
+        if not self._api_client:
+            self._api_client = build_api_client(
+                self.client_config,
+                self.pool_metrics,
+                self.configuration,
+            )
+        return self._api_client
+
     @property
     def core_v1_api(self):
         if not self._core_v1_api:
-            self._core_v1_api = CoreV1Api()
+            self._core_v1_api = _kubernetes.CoreV1Api(self.api_client)
         return self._core_v1_api
 
     @property
     def custom_objects_api(self):
         if not self._custom_objects_api:
-            self._custom_objects_api = CustomObjectsApi()
+            self._custom_objects_api = _kubernetes.CustomObjectsApi(self.api_client)
         return self._custom_objects_api
 
+    def pool_stats(self) -> dict[str, float]:
+        "Connection pool metrics, see PoolMetrics."
+        return self.pool_metrics.stats()
+
+    def instrument(self, exporter: ExporterInterface) -> None:
+        """
+        Exports metrics of every request labeled by the method, and the pool and \
+            rate limiter gauges on every export.
+
+        Bodies of watches and followed logs are not counted in response bytes, \
+            their readers count them.
+        """
+        # f.e. a retried LazyKubeutilsV1 setup, the gauges are registered once
+        if exporter is self.exporter:
+            return
+        self.exporter = exporter
+        exporter.collect(self._gauges)
+
+    def _gauges(self) -> dict[str, float]:
+        gauges = {
+            f"kubeutils_pool_{name}": value for name, value in self.pool_stats().items()
+        }
+        gauges["kubeutils_api_throttled"] = self.rate_limiter.throttled
+        return gauges
+
+    def _call(self, priority: str, func, **kwargs):
+        """
+        Sends the request through the rate limiter with the default `_request_timeout`.
+
+        Watches and followed logs get the stream timeout and the watch priority.
+        """
+        stream = bool(
+            kwargs.get("watch")
+            or kwargs.get("follow")
+            or kwargs.get("_preload_content") is False,
+        )
+        if stream and priority == PRIORITY_READ:
+            priority = PRIORITY_WATCH
+        kwargs.setdefault(
+            "_request_timeout",
+            self.client_config.request_timeout(stream=stream),
+        )
+        if self.exporter is NOOP_EXPORTER:
+            return self.rate_limiter.call(priority, func, **kwargs)
+        return self._instrumented_call(priority, func, **kwargs)
+
+    def _instrumented_call(self, priority: str, func, **kwargs):
+        attempts = 0
+
+        def attempt(**kwargs):
+            nonlocal attempts
+            attempts += 1
+            return func(**kwargs)
+
+        labels = {"method": getattr(func, "__name__", "unknown")}
+        status = "ok"
+        received = received_bytes()
+        start = time.perf_counter()
+        try:
+            return self.rate_limiter.call(priority, attempt, **kwargs)
+        except _kubernetes.ApiException as e:
+            status = str(e.status)
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self.exporter.observe(
+                API_REQUEST_DURATION,
+                time.perf_counter() - start,
+                labels,
+            )
+            self.exporter.inc(API_REQUESTS, 1, {**labels, "status": status})
+            self.exporter.inc(API_RESPONSE_BYTES, received_bytes() - received, labels)
+            if attempts > 1:
+                self.exporter.inc(API_RETRIES, attempts - 1, labels)
+
     def read_namespaced_secret(
         self,
         name: str,
         namespace: str,
         **kwargs,
-    ) -> kubernetes.client.V1Secret:
-        return self.core_v1_api.read_namespaced_secret(
+    ) -> "kubernetes.client.V1Secret":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.read_namespaced_secret,
             name=name,
             namespace=namespace,
             **kwargs,
         )
 
+    def list_namespaced_secret(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+        **kwargs,
+    ) -> "kubernetes.client.V1SecretList":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.list_namespaced_secret,
+            namespace=namespace,
+            label_selector=label_selector,
+            **kwargs,
+        )
+
     def list_namespaced_pod(
         self,
         namespace: str,
-        label_selector: str,
+        label_selector: str | None = None,
         **kwargs,
-    ) -> kubernetes.client.V1PodList:
-        return self.core_v1_api.list_namespaced_pod(
+    ) -> "kubernetes.client.V1PodList":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.list_namespaced_pod,
             namespace=namespace,
             label_selector=label_selector,
             **kwargs,
@@ -132,8 +332,10 @@ class KubeApiV1(implements(ApiInterface)):
         name: str,
         namespace: str,
         **kwargs,
-    ) -> kubernetes.client.V1Pod:
-        return self.core_v1_api.read_namespaced_pod(
+    ) -> "kubernetes.client.V1Pod":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.read_namespaced_pod,
             name=name,
             namespace=namespace,
             **kwargs,
@@ -144,8 +346,10 @@ class KubeApiV1(implements(ApiInterface)):
         name: str,
         namespace: str,
         **kwargs,
-    ) -> str | urllib3.HTTPResponse:
-        return self.core_v1_api.read_namespaced_pod_log(
+    ) -> "str | urllib3.HTTPResponse":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.read_namespaced_pod_log,
             name=name,
             namespace=namespace,
             **kwargs,
@@ -160,7 +364,9 @@ class KubeApiV1(implements(ApiInterface)):
         application: ApplicationInterface,
         **kwargs,
     ) -> object:
-        return self.custom_objects_api.create_namespaced_custom_object(
+        return self._call(
+            PRIORITY_MUTATION,
+            self.custom_objects_api.create_namespaced_custom_object,
             group=group,
             version=version,
             namespace=namespace,
@@ -169,11 +375,65 @@ class KubeApiV1(implements(ApiInterface)):
             **kwargs,
         )
 
+    def list_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        **kwargs,
+    ) -> dict:
+        return self._call(
+            PRIORITY_READ,
+            self.custom_objects_api.list_namespaced_custom_object,
+            group=group,
+            version=version,
+            namespace=namespace,
+            plural=plural,
+            **kwargs,
+        )
+
+    def get_namespaced_custom_object(
+        self,
+        group: str,
+        version: str,
+        namespace: str,
+        plural: str,
+        name: str,
+        **kwargs,
+    ) -> dict:
+        return self._call(
+            PRIORITY_READ,
+            self.custom_objects_api.get_namespaced_custom_object,
+            group=group,
+            version=version,
+            namespace=namespace,
+            plural=plural,
+            name=name,
+            **kwargs,
+        )
+
     def list_pod_for_all_namespaces(
         self,
         **kwargs,
-    ) -> kubernetes.client.V1PodList:
-        return self.core_v1_api.list_pod_for_all_namespaces(**kwargs)
+    ) -> "kubernetes.client.V1PodList":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.list_pod_for_all_namespaces,
+            **kwargs,
+        )
+
+    def list_namespaced_resource_quota(
+        self,
+        namespace: str,
+        **kwargs,
+    ) -> "kubernetes.client.V1ResourceQuotaList":
+        return self._call(
+            PRIORITY_READ,
+            self.core_v1_api.list_namespaced_resource_quota,
+            namespace=namespace,
+            **kwargs,
+        )
 
     def delete_namespaced_pod(
         self,
@@ -181,7 +441,9 @@ class KubeApiV1(implements(ApiInterface)):
         namespace: str,
         **kwargs,
     ) -> None:
-        self.core_v1_api.delete_namespaced_pod(
+        self._call(
+            PRIORITY_MUTATION,
+            self.core_v1_api.delete_namespaced_pod,
             name=name,
             namespace=namespace,
             **kwargs,
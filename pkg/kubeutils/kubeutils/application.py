@@ -1,10 +1,21 @@
 import importlib.resources as pkg_resources
-from collections import OrderedDict
-import hiyapyco
+from typing import TYPE_CHECKING
 
-import yaml
 from interface import Interface, implements
 
+from kubeutils.manifest import MANIFEST_CACHE, load_manifest, patch_manifest
+from kubeutils.validation import (
+    Resources,
+    check_quota,
+    normalize_quantities,
+    requested_resources,
+    validate_manifest,
+)
+
+if TYPE_CHECKING:
+    # kubeutils.history imports the api module, which imports this one
+    from kubeutils.history import RunHistory
+
 MANIFEST_NOT_FOUND = "download manifest first use .download_manifest()"
 
 
@@ -52,10 +63,34 @@ class SparkApplicationV1(implements(ApplicationInterface)):
 
     @staticmethod
     def default() -> "SparkApplicationV1":
-        application = SparkApplicationV1()
         with pkg_resources.path("kubeutils.manifests", "sparkV1.yaml") as fpath:
-            application.download_manifest(fpath)
+            return SparkApplicationV1.from_template(fpath)
+
+    @staticmethod
+    def from_template(
+        *manifest_paths: str,
+        patch: dict | None = None,
+        encoding: str = "utf-8",
+    ) -> "SparkApplicationV1":
+        """
+        Создает приложение из скомпилированного шаблона манифеста.
+
+        Файлы парсятся и склеиваются один раз на их содержимое, каждое приложение получает \
+            свою копию шаблона, поэтому приложения можно создавать параллельно.
 
+        Args:
+            *manifest_paths (str): манифесты, следующие перезаписывают предыдущие, \
+                f.e. базовый манифест и манифест приложения.
+            patch (dict | None, optional): изменения манифеста, см. .patch(). Defaults to None.
+            encoding (str, optional): кодировка файлов. Defaults to "utf-8".
+
+        Returns:
+            SparkApplicationV1: приложение с манифестом.
+        """
+        application = SparkApplicationV1()
+        application.manifest = MANIFEST_CACHE.get(*manifest_paths, encoding=encoding)
+        if patch:
+            application.patch(patch)
         return application
 
     def download_manifest(
@@ -66,10 +101,32 @@ class SparkApplicationV1(implements(ApplicationInterface)):
         try:
             # Загрузим манифест SparkApplication
             with open(manifest_path, encoding=encoding) as fh:
-                self.manifest = yaml.load(fh, Loader=yaml.FullLoader)
+                self.manifest = load_manifest(fh.read())
         except IOError as e:
             print(f"error reading file: {e}")
 
+    def merge_manifest(
+        self,
+        app_manifest_path: str,
+        based_manifest_path: str,
+        encoding: str = "utf-8",
+    ) -> dict:
+        """Склеить базовый конфиг и конфиг приложения в памяти и использовать как манифест.
+
+        В случае совпадения аргументов, конфиг приложения перезаписывает аргументы из базового, \
+            списки заменяются целиком. Файлы не изменяются, поэтому метод можно вызывать \
+            параллельно из разных потоков и флоу.
+
+        Returns:
+            dict: склеенный манифест.
+        """
+        self.manifest = MANIFEST_CACHE.get(
+            based_manifest_path,
+            app_manifest_path,
+            encoding=encoding,
+        )
+        return self.manifest
+
     def merge_and_update_manifest(
         self,
         app_manifest_path: str,
@@ -81,23 +138,93 @@ class SparkApplicationV1(implements(ApplicationInterface)):
         В случае совпадения аргументов, конфиг приложения перезаписывает аргументы из базового.
 
         Удобно для мульти Спарк аппликейшн с одинаковым конфигом.
+
+        Оставлен для совместимости: перезаписывает файл манифеста приложения, \
+            используйте .merge_manifest() или .from_template().
         """
-        manifest_updated = hiyapyco.load(
+        manifest_updated = MANIFEST_CACHE.get(
             based_manifest_path,
             app_manifest_path,
-            method=hiyapyco.METHOD_MERGE,
-            interpolate=True,
-            failonmissingfiles=True,
-        )
-        yaml.add_representer(
-            OrderedDict,
-            lambda dumper, data: dumper.represent_mapping(
-                "tag:yaml.org,2002:map",
-                data.items(),
-            ),
+            encoding=encoding,
         )
+        import yaml
+
         with open(app_manifest_path, "w", encoding=encoding) as fh:
-            yaml.dump(manifest_updated, fh)
+            yaml.safe_dump(manifest_updated, fh)
+
+    def validate(
+        self,
+        quota: Resources | None = None,
+    ) -> Resources:
+        """Проверить манифест до отправки в кластер.
+
+        Память драйвера и экзекьюторов приводится к формату спарка (`2Gi` -> `2g`), \
+            манифест проверяется по схеме SparkApplication v1beta2, а ресурсы драйвера \
+            и get_executor_num экзекьюторов сравниваются с квотой неймспейса.
+
+        Args:
+            quota (Resources | None, optional): свободные ресурсы неймспейса, \
+                f.e. KubeutilsV1.get_namespace_quota(). Defaults to None (не проверять).
+
+        Raises:
+            ManifestValidationError: манифест не соответствует схеме.
+            QuotaExceededError: приложение запрашивает больше квоты.
+            ValueError: невалидная строка памяти.
+
+        Returns:
+            Resources: ресурсы, которые запросит приложение.
+        """
+        if not self.manifest:
+            raise TimeoutError(MANIFEST_NOT_FOUND)
+        normalize_quantities(self.manifest)
+        validate_manifest(self.manifest)
+        requested = requested_resources(self.manifest, int(self.get_executor_num))
+        if quota is not None:
+            check_quota(requested, quota)
+        return requested
+
+    def auto_tune(
+        self,
+        history: "RunHistory",
+        deployment: str,
+        script: str,
+        **kwargs,
+    ) -> dict | None:
+        """Применить ресурсы, предложенные по истории запусков скрипта.
+
+        Args:
+            history (RunHistory): история запусков.
+            deployment (str): деплоймент флоу.
+            script (str): имя скрипта приложения.
+            **kwargs: параметры RunHistory.suggest_resources(), f.e. sla_s.
+
+        Returns:
+            dict | None: примененный патч или None, если запусков недостаточно.
+        """
+        if not self.manifest:
+            raise TimeoutError(MANIFEST_NOT_FOUND)
+        patch = history.suggest_resources(
+            deployment,
+            script,
+            manifest=self.manifest,
+            **kwargs,
+        )
+        if patch:
+            self.patch(patch)
+        return patch
+
+    def patch(
+        self,
+        patch: dict,
+    ) -> None:
+        """Применить набор изменений к манифесту одним проходом.
+
+        Словари склеиваются по ключам, остальные значения (в том числе списки) заменяются, \
+            f.e. {"metadata": {"name": "app"}, "spec": {"mainApplicationFile": "s3a://..."}}.
+        """
+        if not self.manifest:
+            raise TimeoutError(MANIFEST_NOT_FOUND)
+        patch_manifest(self.manifest, patch)
 
     def define_container_env(
         self,
@@ -143,6 +270,17 @@ class SparkApplicationV1(implements(ApplicationInterface)):
         # Необходимо задать путь до исполняемого спарком скрипта
         self.manifest["spec"]["mainApplicationFile"] = script_path
 
+    def define_py_files(
+        self,
+        py_files: list[str],
+    ) -> None:
+        if not self.manifest:
+            raise TimeoutError(MANIFEST_NOT_FOUND)
+        # zip/py файлы, которые спарк добавит в PYTHONPATH драйвера и экзекьюторов
+        deps = self.manifest["spec"].get("deps") or {}
+        deps["pyFiles"] = py_files
+        self.manifest["spec"]["deps"] = deps
+
     def define_hadoop_manifest(
         self,
         manifest: dict[str, str],
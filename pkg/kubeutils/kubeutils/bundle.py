@@ -0,0 +1,76 @@
+"""
+Deterministic python dependencies bundles for kubeutils
+"""
+
+import hashlib
+import os
+import zipfile
+
+# zip can't store dates before 1980, every entry gets this one
+BUNDLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+BUNDLE_FILE_MODE = 0o644 << 16
+BUNDLE_EXCLUDE = ("__pycache__",)
+BUNDLE_EXCLUDE_SUFFIXES = (".pyc", ".pyo")
+
+
+def find_packages(source_dir: str) -> list[str]:
+    "Names of top-level python packages (directories with __init__.py) in source_dir."
+    return sorted(
+        name
+        for name in os.listdir(source_dir)
+        if name not in BUNDLE_EXCLUDE
+        and os.path.isfile(os.path.join(source_dir, name, "__init__.py"))
+    )
+
+
+def bundle_files(source_dir: str, packages: list[str]) -> list[str]:
+    "Paths of the package files relative to source_dir in a stable order."
+    files = []
+    for package in packages:
+        for root, dirs, names in os.walk(os.path.join(source_dir, package)):
+            dirs[:] = sorted(d for d in dirs if d not in BUNDLE_EXCLUDE)
+            files.extend(
+                os.path.relpath(os.path.join(root, name), source_dir)
+                for name in names
+                if not name.endswith(BUNDLE_EXCLUDE_SUFFIXES)
+            )
+    return sorted(path.replace(os.sep, "/") for path in files)
+
+
+def build_bundle(
+    source_dir: str,
+    output_path: str,
+    packages: list[str] | None = None,
+) -> str | None:
+    """
+    Builds a zip of python packages for `spec.deps.pyFiles` which is byte-for-byte the same for the same sources.
+
+    Entries are sorted and get fixed dates and permissions, so neither file system order nor mtimes \
+        of a checkout change the archive and its hash.
+
+    Args:
+        source_dir (str): directory with packages, f.e. src/application.
+        output_path (str): path of the zip.
+        packages (list[str] | None, optional): packages to bundle. Defaults to all packages of source_dir.
+
+    Returns:
+        str | None: sha256 of the zip or None if there are no packages (no zip is written then).
+    """
+    packages = find_packages(source_dir) if packages is None else sorted(packages)
+    files = bundle_files(source_dir, packages)
+    if not files:
+        return None
+
+    with zipfile.ZipFile(output_path, "w") as bundle:
+        for path in files:
+            info = zipfile.ZipInfo(path, date_time=BUNDLE_DATE_TIME)
+            info.external_attr = BUNDLE_FILE_MODE
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(os.path.join(source_dir, path), "rb") as fh:
+                bundle.writestr(info, fh.read(), compresslevel=9)
+
+    digest = hashlib.sha256()
+    with open(output_path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,197 @@
+"""
+Secret cache for kubeutils
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from logging import Logger
+from typing import TYPE_CHECKING
+
+from kubeutils.api import ApiInterface
+from kubeutils.watch import WatchInterface
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Secret
+
+
+class SecretCacheEntry:
+    __slots__ = ("secret", "resource_version", "expires_at", "stale")
+
+    def __init__(self, secret: "V1Secret", expires_at: float) -> None:
+        self.secret = secret
+        self.resource_version = (
+            secret.metadata.resource_version if secret.metadata else None
+        )
+        self.expires_at = expires_at
+        self.stale = False
+
+
+class SecretCache:
+    """
+    In-memory TTL and LRU cache of secrets keyed by namespace/name.
+
+    Secrets are kept in process memory only and are never written to disk.
+
+    If a watch is passed, every cached secret is watched by name (`metadata.name` field selector),
+    so only the cached secrets are received, and entries are marked stale as soon as
+    the resourceVersion of the secret changes. An expired entry whose version didn't change
+    is revalidated for one more TTL without downloading the payload. The watch of an evicted
+    or invalidated secret stops on its next event or watch timeout. Without a watch an expired
+    entry is a miss.
+
+    Attributes:
+        ttl_s (float): time to live of an entry.
+        max_entries (int): the least recently used entries are evicted above this size.
+        hits (int): number of secrets served from the cache.
+        misses (int): number of secrets that had to be downloaded.
+        revalidations (int): number of expired entries revalidated by the watch.
+        evictions (int): number of LRU evictions.
+
+    Methods:
+        get(namespace: str, name: str) -> V1Secret | None: Get secret from the cache.
+        put(namespace: str, name: str, secret: V1Secret) -> None: Put secret to the cache.
+        invalidate(namespace: str | None, name: str | None) -> None: Drop entries.
+        stats() -> dict[str, int]: Get counters.
+        close() -> None: Stop watches and clear the cache.
+    """
+
+    def __init__(
+        self,
+        api: ApiInterface | None = None,
+        watch: WatchInterface | None = None,
+        ttl_s: float = 300,
+        max_entries: int = 128,
+        logger: Logger | None = None,
+        watch_timeout_s: int = 60,
+    ) -> None:
+        self.api = api
+        self.watch = watch
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.logger = logger
+        self.watch_timeout_s = watch_timeout_s
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[tuple[str, str], SecretCacheEntry] = OrderedDict()
+        self._watched: dict[tuple[str, str], threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def get(self, namespace: str, name: str) -> "V1Secret | None":
+        key = (namespace, name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stale:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            if now >= entry.expires_at:
+                if key not in self._watched:
+                    del self._entries[key]
+                    self.misses += 1
+                    return None
+                # the watch saw no new resourceVersion of the secret
+                entry.expires_at = now + self.ttl_s
+                self.revalidations += 1
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.secret
+
+    def put(self, namespace: str, name: str, secret: "V1Secret") -> None:
+        key = (namespace, name)
+        with self._lock:
+            self._entries[key] = SecretCacheEntry(
+                secret,
+                time.monotonic() + self.ttl_s,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            if self.watch and self.api and key not in self._watched:
+                self._start_watch(key, self._entries[key].resource_version)
+
+    def invalidate(
+        self,
+        namespace: str | None = None,
+        name: str | None = None,
+    ) -> None:
+        "Drops the secret, all secrets of the namespace or the whole cache."
+        with self._lock:
+            for key in list(self._entries):
+                if namespace in (None, key[0]) and name in (None, key[1]):
+                    del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+            }
+
+    def close(self) -> None:
+        "Stops namespace watches (they exit on the next event or watch timeout) and clears the cache."
+        self._closed.set()
+        self.invalidate()
+
+    def _start_watch(self, key: tuple[str, str], resource_version: str | None) -> None:
+        thread = threading.Thread(
+            target=self._watch_secret,
+            args=(key, resource_version),
+            name=f"secret-cache-{key[0]}-{key[1]}",
+            daemon=True,
+        )
+        self._watched[key] = thread
+        thread.start()
+
+    def _is_cached(self, key: tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _watch_secret(self, key: tuple[str, str], resource_version: str | None) -> None:
+        namespace, name = key
+        try:
+            while not self._closed.is_set() and self._is_cached(key):
+                for event in self.watch.stream(
+                    self.api.list_namespaced_secret,
+                    return_type="V1Secret",
+                    namespace=namespace,
+                    field_selector=f"metadata.name={name}",
+                    resource_version=resource_version,
+                    timeout_seconds=self.watch_timeout_s,
+                ):
+                    if self._closed.is_set() or not self._is_cached(key):
+                        return
+                    secret = event["object"]
+                    resource_version = secret.metadata.resource_version
+                    self._on_event(namespace, secret.metadata.name, resource_version)
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            if self.logger:
+                self.logger.info(f"secret cache watch error: {e}")
+        finally:
+            # without the watch the version can't be revalidated, so the secret
+            # is downloaded again and the watch is restarted
+            with self._lock:
+                self._watched.pop(key, None)
+                entry = self._entries.get(key)
+                if entry:
+                    entry.stale = True
+
+    def _on_event(self, namespace: str, name: str, resource_version: str) -> None:
+        with self._lock:
+            entry = self._entries.get((namespace, name))
+            if entry and entry.resource_version != resource_version:
+                entry.stale = True
@@ -0,0 +1,223 @@
+"""
+Pooled HTTP client for kubeutils
+"""
+
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from kubeutils import _kubernetes
+
+if TYPE_CHECKING:
+    import kubernetes
+    import urllib3
+
+# log readers hold a connection each, so the pool is larger than the default 4
+DEFAULT_POOL_MAXSIZE = 32
+# retried by urllib3 on the connection level, 429 is left to the callers (f.e. submit_many)
+TRANSPORT_RETRY_STATUSES = (502, 503, 504)
+
+# bytes of preloaded responses received by each thread, read around a request by KubeApiV1
+_received = threading.local()
+
+
+class ClientConfig(NamedTuple):
+    """
+    HTTP client settings of KubeApiV1.
+
+    Attributes:
+        pool_maxsize (int): connections kept per API server, \
+            should cover the concurrency (submit workers, log readers, watches).
+        pool_block (bool): wait for a free connection instead of opening a throwaway one \
+            when all pooled connections are busy.
+        connect_timeout_s (float): TCP/TLS connect timeout of every request.
+        read_timeout_s (float | None): read timeout of requests, None waits forever.
+        stream_read_timeout_s (float | None): read timeout of watches and followed logs, \
+            they can be silent for long, so there is none by default.
+        retries (int): retries of connection errors and 502/503/504 of idempotent requests.
+        retry_backoff_s (float): backoff factor of the retries.
+        keep_alive_idle_s (int | None): idle seconds before TCP keep-alive probes, \
+            None disables keep-alive probes.
+        keep_alive_interval_s (int): seconds between keep-alive probes.
+        keep_alive_count (int): failed probes before the connection is dropped.
+    """
+
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    pool_block: bool = False
+    connect_timeout_s: float = 5
+    read_timeout_s: float | None = 60
+    stream_read_timeout_s: float | None = None
+    retries: int = 3
+    retry_backoff_s: float = 0.5
+    keep_alive_idle_s: int | None = 30
+    keep_alive_interval_s: int = 10
+    keep_alive_count: int = 3
+
+    def request_timeout(self, stream: bool = False) -> tuple[float, float | None]:
+        "`_request_timeout` of a request, (connect, read)."
+        read = self.stream_read_timeout_s if stream else self.read_timeout_s
+        return (self.connect_timeout_s, read)
+
+    def retry(self) -> "urllib3.util.Retry":
+        return _kubernetes.Retry(
+            total=self.retries,
+            backoff_factor=self.retry_backoff_s,
+            status_forcelist=TRANSPORT_RETRY_STATUSES,
+            # the last response is returned and raised as ApiException by the client
+            raise_on_status=False,
+        )
+
+    def socket_options(self) -> list[tuple[int, int, int]]:
+        options = list(_kubernetes.HTTPConnection.default_socket_options)
+        if self.keep_alive_idle_s is None:
+            return options
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # linux names, other platforms keep the system defaults
+        for name, value in (
+            ("TCP_KEEPIDLE", self.keep_alive_idle_s),
+            ("TCP_KEEPINTVL", self.keep_alive_interval_s),
+            ("TCP_KEEPCNT", self.keep_alive_count),
+        ):
+            if hasattr(socket, name):
+                options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+        return options
+
+
+class PoolMetrics:
+    """
+    Connection pool counters of one ApiClient.
+
+    Attributes:
+        checkouts (int): connections taken from the pool, one per request.
+        new_connections (int): connections opened, the rest of checkouts reused one.
+        checkout_wait_s (float): total seconds waited for a connection.
+        checkout_wait_max_s (float): the longest wait for a connection.
+
+    Methods:
+        reuse_ratio -> float: Share of requests sent over a reused connection.
+        stats() -> dict[str, float]: All counters.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.new_connections = 0
+        self.checkout_wait_s = 0.0
+        self.checkout_wait_max_s = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def reuse_ratio(self) -> float:
+        with self._lock:
+            if not self.checkouts:
+                return 0.0
+            return max(self.checkouts - self.new_connections, 0) / self.checkouts
+
+    def observe_checkout(self, wait_s: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_s += wait_s
+            self.checkout_wait_max_s = max(self.checkout_wait_max_s, wait_s)
+
+    def observe_new_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def stats(self) -> dict[str, float]:
+        reuse_ratio = self.reuse_ratio
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "new_connections": self.new_connections,
+                "checkout_wait_s": self.checkout_wait_s,
+                "checkout_wait_max_s": self.checkout_wait_max_s,
+                "reuse_ratio": reuse_ratio,
+            }
+
+
+def received_bytes() -> int:
+    "Bytes of preloaded response bodies received by the current thread so far."
+    return getattr(_received, "bytes", 0)
+
+
+def _metered_pool_class(pool_class: type, metrics: PoolMetrics) -> type:
+    "Subclass of an urllib3 connection pool reporting to `metrics`."
+
+    def _get_conn(self, timeout: float | None = None) -> Any:
+        start = time.perf_counter()
+        try:
+            return pool_class._get_conn(self, timeout)
+        finally:
+            metrics.observe_checkout(time.perf_counter() - start)
+
+    def _new_conn(self) -> Any:
+        metrics.observe_new_connection()
+        return pool_class._new_conn(self)
+
+    return type(
+        f"Metered{pool_class.__name__}",
+        (pool_class,),
+        {
+            "_get_conn": _get_conn,
+            "_new_conn": _new_conn,
+        },
+    )
+
+
+def _metered_request(request: Callable) -> Callable:
+    """
+    Wraps RESTClientObject.request of the kubernetes client to count bytes of preloaded bodies.
+
+    Counted above urllib3, so both urllib3 1.26 and 2.x are supported. Streamed bodies \
+        (logs, watches) are counted by their readers.
+    """
+
+    def metered(*args, _preload_content: bool = True, **kwargs) -> Any:
+        try:
+            response = request(*args, _preload_content=_preload_content, **kwargs)
+        except _kubernetes.ApiException as e:
+            # the body of error responses is decoded by the client
+            if isinstance(e.body, str):
+                _received.bytes = received_bytes() + len(e.body.encode("utf-8"))
+            raise
+        if _preload_content:
+            _received.bytes = received_bytes() + len(
+                response.urllib3_response.data or b""
+            )
+        return response
+
+    return metered
+
+
+def build_api_client(
+    client_config: ClientConfig,
+    metrics: PoolMetrics,
+    configuration: "kubernetes.client.Configuration | None" = None,
+) -> "kubernetes.client.ApiClient":
+    """
+    Builds one pooled ApiClient to share between API objects.
+
+    Args:
+        client_config (ClientConfig): pool, retries and keep-alive settings.
+        metrics (PoolMetrics): counters updated by the pool.
+        configuration (Configuration | None, optional): cluster configuration. \
+            Defaults to a copy of the loaded kube config.
+
+    Returns:
+        ApiClient: client with a tuned urllib3 pool manager.
+    """
+    configuration = configuration or _kubernetes.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = client_config.pool_maxsize
+    configuration.retries = client_config.retry()
+
+    api_client = _kubernetes.ApiClient(configuration)
+    rest_client = api_client.rest_client
+    rest_client.request = _metered_request(rest_client.request)
+    pool_manager = rest_client.pool_manager
+    pool_manager.connection_pool_kw["block"] = client_config.pool_block
+    pool_manager.connection_pool_kw["socket_options"] = client_config.socket_options()
+    pool_manager.pool_classes_by_scheme = {
+        scheme: _metered_pool_class(pool_class, metrics)
+        for scheme, pool_class in pool_manager.pool_classes_by_scheme.items()
+    }
+    return api_client
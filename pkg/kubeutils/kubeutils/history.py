@@ -0,0 +1,267 @@
+"""
+Spark application run history and resource right-sizing for kubeutils
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from logging import Logger
+from typing import NamedTuple
+
+from kubeutils.api import ApiInterface
+from kubeutils.validation import format_memory, heap_memory, parse_quantity
+
+# metrics-server API of pod usage
+POD_METRICS = ("metrics.k8s.io", "v1beta1", "pods")
+SPARK_ROLE_LABEL = "spark-role"
+
+# suggested memory is rounded up to this step
+MEMORY_STEP = 128 * 1024**2
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    deployment TEXT NOT NULL,
+    script TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    wall_time_s REAL NOT NULL,
+    succeeded INTEGER NOT NULL,
+    peak_executors INTEGER NOT NULL,
+    driver_peak_memory INTEGER NOT NULL,
+    executor_peak_memory INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_script ON runs (deployment, script, started_at);
+"""
+
+
+class RunRecord(NamedTuple):
+    """
+    Resource usage of one application run.
+
+    Attributes:
+        deployment (str): deployment of the flow, f.e. DEPLOYMENT_NAME.
+        script (str): application script name.
+        started_at (float): unix time of the start.
+        wall_time_s (float): seconds from the start to the final state.
+        succeeded (bool): the application has completed.
+        peak_executors (int): the largest number of executors running at once.
+        driver_peak_memory (int): the largest driver pod memory usage, bytes.
+        executor_peak_memory (int): the largest memory usage of one executor pod, bytes.
+    """
+
+    deployment: str
+    script: str
+    started_at: float
+    wall_time_s: float
+    succeeded: bool
+    peak_executors: int
+    driver_peak_memory: int
+    executor_peak_memory: int
+
+
+class ResourceSampler:
+    """
+    Thread sampling metrics-server usage of the application pods every `interval_s`.
+
+    Only peaks are kept, so memory doesn't grow with the run time. Pods are told apart \
+        by the spark-role label set by spark on driver and executor pods.
+
+    Attributes:
+        namespace (str): namespace of the pods.
+        label_selector (str): selector of the application pods.
+        interval_s (float): seconds between samples.
+        started_at (float): unix time of the start.
+        peak_executors (int): the largest number of executors seen at once.
+        driver_peak_memory (int): bytes.
+        executor_peak_memory (int): bytes.
+    """
+
+    def __init__(
+        self,
+        api: ApiInterface,
+        logger: Logger,
+        namespace: str,
+        label_selector: str,
+        interval_s: float = 15,
+    ) -> None:
+        self.api = api
+        self.logger = logger
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.interval_s = interval_s
+        self.started_at = time.time()
+        self.peak_executors = 0
+        self.driver_peak_memory = 0
+        self.executor_peak_memory = 0
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"resource-sampler-{label_selector}",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def sample(self) -> None:
+        "Takes one sample of the pod metrics."
+        group, version, plural = POD_METRICS
+        metrics = self.api.list_namespaced_custom_object(
+            group=group,
+            version=version,
+            namespace=self.namespace,
+            plural=plural,
+            label_selector=self.label_selector,
+        )
+        executors = 0
+        for pod in metrics.get("items", []):
+            memory = sum(
+                parse_quantity(container["usage"]["memory"])
+                for container in pod.get("containers", [])
+            )
+            role = (pod["metadata"].get("labels") or {}).get(SPARK_ROLE_LABEL)
+            if role == "driver":
+                self.driver_peak_memory = max(self.driver_peak_memory, int(memory))
+            elif role == "executor":
+                executors += 1
+                self.executor_peak_memory = max(self.executor_peak_memory, int(memory))
+        self.peak_executors = max(self.peak_executors, executors)
+
+    def record(self, deployment: str, script: str, succeeded: bool) -> RunRecord:
+        "Usage of the run sampled so far."
+        return RunRecord(
+            deployment=deployment,
+            script=script,
+            started_at=self.started_at,
+            wall_time_s=time.time() - self.started_at,
+            succeeded=succeeded,
+            peak_executors=self.peak_executors,
+            driver_peak_memory=self.driver_peak_memory,
+            executor_peak_memory=self.executor_peak_memory,
+        )
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sample()
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                # f.e. metrics-server isn't installed, the run itself is not affected
+                self.logger.info(f"pod metrics sample failed: {e!r}")
+            self._stopped.wait(self.interval_s)
+
+
+class RunHistory:
+    """
+    SQLite history of application runs keyed by deployment and script.
+
+    Attributes:
+        path (str): the database file, ":memory:" keeps the history in the process.
+
+    Methods:
+        record(run: RunRecord) -> None: Store a run.
+        runs(deployment: str, script: str, limit: int) -> list[RunRecord]: The latest runs.
+        suggest_resources(deployment: str, script: str, ...) -> dict | None: Manifest overrides.
+        close() -> None: Close the database.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.executescript(HISTORY_SCHEMA)
+
+    def record(self, run: RunRecord) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*run[:4], int(run.succeeded), *run[5:]),
+            )
+
+    def runs(self, deployment: str, script: str, limit: int = 10) -> list[RunRecord]:
+        "The latest runs of the script, the newest first."
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM runs WHERE deployment = ? AND script = ? "
+                "ORDER BY started_at DESC LIMIT ?",
+                (deployment, script, limit),
+            ).fetchall()
+        return [RunRecord(*row[:4], bool(row[4]), *row[5:]) for row in rows]
+
+    def suggest_resources(
+        self,
+        deployment: str,
+        script: str,
+        manifest: dict | None = None,
+        runs: int = 10,
+        min_runs: int = 3,
+        headroom: float = 1.25,
+        sla_s: float | None = None,
+    ) -> dict | None:
+        """
+        Proposes manifest overrides from the peak usage of the latest successful runs.
+
+        Memory of the driver and executors is the heap whose pod (heap plus the spark memory \
+            overhead of the manifest) requests the largest peak times `headroom`, rounded up \
+            to 128m, so it goes down for over-provisioned applications and up for ones close \
+            to their limit. Executors are the largest number running at once, they are not \
+            reduced if any run exceeded `sla_s`, so fewer executors never slow a job past its SLA.
+
+        Args:
+            deployment (str): deployment of the flow.
+            script (str): application script name.
+            manifest (dict | None, optional): the manifest to tune, its memory overhead \
+                rules are used and with dynamic allocation maxExecutors is suggested instead \
+                of executor instances. Defaults to None (JVM application, default overhead).
+            runs (int, optional): latest runs taken into account. Defaults to 10.
+            min_runs (int, optional): successful runs needed for a suggestion. Defaults to 3.
+            headroom (float, optional): multiplier of the peaks. Defaults to 1.25.
+            sla_s (float | None, optional): expected wall time. Defaults to None (no SLA).
+
+        Returns:
+            dict | None: patch of the manifest (see SparkApplicationV1.patch) \
+                or None if there are not enough runs.
+        """
+        history = [
+            run for run in self.runs(deployment, script, limit=runs) if run.succeeded
+        ]
+        if len(history) < min_runs:
+            return None
+
+        spec = {}
+        for role, peak in (
+            ("driver", max(run.driver_peak_memory for run in history)),
+            ("executor", max(run.executor_peak_memory for run in history)),
+        ):
+            # no metrics were sampled
+            if peak:
+                # the peak is of the whole container, spark adds the overhead to the heap
+                memory = heap_memory(manifest or {}, role, peak * headroom)
+                memory = max(math.ceil(memory / MEMORY_STEP), 1) * MEMORY_STEP
+                spec[role] = {"memory": format_memory(memory)}
+
+        executors = max(run.peak_executors for run in history)
+        sla_missed = sla_s is not None and any(
+            run.wall_time_s > sla_s for run in history
+        )
+        if executors and not sla_missed:
+            spark_conf = ((manifest or {}).get("spec") or {}).get("sparkConf") or {}
+            if "spark.dynamicAllocation.maxExecutors" in spark_conf:
+                spec["sparkConf"] = {
+                    "spark.dynamicAllocation.maxExecutors": str(executors)
+                }
+            else:
+                spec.setdefault("executor", {})["instances"] = executors
+
+        return {"spec": spec} if spec else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,307 @@
+"""
+Shared pod informer for kubeutils
+"""
+
+import threading
+import time
+from collections import defaultdict
+from logging import Logger
+from typing import TYPE_CHECKING, Any, Callable, Generator
+
+from kubeutils import _kubernetes
+from kubeutils.api import ApiInterface
+from kubeutils.watch import WATCH_EXPIRED, WatchInterface
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Pod
+
+INFORMER_STOPPED = "informer is stopped"
+
+
+def parse_label_selector(label_selector: str | None) -> tuple[dict, list]:
+    """
+    Split label selector to equality terms and all other terms.
+
+    Args:
+        label_selector (str | None): f.e. "spark-role=driver,sparkoperator.k8s.io/app-name"
+
+    Returns:
+        tuple[dict, list]: {"spark-role": "driver"}, ["sparkoperator.k8s.io/app-name"]
+    """
+    equals, others = {}, []
+    for term in (label_selector or "").split(","):
+        term = term.strip()
+        if not term:
+            continue
+        if "!=" not in term and "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            equals[key.strip()] = value.strip()
+        else:
+            others.append(term)
+    return equals, others
+
+
+def match_labels(labels: dict | None, terms: list) -> bool:
+    "Check existence (`key`, `!key`) and inequality (`key!=value`) terms."
+    labels = labels or {}
+    for term in terms:
+        if "!=" in term:
+            key, value = (part.strip() for part in term.split("!=", 1))
+            if labels.get(key) == value:
+                return False
+        elif term.startswith("!"):
+            if term[1:].strip() in labels:
+                return False
+        elif term not in labels:
+            return False
+    return True
+
+
+class PodInformer:
+    """
+    In-memory pod cache filled by one list+watch per namespace and label selector.
+
+    Informers are shared between all users in the process: `acquire` returns the running
+    informer for the namespace and label selector (or starts one) and `release` stops it
+    when the last user is gone.
+
+    Attributes:
+        namespace (str): namespace of cached pods.
+        label_selector (str | None): server-side label selector of cached pods.
+        synced (bool): True after the first list was loaded into the cache.
+
+    Methods:
+        acquire(api, watch, namespace, label_selector, logger) -> PodInformer: Get shared informer.
+        release() -> None: Release shared informer.
+        get(name: str) -> V1Pod | None: Get pod by name.
+        select(label_selector: str | None) -> list[V1Pod]: Get pods by label selector.
+        wait_for(predicate: Callable, timeout_s: float | None) -> Any: Wait for cache state.
+        phases(name: str, timeout_s: float | None) -> Generator: Stream phase changes of the pod.
+    """
+
+    _registry: dict[tuple[str, str | None], "PodInformer"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api: ApiInterface,
+        watch: WatchInterface,
+        namespace: str,
+        label_selector: str | None = None,
+        logger: Logger | None = None,
+        watch_timeout_s: int = 60,
+        retry_s: float = 5,
+    ) -> None:
+        self.api = api
+        self.watch = watch
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.logger = logger
+        self.watch_timeout_s = watch_timeout_s
+        self.retry_s = retry_s
+        self.synced = False
+
+        self._pods: dict[str, "V1Pod"] = {}
+        self._labels: dict[tuple[str, str], set[str]] = defaultdict(set)
+        self._cond = threading.Condition(threading.RLock())
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refs = 0
+
+    @classmethod
+    def acquire(
+        cls,
+        api: ApiInterface,
+        watch: WatchInterface,
+        namespace: str,
+        label_selector: str | None = None,
+        logger: Logger | None = None,
+    ) -> "PodInformer":
+        """
+        Returns the running informer for namespace and label selector or starts a new one.
+
+        Every call must be paired with `release`.
+        """
+        key = (namespace, label_selector)
+        with cls._registry_lock:
+            informer = cls._registry.get(key)
+            if informer is None:
+                informer = cls(api, watch, namespace, label_selector, logger)
+                cls._registry[key] = informer
+                informer.start()
+            informer._refs += 1
+        return informer
+
+    def release(self) -> None:
+        "Decrements users of the informer and stops it when the last one is gone."
+        with self._registry_lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            self._registry.pop((self.namespace, self.label_selector), None)
+        self.stop()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"pod-informer-{self.namespace}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        "Stops the informer, the watch thread exits on the next event or watch timeout."
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _log(self, message: str) -> None:
+        if self.logger:
+            self.logger.info(message)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                pods = self.api.list_namespaced_pod(
+                    namespace=self.namespace,
+                    label_selector=self.label_selector,
+                )
+                self._replace(pods.items)
+                for event in self.watch.stream(
+                    self.api.list_namespaced_pod,
+                    return_type="V1Pod",
+                    namespace=self.namespace,
+                    label_selector=self.label_selector,
+                    resource_version=pods.metadata.resource_version,
+                    timeout_seconds=self.watch_timeout_s,
+                ):
+                    if self._stop.is_set():
+                        break
+                    self._apply(event["type"], event["object"])
+            except _kubernetes.ApiException as e:
+                if e.status != WATCH_EXPIRED:
+                    self._log(f"pod informer error: {e}")
+                    self._stop.wait(self.retry_s)
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                self._log(f"pod informer error: {e}")
+                self._stop.wait(self.retry_s)
+
+    def _replace(self, pods: list["V1Pod"]) -> None:
+        with self._cond:
+            self._pods = {}
+            self._labels = defaultdict(set)
+            for pod in pods:
+                self._put(pod)
+            self.synced = True
+            self._cond.notify_all()
+
+    def _apply(self, event_type: str, pod: "V1Pod") -> None:
+        with self._cond:
+            self._delete(pod.metadata.name)
+            if event_type != "DELETED":
+                self._put(pod)
+            self._cond.notify_all()
+
+    def _put(self, pod: "V1Pod") -> None:
+        name = pod.metadata.name
+        self._pods[name] = pod
+        for label in (pod.metadata.labels or {}).items():
+            self._labels[label].add(name)
+
+    def _delete(self, name: str) -> None:
+        pod = self._pods.pop(name, None)
+        if pod is None:
+            return
+        for label in (pod.metadata.labels or {}).items():
+            names = self._labels[label]
+            names.discard(name)
+            if not names:
+                del self._labels[label]
+
+    def get(self, name: str) -> "V1Pod | None":
+        with self._cond:
+            return self._pods.get(name)
+
+    def select(self, label_selector: str | None) -> list["V1Pod"]:
+        """
+        Get cached pods by label selector.
+
+        Equality terms are looked up in the label index, other terms filter the found pods.
+        """
+        equals, others = parse_label_selector(label_selector)
+        with self._cond:
+            if equals:
+                candidates = sorted(
+                    (self._labels.get(label, set()) for label in equals.items()),
+                    key=len,
+                )
+                names = candidates[0].intersection(*candidates[1:])
+            else:
+                names = self._pods.keys()
+            return [
+                self._pods[name]
+                for name in sorted(names)
+                if match_labels(self._pods[name].metadata.labels, others)
+            ]
+
+    def wait_for(
+        self,
+        predicate: Callable[[], Any],
+        timeout_s: float | None = None,
+    ) -> Any:
+        """
+        Waits until the informer is synced and `predicate` returns a truthy value.
+
+        `predicate` is called under the cache lock on every cache update.
+
+        Raises:
+            LookupError: If the informer was stopped.
+
+        Returns:
+            Any: result of the predicate, or None on timeout
+        """
+
+        def ready():
+            if self._stop.is_set():
+                return True
+            return self.synced and predicate()
+
+        with self._cond:
+            self._cond.wait_for(ready, timeout=timeout_s)
+            if self._stop.is_set():
+                raise LookupError(INFORMER_STOPPED)
+            return self.synced and predicate() or None
+
+    def phases(
+        self,
+        name: str,
+        timeout_s: float | None = None,
+    ) -> Generator[str | None, None, None]:
+        """
+        Yields the current phase of the pod and then every phase change.
+        Yields None if the pod is not in the cache. Stops when timeout_s is exceeded.
+        """
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+        last_phase = ""
+
+        def changed_phase():
+            pod = self._pods.get(name)
+            phase = pod.status.phase if pod and pod.status else None
+            return (phase,) if phase != last_phase else None
+
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+            changed = self.wait_for(changed_phase, remaining)
+            if not changed:
+                return
+            (last_phase,) = changed
+            yield last_phase
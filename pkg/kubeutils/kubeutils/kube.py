@@ -1,16 +1,42 @@
 import base64
+import contextlib
 import datetime
+import itertools
+import math
 import os
+import random
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
-from typing import Callable, Any, Generator
-
-from kubernetes import config
-from kubernetes.client import V1PodList
+from typing import TYPE_CHECKING, Callable, Any, Generator, Iterable, NamedTuple
 
+from kubeutils import _kubernetes
 from kubeutils.api import ApiInterface
 from kubeutils.application import ApplicationInterface
+from kubeutils.cache import SecretCache
+from kubeutils.framing import LineFramer
+from kubeutils.history import ResourceSampler
+from kubeutils.informer import PodInformer
+from kubeutils.metrics import (
+    LOG_BYTES,
+    NOOP_EXPORTER,
+    ExporterInterface,
+    count_bytes,
+    record_call,
+    record_phase,
+)
+from kubeutils.multiplex import LogMultiplexer
+from kubeutils.ratelimit import TokenBucket, retry_after_s
+from kubeutils.validation import Resources, parse_quantity
+from kubeutils.watch import WATCH_EXPIRED, WatchInterface
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1PodList, V1ResourceQuota, V1Secret
+
+# resources of ResourceQuota that limit spark pods, the first one set is used
+QUOTA_CPU_RESOURCES = ("requests.cpu", "cpu")
+QUOTA_MEMORY_RESOURCES = ("requests.memory", "memory")
 
 # class
 CONFIG_WARN = "config is not loaded using on-system default. \
@@ -21,6 +47,99 @@ CLIENT_NOT_INITIALIZED = "client not initialized. \
 POD_ALLOCATING_TIMEOUT = "pod wasn`t allocated for 3 hours"
 POD_RUNNING_TIMEOUT = "pod running timeout"
 POD_PENDING_TIMOUT = "pod pending timeout"
+POD_DELETED = "pod was deleted"
+# resumed log streams start this much earlier, clocks of the worker and the kubelet may differ
+LOG_RESUME_MARGIN_S = 5
+# spark application states
+SPARK_APPLICATION = ("sparkoperator.k8s.io", "v1beta2", "sparkapplications")
+APPLICATION_NEW_STATE = "NEW"
+APPLICATION_COMPLETED_STATES = ("COMPLETED",)
+APPLICATION_FAILED_STATES = ("FAILED", "SUBMISSION_FAILED")
+APPLICATION_TIMEOUT = "application state timeout"
+APPLICATION_DELETED = "application was deleted"
+# api server is overloaded or unavailable, the request can be retried
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+ALREADY_EXISTS = 409
+# watch
+WATCH_NOT_INITIALIZED = "watch not initialized. \
+    pass watch to .new() method"
+
+
+def _log_timestamp(ts: str) -> str:
+    """
+    Makes RFC3339Nano timestamp of the log line comparable as a string.
+
+    Kubelet trims trailing zeros of the fraction, so it is padded to nanoseconds.
+    """
+    seconds, _, fraction = ts.rstrip("Z").partition(".")
+    return f"{seconds}.{fraction:0<9}"
+
+
+def _since_seconds(ts: str) -> int:
+    """
+    Seconds passed since the log timestamp, rounded up to get the line itself.
+
+    The passed time is measured by the local clock, so LOG_RESUME_MARGIN_S is added \
+        for a kubelet clock ahead of it, the repeated lines are skipped by their timestamps.
+    """
+    then = datetime.datetime.strptime(ts[:19], "%Y-%m-%dT%H:%M:%S").replace(
+        tzinfo=datetime.timezone.utc,
+    )
+    passed = datetime.datetime.now(datetime.timezone.utc) - then
+    return max(int(passed.total_seconds()) + 1, 0) + LOG_RESUME_MARGIN_S
+
+
+def _quota_left(quota: "V1ResourceQuota", resources: tuple[str, ...]) -> float:
+    "Hard minus used of the first resource set in the quota, inf if none is."
+    hard = (quota.status and quota.status.hard) or quota.spec.hard or {}
+    used = (quota.status and quota.status.used) or {}
+    for resource in resources:
+        if resource in hard:
+            return parse_quantity(hard[resource]) - parse_quantity(
+                used.get(resource, 0)
+            )
+    return math.inf
+
+
+class SecretsDownloadError(LookupError):
+    """
+    Raised by download_secrets when some secrets can`t be downloaded.
+
+    Attributes:
+        errors (dict[tuple[str, str], Exception]): errors by (namespace, secret name)
+    """
+
+    def __init__(self, errors: dict[tuple[str, str], Exception]) -> None:
+        self.errors = errors
+        super().__init__(
+            "can`t download secrets: "
+            + ", ".join(f"{ns}/{n}: {e!r}" for (ns, n), e in errors.items()),
+        )
+
+
+class SubmissionResult(NamedTuple):
+    """
+    Result of one application submitted by submit_many.
+
+    Attributes:
+        name (str | None): application name, None if the manifest couldn't be read.
+        namespace (str | None): application namespace.
+        response (object | None): created object, None if it failed or already existed after a retry.
+        error (Exception | None): the last error if the application wasn't submitted.
+        latency_s (float): time from the first attempt to the result, rate limit waits included.
+        attempts (int): number of create requests.
+    """
+
+    name: str | None
+    namespace: str | None
+    response: object | None
+    error: Exception | None
+    latency_s: float
+    attempts: int
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class KubeutilsV1:
@@ -31,17 +150,22 @@ class KubeutilsV1:
         logger (Logger): An instance of the Logger class for logging purposes.
         config (bool): A boolean indicating if the Kubernetes configuration is loaded.
         api (ApiInterface | None): An instance of the ApiInterface class for interacting with Kubernetes API.
-        watch (Watch | None): An instance of the Watch class for watching Kubernetes resources.
+        watch (WatchInterface | None): An instance of the WatchInterface class for watching Kubernetes resources.
+        informers (dict[str, PodInformer]): Shared pod informers attached with `use_informer` by namespace.
+        secret_cache (SecretCache | None): Secret cache enabled with `enable_secret_cache`.
 
     Methods:
-        new(logger: Logger, api: ApiInterface, watch: Watch) -> Kubeutils:
+        new(logger: Logger, api: ApiInterface, watch: WatchInterface | None) -> Kubeutils:
             Creates a new instance of the Kubeutils class with the provided logger, API interface, and Watch interface.
 
+        enable_secret_cache(ttl_s: float = 300, max_entries: int = 128) -> SecretCache:
+            Keeps downloaded secrets in memory between calls.
+
         download_secret(secret_name: str, secret_key: str, namespace: str = "prefect") -> str:
             Downloads a secret from Kubernetes and returns its value.
 
-        download_secrets(secret_dict: dict[str, dict]) -> dict:
-            Downloads multiple secrets based on the provided dictionary of secrets.
+        download_secrets(secret_dict: dict[str, dict]) -> list:
+            Downloads multiple secrets based on the provided dictionary of secrets, reading every secret once.
 
         get_pod_name(namespace: str, label_selector: str, timeout_s: int = 10800) -> str:
             Retrieves the name of a pod based on the namespace and label selector.
@@ -52,10 +176,28 @@ class KubeutilsV1:
         stream_pod_log(pod_name: str, namespace: str, timeout_s: int = 3600) -> None:
             Streams the logs of a specified pod in a given namespace for a specified amount of time.
 
+        submit_many(applications: Iterable[ApplicationInterface], max_in_flight: int = 8, qps: float = 5) -> list:
+            Submits many applications with bounded concurrency, rate limit and retries.
+
+        wait_for_application(name: str, namespace: str, timeout_s: int = 10800, until: tuple = ()) -> str:
+            Waits for the final state of a SparkApplication through one watch stream.
+
+        stream_pods_logs(namespace: str, label_selector: str, pod_name: str | None = None) -> Generator:
+            Streams the logs of all pods selected by label selector as (pod name, line) tuples.
+
         while_running(func: Callable, pod_name: str, \
             namespace: str, pending_timeout_s: int = 3600, *args, **kwargs) -> None:
             Executes a given function while monitoring the phase of a pod in a Kubernetes cluster.
 
+        use_informer(namespace: str, label_selector: str | None = None) -> ContextManager[PodInformer]:
+            Serves pod lookups of the namespace from the shared in-memory pod cache.
+
+        sample_resources(namespace: str, label_selector: str, interval_s: float = 15) -> ContextManager[ResourceSampler]:
+            Samples peak pod usage of an application for the run history.
+
+        get_namespace_quota(namespace: str) -> Resources | None:
+            Returns cores and memory left by the resource quotas of the namespace.
+
     Raises:
         TimeoutError: If the streaming of logs exceeds the specified timeout,\
              or if the pending timeout is exceeded while waiting for the pod phase to change.
@@ -70,11 +212,16 @@ class KubeutilsV1:
         self.logger: Logger = logger
         self.config: bool = False
         self.api: ApiInterface | None = None
+        self.watch: WatchInterface | None = None
+        self.informers: dict[str, PodInformer] = {}
+        self.secret_cache: SecretCache | None = None
+        self.exporter: ExporterInterface = NOOP_EXPORTER
 
     @staticmethod
     def new(
         logger: Logger,
         api: ApiInterface,
+        watch: WatchInterface | None = None,
     ) -> "KubeutilsV1":
         """
         Creates a new instance of the Kubeutils class with the provided logger, API interface, and Watch interface.
@@ -82,7 +229,8 @@ class KubeutilsV1:
         Args:
             logger (Logger): An instance of the Logger class for logging purposes.
             api (ApiInterface): An instance of the ApiInterface class for interacting with Kubernetes API.
-            watch (Watch): An instance of the Watch class for watching Kubernetes resources.
+            watch (WatchInterface | None): An instance of the WatchInterface class for watching Kubernetes resources. \
+                If passed, pods are discovered and tracked with watch streams instead of polling.
 
         Returns:
             Kubeutils: A new instance of the Kubeutils class initialized with the provided logger, API interface, and Watch interface.
@@ -90,25 +238,100 @@ class KubeutilsV1:
 
         kubeclass = KubeutilsV1(logger=logger)
         kubeclass.__load_k8s_config()
-        kubeclass.__init_api(api=api)
+        kubeclass.__init_api(api=api, watch=watch)
 
         return kubeclass
 
-    def __init_api(self, api: ApiInterface) -> None:
+    @staticmethod
+    def lazy(
+        logger: Logger,
+        api: ApiInterface,
+        watch: WatchInterface | None = None,
+        setup: Callable[["KubeutilsV1"], None] | None = None,
+    ) -> "LazyKubeutilsV1":
+        """
+        Same as `new`, but the kube config is loaded and `setup` is called on first use.
+
+        Useful at module level of flows: importing the module doesn't touch the cluster.
+
+        Args:
+            logger (Logger): An instance of the Logger class for logging purposes.
+            api (ApiInterface): An instance of the ApiInterface class for interacting with Kubernetes API.
+            watch (WatchInterface | None): An instance of the WatchInterface class for watching Kubernetes resources.
+            setup (Callable[[KubeutilsV1], None] | None): called with the new instance before its first use, \
+                f.e. to enable the secret cache and download secrets.
+
+        Returns:
+            LazyKubeutilsV1: proxy of the instance created on first use.
+        """
+        return LazyKubeutilsV1(logger, api, watch, setup)
+
+    def __init_api(
+        self,
+        api: ApiInterface,
+        watch: WatchInterface | None,
+    ) -> None:
         self.api = api
+        self.watch = watch
 
     def __load_k8s_config(self) -> None:
         # download config
         self.logger.info("download k8s config")
         try:
             self.logger.info("running incluster config")
-            config.load_incluster_config()
+            _kubernetes.config.load_incluster_config()
             self.config = True
-        except config.ConfigException:
+        except _kubernetes.config.ConfigException:
             self.logger.info("running outside of k8s cluster config")
-            config.load_kube_config()
+            _kubernetes.config.load_kube_config()
             self.config = True
 
+    def enable_secret_cache(
+        self,
+        ttl_s: float = 300,
+        max_entries: int = 128,
+    ) -> SecretCache:
+        """
+        Keeps secrets read by download_secret(s) in memory, so repeated downloads in the same
+        process (f.e. at flow import and in tasks) don't call the API again.
+
+        If the watch is initialized, expired secrets are revalidated by their resourceVersion
+        and downloaded again only if they changed.
+
+        Args:
+            ttl_s (float): time to live of a cached secret.
+            max_entries (int): number of cached secrets, the least recently used are evicted.
+
+        Returns:
+            SecretCache: the enabled cache with hit/miss counters
+        """
+        if not self.secret_cache:
+            self.secret_cache = SecretCache(
+                api=self.api,
+                watch=self.watch,
+                ttl_s=ttl_s,
+                max_entries=max_entries,
+                logger=self.logger,
+            )
+        return self.secret_cache
+
+    def enable_metrics(self, exporter: ExporterInterface) -> ExporterInterface:
+        """
+        Records where the time goes: spans of the pod phases (allocating, pending, running) \
+            and of secret downloads, bytes of the streamed logs, and metrics of every \
+            API request if the API supports them (see KubeApiV1.instrument).
+
+        Args:
+            exporter (ExporterInterface): f.e. PrometheusExporter.
+
+        Returns:
+            ExporterInterface: the same exporter
+        """
+        self.exporter = exporter
+        if instrument := getattr(self.api, "instrument", None):
+            instrument(exporter)
+        return exporter
+
     def download_secret(
         self,
         secret_name: str,
@@ -134,105 +357,178 @@ class KubeutilsV1:
             raise LookupError(CLIENT_NOT_INITIALIZED)
 
         # Get secret
-        secret = self.api.read_namespaced_secret(
-            name=secret_name,
-            namespace=namespace,
-        )
-
-        secret_data = secret.data[secret_key]
-
-        decoded_secret = base64.b64decode(secret_data).decode("utf-8")
+        secret = None
+        if self.secret_cache:
+            secret = self.secret_cache.get(namespace, secret_name)
+        if not secret:
+            secret = self.__fetch_secret(name=secret_name, namespace=namespace)
 
-        if to_env:
-            os.environ[secret_key] = decoded_secret
-
-        return decoded_secret
+        return self.__decode_secret(secret, secret_key, to_env)
 
     def download_secrets(
         self,
         secret_dict: dict[str, dict[str, list]],
         to_env: bool = False,
         materialize: bool = False,
+        label_selector: str | None = None,
+        max_workers: int = 8,
     ) -> list:
         """
+        Каждый секрет читается один раз, все запрошенные ключи берутся из одного ответа.
+
         secret_dict: dict -- словарь вида \n
             {"namespace": {"secret_name": ["secret_key", ...], ...}, ...}
         to_env: bool default false -- записывает секрет в переменную окружения
         materialize: bool default dalse -- возвращает лист с переменными
+        label_selector: str default None -- если несколько секретов namespace \
+            помечены этим лейблом, они читаются одним list_namespaced_secret
+        max_workers: int default 8 -- количество потоков для параллельного чтения секретов
 
-        return [["namespace", "secret_key", "secret_value"],...]
+        raise SecretsDownloadError -- со всеми ошибками по секретам, \
+            если хотя бы один секрет не удалось скачать
+
+        return [["namespace", "secret_key", "secret_value"],...] в порядке secret_dict
         """
         if not secret_dict:
             return []
 
-        def synchronized_write(lock, ret_list, func, *args, **kwargs):
-            with lock:
-                result = func(*args, **kwargs)
-                ret_list.append(
-                    [kwargs["namespace"], kwargs["secret_key"], result],
-                )
-
         self.logger.info("download secrets...")
+        started_at, start = time.time(), time.perf_counter()
 
         if not self.config:
             self.logger.warning(CONFIG_WARN)
 
-        space = []
-        # key, name and namespace secret
-        _ = [
-            [
-                [space.append([n, k, ns]) for k in secret_dict[ns][n]]
-                for n in secret_dict[ns].keys()
-            ]
-            for ns in secret_dict.keys()
-        ]
+        if not self.api:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
 
-        return_list = []
+        # (namespace, secret name) -> keys, in the order of secret_dict
+        space = {
+            (ns, n): keys
+            for ns, secrets in secret_dict.items()
+            for n, keys in secrets.items()
+        }
+
+        secrets = {}
+        if self.secret_cache:
+            for ns, n in space:
+                if secret := self.secret_cache.get(ns, n):
+                    secrets[(ns, n)] = secret
+
+        if label_selector:
+            secrets.update(
+                self.__list_secrets(
+                    [secret for secret in space if secret not in secrets],
+                    label_selector,
+                ),
+            )
+
+        space_to_read = [secret for secret in space if secret not in secrets]
+
+        errors = {}
 
         if materialize:
-            for secret in space:
-                return_list.append(
-                    [
-                        secret[2],  # namespace
-                        secret[1],  # key
-                        self.download_secret(
-                            secret_name=secret[0],
-                            secret_key=secret[1],
-                            namespace=secret[2],
-                            to_env=to_env,
-                        ),
-                    ],
-                )
-            return return_list
+            for ns, n in space_to_read:
+                try:
+                    secrets[(ns, n)] = self.__fetch_secret(name=n, namespace=ns)
+                # pylint: disable=broad-exception-caught
+                except Exception as e:
+                    errors[(ns, n)] = e
+        elif space_to_read:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(space_to_read)),
+                thread_name_prefix="download-secrets",
+            ) as executor:
+                futures = {
+                    (ns, n): executor.submit(
+                        self.__fetch_secret,
+                        name=n,
+                        namespace=ns,
+                    )
+                    for ns, n in space_to_read
+                }
+            for secret, future in futures.items():
+                try:
+                    secrets[secret] = future.result()
+                # pylint: disable=broad-exception-caught
+                except Exception as e:
+                    errors[secret] = e
 
-        lock = threading.Lock()
+        return_list = []
+        for (ns, n), keys in space.items():
+            if (ns, n) in errors:
+                continue
+            self.logger.info(f"download secret: {n} {keys}")
+            try:
+                return_list.extend(
+                    [ns, key, self.__decode_secret(secrets[(ns, n)], key, to_env)]
+                    for key in keys
+                )
+            except KeyError as e:
+                errors[(ns, n)] = e
+
+        self.exporter.span(
+            "secret_download",
+            started_at,
+            time.perf_counter() - start,
+            {"secrets": str(len(space)), "errors": str(len(errors))},
+        )
+        if errors:
+            raise SecretsDownloadError(errors)
 
-        # get a space of all variants
+        return return_list
 
-        threads = []
+    def __list_secrets(
+        self,
+        space: list[tuple[str, str]],
+        label_selector: str,
+    ) -> dict:
+        """
+        Reads requested secrets with one label-selected list per namespace.
+        Only namespaces with more than one requested secret are listed.
+        """
+        names_by_namespace = {}
+        for ns, n in space:
+            names_by_namespace.setdefault(ns, set()).add(n)
+
+        secrets = {}
+        for ns, names in names_by_namespace.items():
+            if len(names) < 2:
+                continue
+            for secret in self.api.list_namespaced_secret(
+                namespace=ns,
+                label_selector=label_selector,
+            ).items:
+                if secret.metadata.name in names:
+                    secrets[(ns, secret.metadata.name)] = secret
+                    if self.secret_cache:
+                        self.secret_cache.put(ns, secret.metadata.name, secret)
+        return secrets
+
+    def __fetch_secret(
+        self,
+        name: str,
+        namespace: str,
+    ) -> "V1Secret":
+        secret = self.api.read_namespaced_secret(
+            name=name,
+            namespace=namespace,
+        )
+        if self.secret_cache:
+            self.secret_cache.put(namespace, name, secret)
+        return secret
 
-        for secret in space:
-            thread = threading.Thread(
-                target=synchronized_write,
-                args=(
-                    lock,
-                    return_list,
-                    self.download_secret,
-                ),
-                kwargs={
-                    "secret_name": secret[0],
-                    "secret_key": secret[1],
-                    "namespace": secret[2],
-                    "to_env": to_env,
-                },
-            )
-            threads.append(thread)
-            thread.start()
+    @staticmethod
+    def __decode_secret(
+        secret: "V1Secret",
+        secret_key: str,
+        to_env: bool,
+    ) -> str:
+        decoded_secret = base64.b64decode(secret.data[secret_key]).decode("utf-8")
 
-        for thread in threads:
-            thread.join()
+        if to_env:
+            os.environ[secret_key] = decoded_secret
 
-        return return_list
+        return decoded_secret
 
     def get_pod_name(
         self,
@@ -249,28 +545,118 @@ class KubeutilsV1:
         return driver_pod_name: str -- имя пода в кластере
         """
 
-        now = datetime.datetime.now()
+        # the wait for the driver pod to be scheduled
+        with record_phase(
+            self.exporter,
+            "allocating",
+            {"namespace": namespace, "label_selector": label_selector},
+        ):
+            if informer := self.informers.get(namespace):
+                return self.__informer_pod_name(
+                    informer=informer,
+                    label_selector=label_selector,
+                    timeout_s=timeout_s,
+                )
 
-        while True:
-            time_gone = datetime.datetime.now() - now
+            if self.watch:
+                return self.__watch_pod_name(
+                    namespace=namespace,
+                    label_selector=label_selector,
+                    timeout_s=timeout_s,
+                )
+
+            now = datetime.datetime.now()
+
+            while True:
+                time_gone = datetime.datetime.now() - now
+
+                pods = self.api.list_namespaced_pod(
+                    namespace=namespace,
+                    label_selector=label_selector,
+                ).items
+                if pods:
+                    driver_pod_name = pods[0].metadata.name
+                    self.logger.info(
+                        f"pod was allocated ~ {time_gone.total_seconds()} seconds",
+                    )
+                    break
+                time.sleep(5)
 
+                if time_gone.total_seconds() > timeout_s:
+                    raise TimeoutError(POD_ALLOCATING_TIMEOUT)
+
+            return driver_pod_name
+
+    def __watch_pod_name(
+        self,
+        namespace: str,
+        label_selector: str,
+        timeout_s: int,
+    ) -> str:
+        """
+        Lists pods once to get the resourceVersion and waits for the pod
+        to appear in the watch stream filtered by label selector.
+
+        Relists if the watch expired (410 Gone) or was closed by the server.
+        """
+        start = time.monotonic()
+        deadline = start + timeout_s
+
+        while (remaining := deadline - time.monotonic()) > 0:
             pods = self.api.list_namespaced_pod(
                 namespace=namespace,
                 label_selector=label_selector,
-            ).items
-            if pods:
-                driver_pod_name = pods[0].metadata.name
-                self.logger.info(
-                    f"pod was allocated ~ {time_gone.total_seconds()} seconds",
-                )
+            )
+            if pods.items:
+                driver_pod_name = pods.items[0].metadata.name
                 break
-            time.sleep(5)
 
-            if time_gone.total_seconds() > timeout_s:
-                raise TimeoutError(POD_ALLOCATING_TIMEOUT)
+            driver_pod_name = None
+            try:
+                for event in self.watch.stream(
+                    self.api.list_namespaced_pod,
+                    return_type="V1Pod",
+                    namespace=namespace,
+                    label_selector=label_selector,
+                    resource_version=pods.metadata.resource_version,
+                    timeout_seconds=max(int(remaining), 1),
+                ):
+                    if event["type"] in ("ADDED", "MODIFIED"):
+                        driver_pod_name = event["object"].metadata.name
+                        break
+            except _kubernetes.ApiException as e:
+                if e.status != WATCH_EXPIRED:
+                    raise
+                self.logger.info("pod watch expired, relisting...")
+            if driver_pod_name:
+                break
+        else:
+            raise TimeoutError(POD_ALLOCATING_TIMEOUT)
 
+        self.logger.info(
+            f"pod was allocated ~ {time.monotonic() - start} seconds",
+        )
         return driver_pod_name
 
+    def __informer_pod_name(
+        self,
+        informer: PodInformer,
+        label_selector: str,
+        timeout_s: int,
+    ) -> str:
+        start = time.monotonic()
+        pods = informer.wait_for(
+            lambda: informer.select(label_selector),
+            timeout_s=timeout_s,
+        )
+        if not pods:
+            raise TimeoutError(POD_ALLOCATING_TIMEOUT)
+
+        self.logger.info(
+            f"pod was allocated ~ {time.monotonic() - start} seconds",
+        )
+        return pods[0].metadata.name
+
     def get_pod_phase(
         self,
         pod_name: str,
@@ -282,6 +668,10 @@ class KubeutilsV1:
 
         return: str -- the phase of the pod
         """
+        if informer := self.informers.get(namespace):
+            if informer.synced and (pod := informer.get(pod_name)):
+                return pod.status.phase
+
         pod = self.api.read_namespaced_pod(
             name=pod_name,
             namespace=namespace,
@@ -295,38 +685,185 @@ class KubeutilsV1:
         pod_name: str,
         namespace: str,
         timeout_s: int = 3600,
-    ) -> Generator[str, None, None]:
+        max_reconnects: int = 0,
+        backoff_s: float = 1,
+        max_backoff_s: float = 60,
+        decode: bool = True,
+    ) -> Generator[str | bytes, None, None]:
         """
         Generator that streams the logs of a specified pod in a given namespace for a specified amount of time.
 
+        Chunks of the stream are framed into complete lines without the line separator. \
+            With `decode` = False lines are yielded as bytes, so the caller can filter them \
+            before paying for decoding.
+
+        With `max_reconnects` > 0 the log is requested with timestamps and a dropped connection is resumed \
+            from the last delivered line instead of the first line of the log. Timestamps are stripped \
+            from the yielded lines.
+
         Args:
             pod_name (str): The name of the pod whose logs to stream.
             namespace (str): The namespace of the pod.
             timeout_s (int, optional): The maximum time (in seconds) to stream the logs before raising a TimeoutError. Defaults to 3600.
+            max_reconnects (int, optional): Reconnects in a row after connection drops. Defaults to 0 (no reconnects).
+            backoff_s (float, optional): First pause between reconnects, doubled on every next one. Defaults to 1.
+            max_backoff_s (float, optional): The longest pause between reconnects. Defaults to 60.
+            decode (bool, optional): Yield str lines if True, else bytes lines. Defaults to True.
 
         Raises:
-            TimeoutError: If the streaming of logs exceeds the specified timeout_s.
+            TimeoutError: If the streaming of logs, reconnect pauses included, exceeds the specified timeout_s.
 
         Yields:
-            str: A line from the pod's logs
+            str | bytes: A line from the pod's logs
         """
 
         now = datetime.datetime.now()
 
-        response = self.api.read_namespaced_pod_log(
-            name=pod_name,
-            namespace=namespace,
-            _preload_content=False,
-            follow=True,
-            pretty=True,
-        )
+        if not max_reconnects:
+            framer = LineFramer(decode=decode)
+            response = self.api.read_namespaced_pod_log(
+                name=pod_name,
+                namespace=namespace,
+                _preload_content=False,
+                follow=True,
+                pretty=True,
+            )
 
-        for event in response.stream(decode_content=False):
-            time_gone = datetime.datetime.now() - now
-            if time_gone.total_seconds() > timeout_s:
-                raise TimeoutError(POD_RUNNING_TIMEOUT)
+            chunks = count_bytes(
+                self.exporter,
+                LOG_BYTES,
+                response.stream(decode_content=False),
+            )
+            for event in chunks:
+                time_gone = datetime.datetime.now() - now
+                if time_gone.total_seconds() > timeout_s:
+                    raise TimeoutError(POD_RUNNING_TIMEOUT)
+
+                yield from framer.feed(event)
+            yield from framer.flush()
+            return
+
+        # timestamp of the last delivered line and how many lines had it
+        last_ts, last_ts_lines = None, 0
+        reconnects = 0
+        while True:
+            kwargs = {}
+            if last_ts is not None:
+                kwargs["since_seconds"] = _since_seconds(last_ts)
+            skip_ts_lines = last_ts_lines
+            # a line cut by the drop is requested again
+            framer = LineFramer(decode=False)
+            try:
+                response = self.api.read_namespaced_pod_log(
+                    name=pod_name,
+                    namespace=namespace,
+                    _preload_content=False,
+                    follow=True,
+                    timestamps=True,
+                    **kwargs,
+                )
+
+                # flush() is chained to get the last line of a finished log
+                chunks = count_bytes(
+                    self.exporter,
+                    LOG_BYTES,
+                    response.stream(decode_content=False),
+                )
+                for lines in itertools.chain(map(framer.feed, chunks), [None]):
+                    time_gone = datetime.datetime.now() - now
+                    if time_gone.total_seconds() > timeout_s:
+                        raise TimeoutError(POD_RUNNING_TIMEOUT)
+
+                    for line in framer.flush() if lines is None else lines:
+                        ts, _, text = line.partition(b" ")
+                        ts = _log_timestamp(ts.decode("ascii"))
+                        # since_seconds has a second precision, so lines
+                        # delivered before the drop come again
+                        if last_ts is not None and ts < last_ts:
+                            continue
+                        if ts == last_ts:
+                            if skip_ts_lines:
+                                skip_ts_lines -= 1
+                                continue
+                            last_ts_lines += 1
+                        else:
+                            last_ts, last_ts_lines, skip_ts_lines = ts, 1, 0
+
+                        reconnects = 0
+                        yield text.decode("utf-8", "replace") if decode else text
+                return
+
+            except (
+                _kubernetes.HTTPError,
+                ConnectionError,
+                _kubernetes.ApiException,
+            ) as e:
+                if isinstance(e, _kubernetes.ApiException) and (e.status or 0) < 500:
+                    raise
+                if reconnects >= max_reconnects:
+                    raise
+                pause = min(backoff_s * 2**reconnects, max_backoff_s)
+                # the pause counts against the same timeout as the stream
+                time_gone = datetime.datetime.now() - now
+                if time_gone.total_seconds() + pause > timeout_s:
+                    raise TimeoutError(POD_RUNNING_TIMEOUT) from e
+                reconnects += 1
+                self.logger.info(
+                    f"log stream of {pod_name} dropped: {e}, reconnect in {pause} s",
+                )
+                time.sleep(pause)
+
+    def stream_pods_logs(
+        self,
+        namespace: str,
+        label_selector: str,
+        pod_name: str | None = None,
+        timeout_s: int = 3600,
+        queue_size: int = 1000,
+        discovery_interval_s: float = 5,
+        **kwargs: Any,
+    ) -> Generator[tuple[str, str | bytes], None, None]:
+        """
+        Generator that streams the logs of all pods selected by label selector, f.e. spark driver and executors.
 
-            yield event.decode("utf-8")
+        Every pod is followed by its own thread with a bounded queue of `queue_size` lines. \
+            Pods are discovered from the informer attached with `use_informer` or by listing pods \
+            every `discovery_interval_s`, so pods started later (f.e. by dynamic allocation) \
+            are attached and pods removed are detached.
+
+        Args:
+            namespace (str): The namespace of the pods.
+            label_selector (str): The label selector of the pods, f.e. "sparkoperator.k8s.io/app-name=app".
+            pod_name (str | None, optional): Main pod (f.e. spark driver). Streaming ends after its log \
+                and logs of other attached pods ended. Defaults to None (ends when no pods are pending or running).
+            timeout_s (int, optional): The maximum time (in seconds) to stream the logs. Defaults to 3600.
+            queue_size (int, optional): Lines buffered per pod. Defaults to 1000.
+            discovery_interval_s (float, optional): Pods discovery interval. Defaults to 5.
+            **kwargs: Arguments of `stream_pod_log`, f.e. `max_reconnects` or `decode`.
+
+        Raises:
+            LookupError: If the API client is not initialized.
+            TimeoutError: If the streaming of logs exceeds the specified timeout_s.
+
+        Yields:
+            tuple[str, str | bytes]: A pod name and a line from its log
+        """
+        if self.api is None:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
+
+        yield from LogMultiplexer(
+            self.api,
+            self.stream_pod_log,
+            self.logger,
+            namespace,
+            label_selector,
+            pod_name=pod_name,
+            informer=self.informers.get(namespace),
+            queue_size=queue_size,
+            discovery_interval_s=discovery_interval_s,
+            timeout_s=timeout_s,
+            **kwargs,
+        )
 
     def while_running(
         self,
@@ -346,23 +883,36 @@ class KubeutilsV1:
 
         Raises:
             TimeoutError: If the pending timeout is exceeded while waiting for the pod phase to change.
-            ChildProcessError: If the pod phase is 'Failed'.
+            ChildProcessError: If the pod phase is 'Failed' or the watched pod was deleted.
 
         Returns:
             None
         """
         now = datetime.datetime.now()
+        # start of the pending phase, until the pod is running
+        pending_since = (time.time(), time.perf_counter())
 
         self.logger.info(kwargs)
 
+        if informer := self.informers.get(kwargs["namespace"]):
+            phases = informer.phases(kwargs["pod_name"], pending_timeout_s)
+            return self.__follow_phases(func, phases, pending_since, **kwargs)
+
+        if self.watch:
+            phases = self.__watch_pod_phases(
+                pod_name=kwargs["pod_name"],
+                namespace=kwargs["namespace"],
+                timeout_s=pending_timeout_s,
+            )
+            return self.__follow_phases(func, phases, pending_since, **kwargs)
+
         while True:
             time.sleep(30)
 
             phase = self.get_pod_phase(kwargs["pod_name"], kwargs["namespace"])
 
             if phase == "Running":
-                self.logger.info("pod is running...")
-                return func(**kwargs)
+                return self.__run(func, pending_since, **kwargs)
             elif phase == "Failed":
                 raise ChildProcessError("something went wrong")
             elif phase == "Pending":
@@ -374,6 +924,180 @@ class KubeutilsV1:
             if time_gone.total_seconds() > pending_timeout_s:
                 raise TimeoutError(f"waiting pod timeout {POD_PENDING_TIMOUT}")
 
+    def __run(
+        self,
+        func: Callable,
+        pending_since: tuple[float, float],
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Runs func for the running pod. The time since `pending_since` (unix time, \
+            perf_counter) is recorded as the pending phase, func as the running phase \
+            until the generator it returns (f.e. stream_pods_logs) is consumed.
+        """
+        labels = {"namespace": kwargs["namespace"], "pod": kwargs["pod_name"]}
+        started_at, start = pending_since
+        self.exporter.span("pending", started_at, time.perf_counter() - start, labels)
+
+        self.logger.info("pod is running...")
+        return record_call(self.exporter, "running", labels, func, **kwargs)
+
+    def __follow_phases(
+        self,
+        func: Callable,
+        phases: Generator[str | None, None, None],
+        pending_since: tuple[float, float],
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Same as while_running, but reacts on phase transitions delivered by `phases`.
+        """
+        last_phase = None
+        with contextlib.closing(phases):
+            for phase in phases:
+                if phase == "Running":
+                    return self.__run(func, pending_since, **kwargs)
+                elif phase == "Failed":
+                    raise ChildProcessError("something went wrong")
+                elif phase is None:
+                    raise ChildProcessError(POD_DELETED)
+                elif phase == "Pending":
+                    if phase != last_phase:
+                        self.logger.info("pending...")
+                else:
+                    self.logger.info("job has done")
+                    return None
+                last_phase = phase
+
+        raise TimeoutError(f"waiting pod timeout {POD_PENDING_TIMOUT}")
+
+    def __watch_pod_phases(
+        self,
+        pod_name: str,
+        namespace: str,
+        timeout_s: int | None,
+    ) -> Generator[str | None, None, None]:
+        """
+        Yields the current phase of the pod and then every phase from the
+        field-selector watch on that pod. Yields None if the pod was deleted.
+
+        Rereads the pod if the watch expired (410 Gone) or was closed by the server,
+        stops when timeout_s is exceeded.
+        """
+        deadline = None if timeout_s is None else time.monotonic() + timeout_s
+
+        while True:
+            pod = self.api.read_namespaced_pod(
+                name=pod_name,
+                namespace=namespace,
+            )
+            yield pod.status.phase
+
+            watch_kwargs = {}
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                watch_kwargs["timeout_seconds"] = max(int(remaining), 1)
+
+            try:
+                for event in self.watch.stream(
+                    self.api.list_namespaced_pod,
+                    return_type="V1Pod",
+                    namespace=namespace,
+                    field_selector=f"metadata.name={pod_name}",
+                    resource_version=pod.metadata.resource_version,
+                    **watch_kwargs,
+                ):
+                    if event["type"] == "DELETED":
+                        yield None
+                    else:
+                        yield event["object"].status.phase
+            except _kubernetes.ApiException as e:
+                if e.status != WATCH_EXPIRED:
+                    raise
+                self.logger.info("pod watch expired, rereading pod...")
+
+    @contextlib.contextmanager
+    def use_informer(
+        self,
+        namespace: str,
+        label_selector: str | None = None,
+    ) -> Generator[PodInformer, None, None]:
+        """
+        Attaches the shared pod informer of the namespace for the duration of the context.
+
+        While attached, get_pod_name, get_pod_phase and while_running read pods of the namespace
+        from the informer cache instead of calling the API. The informer is shared by all
+        KubeutilsV1 instances of the process and stops when the last user leaves the context.
+
+        Args:
+            namespace (str): namespace of the pods.
+            label_selector (str | None): server-side label selector of cached pods, \
+                should match every pod looked up in the namespace.
+
+        Raises:
+            LookupError: If the watch is not initialized.
+
+        Yields:
+            PodInformer: attached informer
+        """
+        if not self.watch:
+            raise LookupError(WATCH_NOT_INITIALIZED)
+
+        informer = PodInformer.acquire(
+            api=self.api,
+            watch=self.watch,
+            namespace=namespace,
+            label_selector=label_selector,
+            logger=self.logger,
+        )
+        self.informers[namespace] = informer
+        try:
+            yield informer
+        finally:
+            informer.release()
+            if informer.stopped and self.informers.get(namespace) is informer:
+                del self.informers[namespace]
+
+    @contextlib.contextmanager
+    def sample_resources(
+        self,
+        namespace: str,
+        label_selector: str,
+        interval_s: float = 15,
+    ) -> Generator[ResourceSampler, None, None]:
+        """
+        Samples metrics-server usage of the selected pods for the duration of the context.
+
+        Args:
+            namespace (str): namespace of the pods.
+            label_selector (str): selector of the application pods, \
+                f.e. "sparkoperator.k8s.io/app-name=app".
+            interval_s (float, optional): seconds between samples. Defaults to 15.
+
+        Raises:
+            LookupError: If the API client is not initialized.
+
+        Yields:
+            ResourceSampler: peaks sampled so far, see ResourceSampler.record().
+        """
+        if self.api is None:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
+
+        sampler = ResourceSampler(
+            self.api,
+            self.logger,
+            namespace,
+            label_selector,
+            interval_s=interval_s,
+        )
+        sampler.start()
+        try:
+            yield sampler
+        finally:
+            sampler.stop()
+
     def create_namespaced_custom_object(
         self,
         group: str,
@@ -394,10 +1118,291 @@ class KubeutilsV1:
 
         return app
 
+    def submit_many(
+        self,
+        applications: Iterable[ApplicationInterface],
+        namespace: str | None = None,
+        max_in_flight: int = 8,
+        qps: float = 5,
+        burst: float | None = None,
+        max_retries: int = 5,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30,
+        group: str = SPARK_APPLICATION[0],
+        version: str = SPARK_APPLICATION[1],
+        plural: str = SPARK_APPLICATION[2],
+    ) -> list[SubmissionResult]:
+        """
+        Submits many applications (f.e. SparkApplicationV1 per date of a backfill) with bounded concurrency.
+
+        Create requests of all workers share one token bucket of `qps` requests per second, retries included. \
+            429 and 5xx responses are retried with full jitter backoff (or after Retry-After if it is longer), \
+            the only retries of throttled creates: ApiRateLimiter doesn't retry mutations. \
+            409 Already Exists on a retry means the previous attempt has created the application.
+
+        Args:
+            applications (Iterable[ApplicationInterface]): applications with names in their manifests.
+            namespace (str | None, optional): Namespace of applications without metadata.namespace. Defaults to None.
+            max_in_flight (int, optional): Concurrent create requests. Defaults to 8.
+            qps (float, optional): Create requests per second. Defaults to 5.
+            burst (float | None, optional): Requests sent at once after idle time. Defaults to max(qps, 1).
+            max_retries (int, optional): Retries of one application. Defaults to 5.
+            backoff_s (float, optional): Base of the exponential backoff. Defaults to 0.5.
+            max_backoff_s (float, optional): The longest backoff. Defaults to 30.
+            group (str, optional): Custom object group. Defaults to "sparkoperator.k8s.io".
+            version (str, optional): Custom object version. Defaults to "v1beta2".
+            plural (str, optional): Custom object plural. Defaults to "sparkapplications".
+
+        Returns:
+            list[SubmissionResult]: results in the order of applications, failures are not raised.
+        """
+        applications = list(applications)
+        if not applications:
+            return []
+
+        bucket = TokenBucket(qps, burst)
+        with ThreadPoolExecutor(
+            max_workers=min(max_in_flight, len(applications)),
+            thread_name_prefix="submit-applications",
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self.__submit,
+                    application,
+                    namespace,
+                    bucket,
+                    max_retries,
+                    backoff_s,
+                    max_backoff_s,
+                    group,
+                    version,
+                    plural,
+                )
+                for application in applications
+            ]
+        results = [future.result() for future in futures]
+
+        failed = sum(not result.ok for result in results)
+        self.logger.info(
+            f"submitted {len(results) - failed}, failed {failed} applications"
+        )
+        return results
+
+    def __submit(
+        self,
+        application: ApplicationInterface,
+        namespace: str | None,
+        bucket: TokenBucket,
+        max_retries: int,
+        backoff_s: float,
+        max_backoff_s: float,
+        group: str,
+        version: str,
+        plural: str,
+    ) -> SubmissionResult:
+        start = time.monotonic()
+        attempts = 0
+        name, response, error = None, None, None
+        try:
+            metadata = application()["metadata"]
+            name = metadata.get("name")
+            namespace = metadata.get("namespace") or namespace
+        # f.e. the manifest wasn't downloaded, it fails alone like a rejected application
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            return SubmissionResult(name, namespace, None, e, 0.0, attempts)
+
+        while True:
+            bucket.acquire()
+            attempts += 1
+            try:
+                response = self.api.create_namespaced_custom_object(
+                    group=group,
+                    version=version,
+                    namespace=namespace,
+                    plural=plural,
+                    application=application,
+                )
+            except _kubernetes.ApiException as e:
+                retry = e.status in RETRY_STATUSES and attempts <= max_retries
+                if retry:
+                    pause = random.uniform(
+                        0,
+                        min(backoff_s * 2**attempts, max_backoff_s),
+                    )
+                    pause = max(pause, retry_after_s(e) or 0)
+                    self.logger.info(
+                        f"submit {name}: {e.status}, retry in {pause:.1f} s"
+                    )
+                    time.sleep(pause)
+                    continue
+                # the previous attempt has created it before the error
+                if not (e.status == ALREADY_EXISTS and attempts > 1):
+                    error = e
+            # pylint: disable=broad-exception-caught
+            except Exception as e:
+                error = e
+
+            return SubmissionResult(
+                name,
+                namespace,
+                response,
+                error,
+                time.monotonic() - start,
+                attempts,
+            )
+
+    def wait_for_application(
+        self,
+        name: str,
+        namespace: str,
+        timeout_s: int = 10800,
+        until: tuple[str, ...] = (),
+        group: str = SPARK_APPLICATION[0],
+        version: str = SPARK_APPLICATION[1],
+        plural: str = SPARK_APPLICATION[2],
+    ) -> str:
+        """
+        Waits for the final state of a SparkApplication (`status.applicationState.state`) through one watch stream.
+
+        Submission failures are raised as soon as the operator reports them, even if no driver pod was created.
+
+        Args:
+            name (str): The name of the application.
+            namespace (str): The namespace of the application.
+            timeout_s (int, optional): The maximum time (in seconds) to wait. Defaults to 10800.
+            until (tuple[str, ...], optional): Other states to return on, f.e. ("RUNNING",). Defaults to ().
+            group (str, optional): Custom object group. Defaults to "sparkoperator.k8s.io".
+            version (str, optional): Custom object version. Defaults to "v1beta2".
+            plural (str, optional): Custom object plural. Defaults to "sparkapplications".
+
+        Raises:
+            LookupError: If the watch is not initialized or the application was deleted.
+            ChildProcessError: If the application state is FAILED or SUBMISSION_FAILED.
+            TimeoutError: If the state is not reached within timeout_s.
+
+        Returns:
+            str: COMPLETED or one of `until` states.
+        """
+        if self.watch is None:
+            raise LookupError(WATCH_NOT_INITIALIZED)
+
+        last_state = None
+        for application in self.__watch_application(
+            name,
+            namespace,
+            timeout_s,
+            group,
+            version,
+            plural,
+        ):
+            if application is None:
+                raise LookupError(APPLICATION_DELETED)
+
+            app_state = (application.get("status") or {}).get("applicationState") or {}
+            # the operator sets no state before the first submission
+            state = app_state.get("state") or APPLICATION_NEW_STATE
+            if state == last_state:
+                continue
+            last_state = state
+            self.logger.info(f"application {name} state: {state}")
+
+            if state in APPLICATION_FAILED_STATES:
+                raise ChildProcessError(
+                    f"application {name} {state}: {app_state.get('errorMessage', '')}",
+                )
+            if state in APPLICATION_COMPLETED_STATES or state in until:
+                return state
+
+        raise TimeoutError(APPLICATION_TIMEOUT)
+
+    def __watch_application(
+        self,
+        name: str,
+        namespace: str,
+        timeout_s: int,
+        group: str,
+        version: str,
+        plural: str,
+    ) -> Generator[dict | None, None, None]:
+        """
+        Yields the current custom object and then every object from the
+        field-selector watch on it. Yields None if the object was deleted.
+
+        Gets the object again if the watch expired (410 Gone) or was closed by the server,
+        stops when timeout_s is exceeded.
+        """
+        deadline = time.monotonic() + timeout_s
+        kwargs = {
+            "group": group,
+            "version": version,
+            "namespace": namespace,
+            "plural": plural,
+        }
+
+        while True:
+            application = self.api.get_namespaced_custom_object(name=name, **kwargs)
+            yield application
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+
+            try:
+                for event in self.watch.stream(
+                    self.api.list_namespaced_custom_object,
+                    field_selector=f"metadata.name={name}",
+                    resource_version=application["metadata"]["resourceVersion"],
+                    timeout_seconds=max(int(remaining), 1),
+                    **kwargs,
+                ):
+                    if event["type"] == "DELETED":
+                        yield None
+                    else:
+                        yield event["object"]
+            except _kubernetes.ApiException as e:
+                if e.status != WATCH_EXPIRED:
+                    raise
+                self.logger.info("application watch expired, getting application...")
+
+    def get_namespace_quota(
+        self,
+        namespace: str,
+    ) -> Resources | None:
+        """
+        Returns resources left by the resource quotas of the namespace (hard minus used).
+
+        With several quotas the smallest remainder wins. Resources without a quota are unlimited.
+
+        Args:
+            namespace (str): The namespace of the application.
+
+        Raises:
+            LookupError: If the API client is not initialized.
+
+        Returns:
+            Resources | None: cores and bytes of memory or None if the namespace has no quota.
+        """
+        if self.api is None:
+            raise LookupError(CLIENT_NOT_INITIALIZED)
+
+        quotas = self.api.list_namespaced_resource_quota(namespace=namespace).items
+        cpu = min(
+            (_quota_left(quota, QUOTA_CPU_RESOURCES) for quota in quotas),
+            default=math.inf,
+        )
+        memory = min(
+            (_quota_left(quota, QUOTA_MEMORY_RESOURCES) for quota in quotas),
+            default=math.inf,
+        )
+        if cpu == memory == math.inf:
+            return None
+        return Resources(cpu, memory)
+
     def get_pods_all_namespaces(
         self,
         **kwargs: Any,
-    ) -> V1PodList:
+    ) -> "V1PodList":
         return self.api.list_pod_for_all_namespaces(**kwargs)
 
     def delete_pod(
@@ -411,3 +1416,64 @@ class KubeutilsV1:
             namespace=namespace,
             **kwargs,
         )
+
+
+class LazyKubeutilsV1:
+    """
+    Proxy of KubeutilsV1 created on first use, see KubeutilsV1.lazy().
+
+    The first attribute read or set loads the kube config, creates the instance and calls `setup`, \
+        once for all threads. If it raises, the next use tries again with a new instance \
+        sharing the api and watch, so `setup` has to be repeatable: f.e. start servers \
+        outside of it.
+
+    Attributes:
+        loaded (bool): whether the instance is created.
+
+    Methods:
+        load() -> KubeutilsV1: Creates the instance if it is not created yet.
+    """
+
+    __slots__ = ("_logger", "_api", "_watch", "_setup", "_instance", "_lock")
+
+    def __init__(
+        self,
+        logger: Logger,
+        api: ApiInterface,
+        watch: WatchInterface | None = None,
+        setup: Callable[[KubeutilsV1], None] | None = None,
+    ) -> None:
+        object.__setattr__(self, "_logger", logger)
+        object.__setattr__(self, "_api", api)
+        object.__setattr__(self, "_watch", watch)
+        object.__setattr__(self, "_setup", setup)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> KubeutilsV1:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                instance = KubeutilsV1.new(self._logger, self._api, self._watch)
+                if self._setup:
+                    self._setup(instance)
+                # published after setup, other threads wait for it on the lock
+                object.__setattr__(self, "_instance", instance)
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.load(), name, value)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<{type(self).__name__} (not loaded)>"
+        return f"<{type(self).__name__} {self._instance!r}>"
@@ -0,0 +1,163 @@
+"""
+Log filtering for kubeutils
+"""
+
+import itertools
+import re
+from collections import deque
+from typing import Iterable, Generator, NamedTuple
+
+# log4j layout of spark images: `yy/MM/dd HH:mm:ss LEVEL logger: message`
+LOG4J_LINE = re.compile(
+    r"^(?P<time>\d{2}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) "
+    r"(?P<level>[A-Z]+) (?P<logger>[^:\s]+): (?P<message>.*)$",
+)
+# part of the log4j line before the level
+LOG4J_PREFIX = r"\d{2}/\d{2}/\d{2} \d{2}:\d{2}:\d{2} "
+
+
+class LogRecord(NamedTuple):
+    time: str
+    level: str
+    logger: str
+    message: str
+
+
+def parse_log4j(line: str) -> LogRecord | None:
+    """
+    Parses log4j formatted line.
+
+    Args:
+        line (str): line of the log.
+
+    Returns:
+        LogRecord | None: time, level, logger and message of the line or None \
+            if the line isn't log4j formatted (f.e. line of a stack trace).
+    """
+    match = LOG4J_LINE.match(line)
+    if match is None:
+        return None
+    return LogRecord(*match.groups())
+
+
+class LogFilter:
+    """
+    Filter of log lines compiled once into one regex.
+
+    A line matches if its log4j level starts with one of `levels` or it contains one of `patterns`. \
+        Lines without the `layout` prefix (python print/logging, tracebacks, custom log4j layouts) \
+        match if a word of them starts with one of `levels`. The combined regex is searched in C \
+        once per line, so the cost doesn't grow with the number of patterns like a python loop \
+        over them does.
+
+    Attributes:
+        levels (list[str]): log4j levels, f.e. ["WARN", "ERROR"], WARN also matches WARNING.
+        patterns (list[str]): substrings (or regexes if `regex` is True) searched anywhere in the line.
+        context (int): lines kept before and after every matched line.
+        layout (str): regex of the line prefix before the log4j level, f.e. for a custom \
+            log4j.properties ConversionPattern.
+
+    Methods:
+        match(line: str | bytes) -> bool: Check one line.
+        filter(lines: Iterable[str | bytes]) -> Generator[str | bytes, None, None]: Filter lines with context.
+        filter_sources(items: Iterable[tuple[str, str | bytes]]) -> Generator: Filter merged streams.
+    """
+
+    def __init__(
+        self,
+        levels: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        context: int = 0,
+        regex: bool = False,
+        layout: str = LOG4J_PREFIX,
+    ) -> None:
+        self.levels = list(levels)
+        self.patterns = list(patterns)
+        self.context = context
+        self.layout = layout
+
+        alternatives = [p if regex else re.escape(p) for p in self.patterns]
+        if self.levels:
+            levels_regex = "|".join(re.escape(level) for level in self.levels)
+            # the level field of `layout` lines, a level word anywhere in other lines
+            alternatives.insert(0, f"^{layout}(?:{levels_regex})")
+            alternatives.insert(1, rf"^(?!{layout}).*?\b(?:{levels_regex})[A-Z]*\b")
+        if not alternatives:
+            raise ValueError("log filter needs levels or patterns")
+
+        pattern = "|".join(f"(?:{alternative})" for alternative in alternatives)
+        self._search = re.compile(pattern).search
+        # lines streamed with decode=False are searched without decoding
+        self._search_bytes = re.compile(pattern.encode()).search
+
+    def match(self, line: str | bytes) -> bool:
+        search = self._search_bytes if isinstance(line, bytes) else self._search
+        return search(line) is not None
+
+    def filter(
+        self,
+        lines: Iterable[str | bytes],
+    ) -> Generator[str | bytes, None, None]:
+        """
+        Filters lines keeping `context` lines around every match, every line is yielded once.
+
+        Args:
+            lines (Iterable[str | bytes]): lines of the log, f.e. KubeutilsV1.stream_pod_log().
+
+        Yields:
+            str | bytes: matched lines and their context in the original order.
+        """
+        lines = iter(lines)
+        first = next(lines, None)
+        if first is None:
+            return
+        search = self._search_bytes if isinstance(first, bytes) else self._search
+        lines = itertools.chain((first,), lines)
+
+        if not self.context:
+            # no python code runs per line
+            yield from filter(search, lines)
+            return
+
+        before = deque(maxlen=self.context)
+        after = 0
+        for line in lines:
+            if search(line):
+                yield from before
+                before.clear()
+                yield line
+                after = self.context
+            elif after:
+                yield line
+                after -= 1
+            else:
+                before.append(line)
+
+    def filter_sources(
+        self,
+        items: Iterable[tuple[str, str | bytes]],
+    ) -> Generator[tuple[str, str | bytes], None, None]:
+        """
+        Filters (source, line) items of merged streams, f.e. KubeutilsV1.stream_pods_logs(). \
+            Context is kept separately for every source.
+
+        Args:
+            items (Iterable[tuple[str, str | bytes]]): source (f.e. pod name) and its line.
+
+        Yields:
+            tuple[str, str | bytes]: matched items and their context in the original order.
+        """
+        # source -> lines before the next match and lines left after the last one
+        befores: dict[str, deque] = {}
+        afters: dict[str, int] = {}
+        for source, line in items:
+            if self.match(line):
+                before = befores.pop(source, ())
+                yield from ((source, context_line) for context_line in before)
+                yield source, line
+                afters[source] = self.context
+            elif afters.get(source):
+                yield source, line
+                afters[source] -= 1
+            elif self.context:
+                befores.setdefault(source, deque(maxlen=self.context)).append(line)
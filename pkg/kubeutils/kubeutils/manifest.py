@@ -0,0 +1,172 @@
+"""
+Compiled manifest templates for kubeutils
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+def __getattr__(name: str) -> Any:
+    # yaml is imported on the first manifest, not with kubeutils
+    if name == "YAML_LOADER":
+        return _yaml_loader()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.cache
+def _yaml_loader() -> type:
+    import yaml
+
+    # libyaml loader is several times faster, the pure python one is the fallback
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_manifest(text: str) -> dict:
+    "Parses a YAML manifest with the fastest available safe loader."
+    import yaml
+
+    return yaml.load(text, Loader=_yaml_loader())
+
+
+def copy_manifest(manifest: Any) -> Any:
+    """
+    Copies a manifest made of dicts, lists and scalars.
+
+    Several times faster than copy.deepcopy, which keeps a memo of every object for cycles \
+        that a parsed manifest can't have. Mappings (f.e. OrderedDict) become plain dicts.
+
+    Args:
+        manifest (Any): the manifest or any part of it.
+
+    Returns:
+        Any: a copy sharing only immutable scalars with the original.
+    """
+    if isinstance(manifest, dict):
+        return {key: copy_manifest(value) for key, value in manifest.items()}
+    if isinstance(manifest, list):
+        return [copy_manifest(value) for value in manifest]
+    return manifest
+
+
+def patch_manifest(manifest: dict, patch: dict) -> dict:
+    """
+    Applies a patch set to the manifest in place.
+
+    Dicts of the patch are merged into dicts of the manifest key by key, any other value \
+        (scalars and lists) replaces the value of the manifest.
+
+    Args:
+        manifest (dict): the manifest to change.
+        patch (dict): nested changes, f.e. {"metadata": {"name": "app"}}.
+
+    Returns:
+        dict: the same manifest.
+    """
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(manifest.get(key), dict):
+            patch_manifest(manifest[key], value)
+        else:
+            manifest[key] = copy_manifest(value)
+    return manifest
+
+
+def merge_manifests(*manifests: dict) -> dict:
+    """
+    Deep merge of manifests into a new one, the arguments are not changed.
+
+    Dicts are merged key by key, any other value (scalars and lists) of a later manifest \
+        replaces the earlier one, so f.e. tolerations of the application manifest replace \
+        tolerations of the based manifest instead of being appended to them.
+
+    Args:
+        *manifests (dict): manifests, later ones override earlier ones, \
+            f.e. the based manifest and the application manifest.
+
+    Returns:
+        dict: the merged manifest.
+    """
+    merged = {}
+    for manifest in manifests:
+        # None of an empty yaml file
+        patch_manifest(merged, manifest or {})
+    return merged
+
+
+class ManifestCache:
+    """
+    Cache of parsed and merged manifest templates keyed by the content of their files.
+
+    A template is parsed (and merged if there are several files) once per content, \
+        every `get` returns a fresh copy of it. Cached templates are never handed out, \
+        so callers may change their copies freely and concurrently.
+
+    Attributes:
+        max_entries (int): the least recently used templates are evicted above this size.
+        hits (int): number of templates served from the cache.
+        misses (int): number of templates parsed.
+
+    Methods:
+        get(*manifest_paths: str, encoding: str) -> dict: Get a copy of the template.
+        clear() -> None: Drop all templates.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._templates: OrderedDict[tuple, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, *manifest_paths: str, encoding: str = "utf-8") -> dict:
+        """
+        Returns a copy of the manifest compiled from the files.
+
+        Files are read on every call to hash their content, so changed files are \
+            never served from the cache.
+
+        Args:
+            *manifest_paths (str): manifest files, later files override earlier ones, \
+                f.e. the based manifest and the application manifest.
+            encoding (str, optional): encoding of the files. Defaults to "utf-8".
+
+        Returns:
+            dict: the manifest.
+        """
+        texts = []
+        for path in manifest_paths:
+            with open(path, encoding=encoding) as fh:
+                texts.append(fh.read())
+        key = tuple(hashlib.sha256(text.encode()).hexdigest() for text in texts)
+
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+        if template is None:
+            template = self._compile(texts)
+            with self._lock:
+                self.misses += 1
+                self._templates[key] = template
+                while len(self._templates) > self.max_entries:
+                    self._templates.popitem(last=False)
+
+        return copy_manifest(template)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    @staticmethod
+    def _compile(texts: list[str]) -> dict:
+        if len(texts) == 1:
+            return load_manifest(texts[0])
+        return merge_manifests(*(load_manifest(text) for text in texts))
+
+
+# templates shared by all applications of the process
+MANIFEST_CACHE = ManifestCache()
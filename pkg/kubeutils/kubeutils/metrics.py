@@ -0,0 +1,379 @@
+"""
+Metrics of API requests and pod phases for kubeutils
+"""
+
+import contextlib
+import functools
+import inspect
+import math
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Generator, Iterable, NamedTuple
+
+from interface import Interface, implements
+
+from kubeutils.ratelimit import Histogram
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# API requests of KubeApiV1, labeled by method
+API_REQUESTS = "kubeutils_api_requests_total"
+API_REQUEST_DURATION = "kubeutils_api_request_duration_seconds"
+API_RESPONSE_BYTES = "kubeutils_api_response_bytes_total"
+API_RETRIES = "kubeutils_api_retries_total"
+# log streams of KubeutilsV1
+LOG_BYTES = "kubeutils_log_bytes_total"
+# spans of KubeutilsV1, labeled by phase
+PHASE_DURATION = "kubeutils_phase_duration_seconds"
+
+# default buckets of prometheus clients, requests take milliseconds to seconds
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# phases take seconds to hours
+PHASE_BUCKETS_S = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 10800)
+
+DEFAULT_METRICS_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Span(NamedTuple):
+    """
+    Finished phase, f.e. the pod pending.
+
+    Attributes:
+        name (str): the phase, f.e. "allocating", "pending" or "running".
+        started_at (float): unix time of the start.
+        duration_s (float): seconds.
+        labels (dict[str, str]): f.e. namespace and pod of the phase.
+    """
+
+    name: str
+    started_at: float
+    duration_s: float
+    labels: dict[str, str]
+
+
+class ExporterInterface(Interface):
+    def inc(
+        self,
+        name: str,
+        value: float = 1,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        "add value to the counter"
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        "add observation to the histogram"
+
+    def span(
+        self,
+        name: str,
+        started_at: float,
+        duration_s: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        "record finished phase"
+
+    def collect(self, collector: Callable[[], dict[str, float]]) -> None:
+        "register gauges read on every export"
+
+
+class NoopExporter(implements(ExporterInterface)):
+    """
+    Exporter dropping everything, the default of KubeApiV1 and KubeutilsV1.
+
+    Instrumented code checks for NOOP_EXPORTER and skips timing altogether.
+    """
+
+    def inc(
+        self,
+        name: str,
+        value: float = 1,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        pass
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        pass
+
+    def span(
+        self,
+        name: str,
+        started_at: float,
+        duration_s: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        pass
+
+    def collect(self, collector: Callable[[], dict[str, float]]) -> None:
+        pass
+
+
+NOOP_EXPORTER = NoopExporter()
+
+
+class PrometheusExporter(implements(ExporterInterface)):
+    """
+    In-memory metrics rendered in the Prometheus text format.
+
+    Spans are observed by the phase duration histogram labeled only by the phase, \
+        so pod names don't make a series per run. The latest spans are kept with all \
+        their labels, f.e. for Prefect artifacts.
+
+    Attributes:
+        buckets (dict[str, tuple[float, ...]]): histogram buckets by metric name, \
+            LATENCY_BUCKETS_S are used for the rest.
+        spans (deque[Span]): the latest `max_spans` spans.
+
+    Methods:
+        render() -> str: Metrics in the text format.
+        serve(port: int, addr: str) -> ThreadingHTTPServer: Serve /metrics in a thread.
+    """
+
+    def __init__(
+        self,
+        buckets: dict[str, tuple[float, ...]] | None = None,
+        max_spans: int = 1024,
+    ) -> None:
+        self.buckets = {PHASE_DURATION: PHASE_BUCKETS_S, **(buckets or {})}
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, Histogram]] = {}
+        self._collectors: list[Callable[[], dict[str, float]]] = []
+        self._lock = threading.Lock()
+
+    def inc(
+        self,
+        name: str,
+        value: float = 1,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(
+                    self.buckets.get(name, LATENCY_BUCKETS_S),
+                )
+        histogram.observe(value)
+
+    def span(
+        self,
+        name: str,
+        started_at: float,
+        duration_s: float,
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        self.spans.append(Span(name, started_at, duration_s, dict(labels or {})))
+        self.observe(PHASE_DURATION, duration_s, {"phase": name})
+
+    def collect(self, collector: Callable[[], dict[str, float]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        "All metrics in the Prometheus text exposition format 0.0.4."
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: dict(series) for name, series in self._histograms.items()
+            }
+            collectors = list(self._collectors)
+
+        lines = []
+        for name in sorted(counters):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(histograms):
+            lines.append(f"# TYPE {name} histogram")
+            for key, histogram in sorted(histograms[name].items()):
+                snapshot = histogram.snapshot()
+                for le, count in snapshot["buckets"].items():
+                    labels = _format_labels((*key, ("le", _format_value(le))))
+                    lines.append(f"{name}_bucket{labels} {count}")
+                labels = _format_labels(key)
+                lines.append(f"{name}_sum{labels} {_format_value(snapshot['sum'])}")
+                lines.append(f"{name}_count{labels} {snapshot['count']}")
+
+        gauges = {}
+        for collector in collectors:
+            gauges.update(collector())
+        for name in sorted(gauges):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_value(gauges[name])}")
+
+        return "\n".join(lines) + "\n"
+
+    def serve(
+        self,
+        port: int = DEFAULT_METRICS_PORT,
+        addr: str = "",
+    ) -> "ThreadingHTTPServer":
+        """
+        Serves GET /metrics for Prometheus scrapes in a daemon thread.
+
+        Args:
+            port (int, optional): Defaults to 9108, 0 picks a free port.
+            addr (str, optional): Defaults to "" (all interfaces).
+
+        Returns:
+            ThreadingHTTPServer: the server, stop it with shutdown().
+        """
+        # http.server is imported by the exporting process only
+        from http.server import ThreadingHTTPServer
+
+        server = ThreadingHTTPServer((addr, port), _metrics_handler())
+        server.daemon_threads = True
+        server.exporter = self
+        threading.Thread(
+            target=server.serve_forever,
+            name="metrics-server",
+            daemon=True,
+        ).start()
+        return server
+
+
+@functools.cache
+def _metrics_handler() -> type:
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = self.server.exporter.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            # every scrape would be logged to stderr
+            pass
+
+    return _MetricsHandler
+
+
+@contextlib.contextmanager
+def record_phase(
+    exporter: ExporterInterface,
+    name: str,
+    labels: dict[str, str] | None = None,
+) -> Generator[None, None, None]:
+    "Records the block as a span of the phase, also if it raises."
+    started_at, start = time.time(), time.perf_counter()
+    try:
+        yield
+    finally:
+        exporter.span(name, started_at, time.perf_counter() - start, labels)
+
+
+def record_call(
+    exporter: ExporterInterface,
+    name: str,
+    labels: dict[str, str] | None,
+    func: Callable,
+    **kwargs: Any,
+) -> Any:
+    """
+    Records the call of func as a span of the phase, also if it raises.
+
+    If func returns a generator (f.e. a log stream read by the caller), the span ends \
+        when the generator is exhausted or closed.
+    """
+    started_at, start = time.time(), time.perf_counter()
+    try:
+        result = func(**kwargs)
+    except BaseException:
+        exporter.span(name, started_at, time.perf_counter() - start, labels)
+        raise
+    if inspect.isgenerator(result):
+        return _spanned(exporter, name, labels, result, started_at, start)
+    exporter.span(name, started_at, time.perf_counter() - start, labels)
+    return result
+
+
+def _spanned(
+    exporter: ExporterInterface,
+    name: str,
+    labels: dict[str, str] | None,
+    generator: Generator,
+    started_at: float,
+    start: float,
+) -> Generator:
+    try:
+        return (yield from generator)
+    finally:
+        exporter.span(name, started_at, time.perf_counter() - start, labels)
+
+
+def count_bytes(
+    exporter: ExporterInterface,
+    name: str,
+    chunks: Iterable[bytes],
+) -> Iterable[bytes]:
+    "Counts bytes of the chunks as they are read, the chunks are returned as is if disabled."
+    if exporter is NOOP_EXPORTER:
+        return chunks
+    return _counted(exporter, name, chunks)
+
+
+def _counted(
+    exporter: ExporterInterface,
+    name: str,
+    chunks: Iterable[bytes],
+) -> Generator[bytes, None, None]:
+    for chunk in chunks:
+        exporter.inc(name, len(chunk))
+        yield chunk
+
+
+def _label_key(labels: dict[str, str] | None) -> tuple:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in key)
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
@@ -0,0 +1,211 @@
+"""
+Multi-pod log streaming for kubeutils
+"""
+
+import queue
+import threading
+import time
+from logging import Logger
+from typing import TYPE_CHECKING, Any, Callable, Generator
+
+from kubeutils.api import ApiInterface
+from kubeutils.informer import PodInformer
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Pod
+
+# pods with containers to read logs from
+POD_LOG_PHASES = ("Running", "Succeeded", "Failed")
+POD_LIVE_PHASES = ("Pending", "Running")
+
+
+class PodLogReader:
+    """
+    Thread following the log of one pod into a bounded queue.
+
+    When the queue is full the thread blocks, so a chatty pod can't outrun the consumer.
+    """
+
+    def __init__(
+        self,
+        pod_name: str,
+        stream: Callable[..., Any],
+        ready: queue.Queue,
+        queue_size: int,
+        logger: Logger,
+        **kwargs: Any,
+    ) -> None:
+        self.pod_name = pod_name
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self._stream = stream
+        self._ready = ready
+        self._logger = logger
+        self._kwargs = kwargs
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"pod-log-{pod_name}",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        "Detaches the pod, the thread exits after the next line of the log."
+        self.stopped.set()
+
+    def _put(self, line: Any) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(line, timeout=0.5)
+            except queue.Full:
+                continue
+            # a token for every line, so the consumer never waits on an empty queue
+            self._ready.put((self.pod_name, False))
+            return True
+        return False
+
+    def _run(self) -> None:
+        try:
+            for line in self._stream(pod_name=self.pod_name, **self._kwargs):
+                if not self._put(line):
+                    return
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            self._logger.info(f"log stream of {self.pod_name} ended: {e!r}")
+        finally:
+            # tokens are ordered, so all lines of the pod are consumed before this one
+            self._ready.put((self.pod_name, True))
+
+
+class LogMultiplexer:
+    """
+    Follows logs of all pods selected by a label selector and merges them into one iterator.
+
+    Pods are discovered every `discovery_interval_s` from the shared informer of the namespace \
+        (if there is one) or by listing pods. Every pod is followed once by its own PodLogReader \
+        as soon as its containers are started, so executors added by dynamic allocation are \
+        attached on the fly and detached when their logs end or they are removed.
+
+    Iteration ends when the log of `pod_name` (f.e. spark driver) and of all other attached pods \
+        have ended. Without `pod_name` it ends when no selected pods are pending or running.
+
+    Attributes:
+        namespace (str): namespace of the pods.
+        label_selector (str): selector of the pods, f.e. "sparkoperator.k8s.io/app-name=app".
+        pod_name (str | None): main pod, no new pods are attached after its log ended.
+        readers (dict[str, PodLogReader]): attached pods.
+    """
+
+    def __init__(
+        self,
+        api: ApiInterface,
+        stream: Callable[..., Any],
+        logger: Logger,
+        namespace: str,
+        label_selector: str,
+        pod_name: str | None = None,
+        informer: PodInformer | None = None,
+        queue_size: int = 1000,
+        discovery_interval_s: float = 5,
+        timeout_s: float = 3600,
+        **kwargs: Any,
+    ) -> None:
+        self.api = api
+        self.logger = logger
+        self.namespace = namespace
+        self.label_selector = label_selector
+        self.pod_name = pod_name
+        self.informer = informer
+        self.queue_size = queue_size
+        self.discovery_interval_s = discovery_interval_s
+        self.timeout_s = timeout_s
+        self.readers: dict[str, PodLogReader] = {}
+
+        self._stream = stream
+        self._kwargs = kwargs
+        self._ready = queue.Queue()
+        self._attached: set[str] = set()
+        self._main_ended = False
+
+    def __iter__(self) -> Generator[tuple[str, Any], None, None]:
+        deadline = time.monotonic() + self.timeout_s
+        next_discovery = 0.0
+        live = True
+        try:
+            while True:
+                now = time.monotonic()
+                if now > deadline:
+                    raise TimeoutError("pods logs streaming timeout")
+                if now >= next_discovery:
+                    live = self._discover()
+                    next_discovery = now + self.discovery_interval_s
+
+                if not self.readers and self._ended(live):
+                    return
+
+                try:
+                    pod_name, ended = self._ready.get(
+                        timeout=max(next_discovery - time.monotonic(), 0),
+                    )
+                except queue.Empty:
+                    continue
+
+                if ended:
+                    self._detach(pod_name)
+                    continue
+                yield pod_name, self.readers[pod_name].queue.get_nowait()
+        finally:
+            for reader in self.readers.values():
+                reader.stop()
+
+    def _ended(self, live: bool) -> bool:
+        if self.pod_name is not None:
+            return self._main_ended
+        return bool(self._attached) and not live
+
+    def _select(self) -> list["V1Pod"]:
+        if self.informer is not None and not self.informer.stopped:
+            return self.informer.select(self.label_selector)
+        return self.api.list_namespaced_pod(
+            namespace=self.namespace,
+            label_selector=self.label_selector,
+        ).items
+
+    def _discover(self) -> bool:
+        "Attaches new pods and detaches removed ones. Returns True if any pod is alive."
+        pods = {pod.metadata.name: pod.status.phase for pod in self._select()}
+
+        for pod_name, reader in list(self.readers.items()):
+            if pod_name not in pods:
+                reader.stop()
+
+        if not self._main_ended:
+            for pod_name, phase in pods.items():
+                if pod_name not in self._attached and phase in POD_LOG_PHASES:
+                    self._attach(pod_name)
+
+        return any(phase in POD_LIVE_PHASES for phase in pods.values())
+
+    def _attach(self, pod_name: str) -> None:
+        self.logger.info(f"attach log of pod {pod_name}")
+        reader = PodLogReader(
+            pod_name,
+            self._stream,
+            self._ready,
+            self.queue_size,
+            self.logger,
+            namespace=self.namespace,
+            timeout_s=self.timeout_s,
+            **self._kwargs,
+        )
+        self._attached.add(pod_name)
+        self.readers[pod_name] = reader
+        reader.start()
+
+    def _detach(self, pod_name: str) -> None:
+        self.logger.info(f"detach log of pod {pod_name}")
+        del self.readers[pod_name]
+        if pod_name == self.pod_name:
+            self._main_ended = True
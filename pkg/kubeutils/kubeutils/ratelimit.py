@@ -0,0 +1,257 @@
+"""
+Rate limiting for kubeutils
+"""
+
+import bisect
+import datetime
+import email.utils
+import itertools
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from kubeutils import _kubernetes
+
+if TYPE_CHECKING:
+    from kubernetes.client.rest import ApiException
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `burst` tokens at once.
+
+    Every caller reserves its tokens under the lock and sleeps outside of it until they are refilled, \
+        so waiting callers are served in order and never spin.
+
+    Attributes:
+        rate (float): tokens refilled per second, f.e. requests per second.
+        burst (float): bucket size, tokens available at once after idle time.
+
+    Methods:
+        acquire(tokens: float, timeout_s: float | None) -> float: Wait for tokens.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("token bucket rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1, timeout_s: float | None = None) -> float:
+        """
+        Takes tokens from the bucket, waiting until they are refilled.
+
+        Args:
+            tokens (float, optional): tokens to take. Defaults to 1.
+            timeout_s (float | None, optional): the longest wait. Defaults to None (no limit).
+
+        Raises:
+            TimeoutError: If the tokens can't be taken within timeout_s, nothing is taken then.
+
+        Returns:
+            float: seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            # negative tokens are reserved by the callers already waiting
+            wait_s = max(tokens - self._tokens, 0) / self.rate
+            if timeout_s is not None and wait_s > timeout_s:
+                raise TimeoutError("rate limit wait timeout")
+            self._tokens -= tokens
+
+        if wait_s:
+            time.sleep(wait_s)
+        return wait_s
+
+
+# priorities of API requests, every priority has its own budget
+PRIORITY_READ = "read"
+PRIORITY_MUTATION = "mutation"
+PRIORITY_WATCH = "watch"
+# qps and burst of every priority, f.e. client-go uses 5 and 10 for all requests
+DEFAULT_RATE_LIMITS = {
+    PRIORITY_READ: (20, 40),
+    PRIORITY_MUTATION: (10, 20),
+    PRIORITY_WATCH: (5, 10),
+}
+TOO_MANY_REQUESTS = 429
+# upper bounds of wait time histogram buckets, the last one is +Inf
+WAIT_BUCKETS_S = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+
+def retry_after_s(e: "ApiException") -> float | None:
+    """
+    Seconds from the Retry-After header of the response, None if there is no valid header.
+
+    The header is delay-seconds or an HTTP-date (RFC 9110), a date in the past is 0 seconds.
+    """
+    retry_after = (e.headers or {}).get("Retry-After", "").strip()
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        date = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((date - now).total_seconds(), 0.0)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with cumulative buckets, like a Prometheus histogram.
+
+    Attributes:
+        buckets (tuple[float, ...]): upper bounds of the buckets, +Inf is added.
+        count (int): number of observations.
+        sum (float): sum of observations.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = WAIT_BUCKETS_S) -> None:
+        self.buckets = (*buckets, math.inf)
+        self.count = 0
+        self.sum = 0.0
+        self._counts = [0] * len(self.buckets)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict:
+        "Cumulative counts by upper bound, count and sum."
+        with self._lock:
+            return {
+                "buckets": dict(zip(self.buckets, itertools.accumulate(self._counts))),
+                "count": self.count,
+                "sum": self.sum,
+            }
+
+
+class ApiRateLimiter:
+    """
+    Client-side limiter of API requests with a token bucket per priority.
+
+    Reads, mutations and watches (log streams included) have separate budgets, so a burst \
+        of polls can't delay a submission. When the API server answers 429 all priorities \
+        pause for its Retry-After and the request is retried, except mutations: they are \
+        retried by their callers only (f.e. KubeutilsV1.submit_many with its backoff and \
+        409 handling), so a throttled create is not sent up to max_retries times per retry.
+
+    One limiter is shared by all KubeApiV1 instances of the process, see `shared()`.
+
+    Attributes:
+        buckets (dict[str, TokenBucket]): token buckets by priority.
+        waits (dict[str, Histogram]): seconds requests waited for tokens by priority.
+        max_retries (int): retries of throttled (429) reads and watches.
+        throttled (int): number of 429 responses.
+
+    Methods:
+        shared() -> ApiRateLimiter: The limiter of the process.
+        acquire(priority: str) -> float: Wait for a request of the priority.
+        pause(seconds: float) -> None: Hold all requests.
+        call(priority: str, func: Callable, *args, **kwargs) -> Any: Rate limited request.
+        stats() -> dict: Wait time histograms and counters.
+    """
+
+    _shared: "ApiRateLimiter | None" = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        max_retries: int = 3,
+        default_retry_after_s: float = 1,
+        max_retry_after_s: float = 60,
+    ) -> None:
+        limits = {**DEFAULT_RATE_LIMITS, **(limits or {})}
+        self.buckets = {
+            priority: TokenBucket(qps, burst)
+            for priority, (qps, burst) in limits.items()
+        }
+        self.waits = {priority: Histogram() for priority in limits}
+        self.max_retries = max_retries
+        self.default_retry_after_s = default_retry_after_s
+        self.max_retry_after_s = max_retry_after_s
+        self.throttled = 0
+
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "ApiRateLimiter":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def acquire(self, priority: str) -> float:
+        """
+        Waits until a request of the priority may be sent.
+
+        Raises:
+            KeyError: If the priority is unknown.
+
+        Returns:
+            float: seconds waited, pauses after 429 included.
+        """
+        bucket = self.buckets[priority]
+        start = time.monotonic()
+        with self._lock:
+            paused_s = self._paused_until - start
+        if paused_s > 0:
+            time.sleep(paused_s)
+        bucket.acquire()
+
+        waited = time.monotonic() - start
+        self.waits[priority].observe(waited)
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        "Holds requests of all priorities for `seconds`, f.e. Retry-After of 429."
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def call(self, priority: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Sends the request when the budget allows, throttled requests are retried \
+            except mutations, which only pause all priorities.
+
+        Raises:
+            ApiException: Errors of the request, 429 after `max_retries` retries.
+        """
+        max_retries = 0 if priority == PRIORITY_MUTATION else self.max_retries
+        attempts = 0
+        while True:
+            self.acquire(priority)
+            try:
+                return func(*args, **kwargs)
+            except _kubernetes.ApiException as e:
+                if e.status != TOO_MANY_REQUESTS:
+                    raise
+                with self._lock:
+                    self.throttled += 1
+                attempts += 1
+                retry_after = retry_after_s(e) or self.default_retry_after_s
+                self.pause(min(retry_after, self.max_retry_after_s))
+                if attempts > max_retries:
+                    raise
+
+    def stats(self) -> dict:
+        return {
+            "throttled": self.throttled,
+            "waits": {priority: h.snapshot() for priority, h in self.waits.items()},
+        }
@@ -0,0 +1,301 @@
+"""
+SparkApplication manifest validation for kubeutils
+
+Schema validation requires `jsonschema` (`pip install kubeutils[validation]`),
+quantities and quotas are checked without it.
+"""
+
+import functools
+import importlib.resources as pkg_resources
+import json
+import math
+import re
+from typing import NamedTuple
+
+JSONSCHEMA_NOT_INSTALLED = "jsonschema is not installed. \
+    install kubeutils[validation]"
+
+# spark memory string (`512m`, `2g`) or kubernetes quantity (`2Gi`, `1.5G`)
+MEMORY_STRING = re.compile(r"^([0-9]*\.?[0-9]+)([a-zA-Z]*)$")
+MEMORY_UNITS = {
+    "": 1,
+    "b": 1,
+    **{f"{u}{s}": 1024**i for i, u in enumerate("kmgtp", 1) for s in ("", "b", "i")},
+}
+# units of the normalized spark memory strings, the largest exact one is used
+SPARK_MEMORY_UNITS = (
+    ("p", 1024**5),
+    ("t", 1024**4),
+    ("g", 1024**3),
+    ("m", 1024**2),
+    ("k", 1024),
+)
+# kubernetes quantity suffixes of ResourceQuota
+QUANTITY_STRING = re.compile(r"^([+-]?[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?)([a-zA-Z]*)$")
+QUANTITY_UNITS = {
+    "": 1,
+    "n": 1e-9,
+    "u": 1e-6,
+    "m": 1e-3,
+    "k": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+    "T": 1e12,
+    "P": 1e15,
+    "E": 1e18,
+    **{f"{u}i": 1024**i for i, u in enumerate("KMGTPE", 1)},
+}
+
+# spark reserves max(factor * memory, 384m) above the heap for every pod
+MIN_MEMORY_OVERHEAD = 384 * 1024**2
+MEMORY_OVERHEAD_FACTOR = 0.1
+NON_JVM_MEMORY_OVERHEAD_FACTOR = 0.4
+NON_JVM_TYPES = ("Python", "R")
+
+
+class ManifestValidationError(ValueError):
+    """
+    Raised when the manifest doesn't match the SparkApplication schema.
+
+    Attributes:
+        errors (list[str]): `path: message` of every error.
+    """
+
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+        super().__init__("invalid manifest: " + "; ".join(errors))
+
+
+class QuotaExceededError(ValueError):
+    "Raised when the application requests more than the namespace quota allows."
+
+
+class Resources(NamedTuple):
+    """
+    CPU and memory of pods.
+
+    Attributes:
+        cpu (float): cores.
+        memory (float): bytes, inf if unlimited.
+    """
+
+    cpu: float
+    memory: float
+
+
+def parse_memory(value: str | int) -> int:
+    """
+    Parses a spark memory string or a kubernetes memory quantity.
+
+    Units are binary in both notations: `512m`, `512mb` and `512Mi` are the same.
+
+    Args:
+        value (str | int): f.e. "512m", "2g", "1.5Gi" or a number of bytes.
+
+    Raises:
+        ValueError: If the value is not a memory string.
+
+    Returns:
+        int: bytes.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    match = MEMORY_STRING.match(str(value).strip())
+    unit = match and MEMORY_UNITS.get(match.group(2).lower())
+    if unit is None:
+        raise ValueError(f"invalid memory string {value!r}")
+    return math.ceil(float(match.group(1)) * unit)
+
+
+def format_memory(memory: int) -> str:
+    "Formats bytes as a spark memory string with the largest exact unit, f.e. 1536m."
+    for suffix, unit in SPARK_MEMORY_UNITS:
+        if memory >= unit and memory % unit == 0:
+            return f"{memory // unit}{suffix}"
+    # spark has no fractions, the rest is rounded up to kibibytes
+    return f"{math.ceil(memory / 1024)}k"
+
+
+def parse_quantity(value: str | int | float) -> float:
+    """
+    Parses a kubernetes quantity, f.e. "500m" cores or "10Gi" of memory.
+
+    Raises:
+        ValueError: If the value is not a quantity.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = QUANTITY_STRING.match(str(value).strip())
+    unit = match and QUANTITY_UNITS.get(match.group(2))
+    if unit is None:
+        raise ValueError(f"invalid quantity {value!r}")
+    return float(match.group(1)) * unit
+
+
+def normalize_quantities(manifest: dict) -> dict:
+    """
+    Rewrites memory of the driver and the executor as spark memory strings in place.
+
+    Kubernetes notation (`2Gi`) and fractions (`1.5g`) are not accepted by spark, \
+        they are converted to the same amount (`2g`, `1536m`).
+
+    Args:
+        manifest (dict): SparkApplication manifest.
+
+    Raises:
+        ValueError: If a memory string can't be parsed.
+
+    Returns:
+        dict: the same manifest.
+    """
+    spec = manifest.get("spec") or {}
+    for role in ("driver", "executor"):
+        pod = spec.get(role)
+        if not isinstance(pod, dict):
+            continue
+        for field in ("memory", "memoryOverhead"):
+            if pod.get(field) is None:
+                continue
+            try:
+                pod[field] = format_memory(parse_memory(pod[field]))
+            except ValueError as e:
+                raise ValueError(f"spec.{role}.{field}: {e}") from e
+    return manifest
+
+
+def _import_jsonschema():
+    try:
+        import jsonschema
+    except ImportError as e:
+        raise ImportError(JSONSCHEMA_NOT_INSTALLED) from e
+    return jsonschema
+
+
+@functools.lru_cache(maxsize=1)
+def _validator():
+    "Validator of the bundled schema, compiled once per process."
+    jsonschema = _import_jsonschema()
+    schema_file = pkg_resources.files("kubeutils.manifests").joinpath(
+        "sparkApplicationV1beta2.schema.json",
+    )
+    schema = json.loads(schema_file.read_text(encoding="utf-8"))
+    return jsonschema.Draft202012Validator(schema)
+
+
+def validate_manifest(manifest: dict) -> None:
+    """
+    Checks the manifest against the bundled SparkApplication v1beta2 schema.
+
+    The schema is a strict subset of the CRD: unknown fields of spec, driver, executor \
+        and deps are errors, so typos are caught before the operator silently drops them.
+
+    Args:
+        manifest (dict): SparkApplication manifest.
+
+    Raises:
+        ImportError: If jsonschema is not installed.
+        ManifestValidationError: With all errors of the manifest.
+    """
+    errors = sorted(
+        _validator().iter_errors(manifest),
+        key=lambda error: list(map(str, error.absolute_path)),
+    )
+    if errors:
+        raise ManifestValidationError(
+            [
+                f"{'.'.join(map(str, error.absolute_path)) or '<root>'}: {error.message}"
+                for error in errors
+            ],
+        )
+
+
+def pod_resources(manifest: dict, role: str) -> Resources:
+    """
+    Resources requested by one driver or executor pod, memory overhead included.
+
+    Args:
+        manifest (dict): SparkApplication manifest.
+        role (str): "driver" or "executor".
+
+    Returns:
+        Resources: cores and bytes of memory.
+    """
+    spec = manifest["spec"]
+    pod = spec.get(role) or {}
+    cpu = parse_quantity(pod.get("coreRequest") or pod.get("cores") or 1)
+    memory = parse_memory(pod.get("memory") or "1g")
+
+    if pod.get("memoryOverhead"):
+        overhead = parse_memory(pod["memoryOverhead"])
+    else:
+        overhead = max(
+            int(memory * _memory_overhead_factor(spec)),
+            MIN_MEMORY_OVERHEAD,
+        )
+    return Resources(cpu, memory + overhead)
+
+
+def heap_memory(manifest: dict, role: str, pod_memory: float) -> int:
+    """
+    Memory (`spec.{role}.memory`) of a driver or executor pod requesting `pod_memory`, \
+        the inverse of pod_resources: the heap plus the overhead spark adds on top of it.
+
+    Args:
+        manifest (dict): SparkApplication manifest, the overhead rules are taken from it.
+        role (str): "driver" or "executor".
+        pod_memory (float): bytes of the whole pod.
+
+    Returns:
+        int: bytes of the heap, 0 if the overhead alone exceeds `pod_memory`.
+    """
+    spec = manifest.get("spec") or {}
+    pod = spec.get(role) or {}
+    if pod.get("memoryOverhead"):
+        heap = pod_memory - parse_memory(pod["memoryOverhead"])
+    else:
+        # overhead is the factor of the heap, but not less than MIN_MEMORY_OVERHEAD
+        heap = min(
+            pod_memory / (1 + _memory_overhead_factor(spec)),
+            pod_memory - MIN_MEMORY_OVERHEAD,
+        )
+    return max(round(heap), 0)
+
+
+def _memory_overhead_factor(spec: dict) -> float:
+    factor = spec.get("memoryOverheadFactor")
+    if factor is None:
+        return (
+            NON_JVM_MEMORY_OVERHEAD_FACTOR
+            if spec.get("type") in NON_JVM_TYPES
+            else MEMORY_OVERHEAD_FACTOR
+        )
+    return float(factor)
+
+
+def requested_resources(manifest: dict, executors: int) -> Resources:
+    "Resources of the driver and `executors` executors."
+    driver = pod_resources(manifest, "driver")
+    executor = pod_resources(manifest, "executor")
+    return Resources(
+        driver.cpu + executor.cpu * executors,
+        driver.memory + executor.memory * executors,
+    )
+
+
+def check_quota(requested: Resources, quota: Resources) -> None:
+    """
+    Checks that the requested resources fit into the quota.
+
+    Raises:
+        QuotaExceededError: If cores or memory exceed the quota.
+    """
+    exceeded = []
+    if requested.cpu > quota.cpu:
+        exceeded.append(f"cpu {requested.cpu:g} > {quota.cpu:g}")
+    if requested.memory > quota.memory:
+        exceeded.append(
+            # quotas are parsed to float, the quota is finite as it is exceeded
+            f"memory {format_memory(requested.memory)} > {format_memory(int(quota.memory))}",
+        )
+    if exceeded:
+        raise QuotaExceededError("quota exceeded: " + ", ".join(exceeded))
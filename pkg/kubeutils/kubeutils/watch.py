@@ -0,0 +1,80 @@
+"""
+General watch interface for kubeutils
+"""
+
+import threading
+from typing import TYPE_CHECKING, Callable, Generator
+
+from interface import Interface, implements
+
+from kubeutils import _kubernetes
+
+if TYPE_CHECKING:
+    from kubernetes import watch
+
+# watch stream expired, list again to get a fresh resourceVersion
+WATCH_EXPIRED = 410
+
+
+class WatchInterface(Interface):
+    def stream(
+        self,
+        func: Callable,
+        return_type: str | None = None,
+        **kwargs,
+    ) -> Generator[dict, None, None]:
+        "stream k8s watch events produced by list function"
+
+    def stop(self) -> None:
+        "stop all active streams"
+
+
+class KubeWatch(implements(WatchInterface)):
+    """
+    KubeWatch class implementing the WatchInterface interface, providing watch streams over ApiInterface list methods.
+
+    Every call of `stream` uses its own kubernetes Watch, so one KubeWatch can be shared between threads.
+
+    Methods:
+        stream(func: Callable, return_type: str | None, **kwargs) -> Generator[dict, None, None]: Stream watch events.
+        stop() -> None: Stop all active streams.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._watches: set["watch.Watch"] = set()
+
+    def stream(
+        self,
+        func: Callable,
+        return_type: str | None = None,
+        **kwargs,
+    ) -> Generator[dict, None, None]:
+        """
+        Stream events of `func` called with `watch=True`.
+
+        Args:
+            func (Callable): list method, f.e. ApiInterface.list_namespaced_pod.
+            return_type (str | None): model name of the event object, f.e. "V1Pod". \
+                ApiInterface methods have no kubernetes docstrings, so it should be passed explicitly.
+            **kwargs: arguments passed to `func`.
+
+        Raises:
+            ApiException: If the watch expired (410 Gone) and `timeout_seconds` was passed.
+
+        Yields:
+            dict: event with 'type', 'object' and 'raw_object' keys
+        """
+        kube_watch = _kubernetes.watch.Watch(return_type=return_type)
+        with self._lock:
+            self._watches.add(kube_watch)
+        try:
+            yield from kube_watch.stream(func, **kwargs)
+        finally:
+            with self._lock:
+                self._watches.discard(kube_watch)
+
+    def stop(self) -> None:
+        with self._lock:
+            for kube_watch in self._watches:
+                kube_watch.stop()
@@ -0,0 +1,48 @@
+"""
+Fakes shared by the test modules
+"""
+
+import queue
+
+from kubernetes.client import V1ObjectMeta, V1Pod, V1PodStatus
+
+
+def make_pod(phase: str, resource_version: str = "1") -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(name="driver", resource_version=resource_version),
+        status=V1PodStatus(phase=phase),
+    )
+
+
+class LogResponse:
+    "Log stream response that drops the connection after the chunks if `error` is passed."
+
+    def __init__(self, *chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def stream(self, decode_content=False):
+        yield from self.chunks
+        if self.error:
+            raise self.error
+
+
+class QueueWatch:
+    "Watch stream fed by test events, blocks until the next event."
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.streams = 0
+        self.kwargs = []
+
+    def stream(self, func, return_type=None, **kwargs):
+        self.streams += 1
+        self.kwargs.append(kwargs)
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            yield event
+
+    def stop(self):
+        self.events.put(None)
@@ -0,0 +1,290 @@
+import asyncio
+import base64
+import inspect
+import unittest
+from logging import Logger
+from unittest.mock import AsyncMock, Mock
+
+from kubernetes.client import (
+    V1ListMeta,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodList,
+    V1PodStatus,
+    V1Secret,
+)
+from kubernetes.client.rest import ApiException
+
+from kubeutils.aio import AsyncApiInterface, AsyncKubeApi, AsyncKubeutils
+from kubeutils.api import ApiInterface
+
+LATENCY_S = 0.01
+LOG_LINES = [b"line 1\n", b"line 2\n", b"line 3\n"]
+
+
+def interface_methods(interface: type) -> dict[str, list[str]]:
+    "Public methods of the interface and their parameter names."
+    return {
+        name: list(inspect.signature(method).parameters)
+        for name, method in inspect.getmembers(interface, inspect.isfunction)
+        if not name.startswith("_")
+    }
+
+
+def make_pod(phase: str, resource_version: str = "1") -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(name="driver", resource_version=resource_version),
+        status=V1PodStatus(phase=phase),
+    )
+
+
+def make_secret(**data) -> V1Secret:
+    return V1Secret(
+        data={
+            key: base64.b64encode(value.encode()).decode("utf-8")
+            for key, value in data.items()
+        },
+    )
+
+
+class FakeStreamReader:
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __aiter__(self):
+        return self._lines()
+
+    async def _lines(self):
+        for line in self.lines:
+            await asyncio.sleep(0)
+            yield line
+
+
+class FakeAsyncResponse:
+    def __init__(self, lines):
+        self.content = FakeStreamReader(lines)
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeAsyncApi:
+    "Local fake of AsyncApiInterface: every call takes LATENCY_S."
+
+    def __init__(self, phase: str = "Running", pods: bool = True):
+        self.phase = phase
+        self.pods = pods
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _call(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(LATENCY_S)
+        finally:
+            self.in_flight -= 1
+
+    async def read_namespaced_secret(self, name, namespace, **kwargs):
+        await self._call()
+        return make_secret(key1="value1", key2="value2")
+
+    async def list_namespaced_pod(self, namespace, label_selector=None, **kwargs):
+        await self._call()
+        return V1PodList(
+            items=[make_pod(self.phase)] if self.pods else [],
+            metadata=V1ListMeta(resource_version="1"),
+        )
+
+    async def read_namespaced_pod(self, name, namespace, **kwargs):
+        await self._call()
+        return make_pod(self.phase)
+
+    async def read_namespaced_pod_log(self, name, namespace, **kwargs):
+        await self._call()
+        return FakeAsyncResponse(LOG_LINES)
+
+
+class FakeAsyncWatch:
+    def __init__(self, *streams):
+        self.streams = list(streams)
+
+    async def stream(self, func, return_type=None, **kwargs):
+        events = self.streams.pop(0)
+        if isinstance(events, Exception):
+            raise events
+        for event in events:
+            yield event
+
+
+class TestAsyncKubeutils(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.api = FakeAsyncApi()
+        self.kubeutils_instance = AsyncKubeutils.new(self.mock_logger, self.api)
+
+    async def test_download_secrets(self):
+        result = await self.kubeutils_instance.download_secrets(
+            {"namespace1": {"secret1": ["key1", "key2"]}},
+        )
+
+        self.assertEqual(
+            result,
+            [["namespace1", "key1", "value1"], ["namespace1", "key2", "value2"]],
+        )
+        self.assertEqual(self.api.calls, 1)
+
+    async def test_empty_secret_dict(self):
+        self.assertEqual(await self.kubeutils_instance.download_secrets({}), [])
+
+    async def test_get_pod_name(self):
+        result = await self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+        self.assertEqual(result, "driver")
+
+    async def test_get_pod_name_timeout(self):
+        self.api.pods = False
+
+        with self.assertRaises(TimeoutError):
+            await self.kubeutils_instance.get_pod_name(
+                "spark",
+                "app=a",
+                timeout_s=0.05,
+                poll_interval_s=0.01,
+            )
+
+    async def test_get_pod_name_from_watch_relists_on_expired_watch(self):
+        self.api.pods = False
+        self.kubeutils_instance.watch = FakeAsyncWatch(
+            ApiException(status=410),
+            [{"type": "ADDED", "object": make_pod("Pending")}],
+        )
+
+        result = await self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+        self.assertEqual(result, "driver")
+        self.assertEqual(self.api.calls, 2)
+
+    async def test_while_running_streams_log(self):
+        logs = await self.kubeutils_instance.while_running(
+            func=self.kubeutils_instance.stream_pod_log,
+            pending_timeout_s=1,
+            pod_name="driver",
+            namespace="spark",
+        )
+
+        self.assertEqual(
+            [line async for line in logs],
+            ["line 1\n", "line 2\n", "line 3\n"],
+        )
+
+    async def test_while_running_awaits_coroutine(self):
+        async def func(**kwargs):
+            return kwargs["pod_name"]
+
+        result = await self.kubeutils_instance.while_running(
+            func=func,
+            pending_timeout_s=1,
+            pod_name="driver",
+            namespace="spark",
+        )
+
+        self.assertEqual(result, "driver")
+
+    async def test_while_running_watch_failed(self):
+        self.api.phase = "Pending"
+        self.kubeutils_instance.watch = FakeAsyncWatch(
+            [{"type": "MODIFIED", "object": make_pod("Failed")}],
+        )
+
+        with self.assertRaises(ChildProcessError):
+            await self.kubeutils_instance.while_running(
+                func=Mock(),
+                pending_timeout_s=1,
+                pod_name="driver",
+                namespace="spark",
+            )
+
+    async def test_while_running_pending_timeout(self):
+        self.api.phase = "Pending"
+
+        with self.assertRaises(TimeoutError):
+            await self.kubeutils_instance.while_running(
+                func=Mock(),
+                pending_timeout_s=0.05,
+                poll_interval_s=0.01,
+                pod_name="driver",
+                namespace="spark",
+            )
+
+    async def test_applications_are_monitored_concurrently(self):
+        # wall time against the sync path is measured by benchmarks/bench_aio.py
+        applications = 50
+        secrets = {"prefect": {"secret1": ["key1", "key2"]}}
+
+        async def monitor(kutils):
+            await kutils.download_secrets(secrets)
+            pod_name = await kutils.get_pod_name("spark", "app=a")
+            logs = await kutils.while_running(
+                func=kutils.stream_pod_log,
+                pending_timeout_s=1,
+                pod_name=pod_name,
+                namespace="spark",
+            )
+            return [line async for line in logs]
+
+        results = await asyncio.gather(
+            *(monitor(self.kubeutils_instance) for _ in range(applications)),
+        )
+
+        self.assertEqual(len(results), applications)
+        self.assertTrue(all(len(logs) == len(LOG_LINES) for logs in results))
+        # every application waited for the API at the same time
+        self.assertGreaterEqual(self.api.max_in_flight, applications)
+
+
+class TestAsyncKubeApi(unittest.IsolatedAsyncioTestCase):
+    def test_same_methods_as_api_interface(self):
+        self.assertEqual(
+            interface_methods(AsyncApiInterface),
+            interface_methods(ApiInterface),
+        )
+
+    def test_methods_are_coroutines(self):
+        for name in interface_methods(AsyncApiInterface):
+            self.assertTrue(
+                inspect.iscoroutinefunction(getattr(AsyncKubeApi, name)), name
+            )
+
+    async def test_custom_objects_and_quotas(self):
+        api = AsyncKubeApi()
+        api._api_client = Mock()
+        api._core_v1_api = AsyncMock()
+        api._custom_objects_api = AsyncMock()
+        api._custom_objects_api.get_namespaced_custom_object.return_value = {
+            "status": {}
+        }
+
+        application = await api.get_namespaced_custom_object(
+            "sparkoperator.k8s.io",
+            "v1beta2",
+            "spark",
+            "sparkapplications",
+            "app",
+        )
+        await api.list_namespaced_resource_quota("spark")
+
+        self.assertEqual(application, {"status": {}})
+        api._custom_objects_api.get_namespaced_custom_object.assert_awaited_once_with(
+            group="sparkoperator.k8s.io",
+            version="v1beta2",
+            namespace="spark",
+            plural="sparkapplications",
+            name="app",
+        )
+        api._core_v1_api.list_namespaced_resource_quota.assert_awaited_once_with(
+            namespace="spark",
+        )
@@ -1,9 +1,16 @@
 import unittest
 from unittest.mock import patch, Mock
 
-from kubernetes.client import V1Secret, V1Pod, V1PodList
+from kubernetes.client import Configuration, V1Secret, V1SecretList, V1Pod, V1PodList
 
 from kubeutils.api import KubeApiV1
+from kubeutils.client import ClientConfig
+from kubeutils.ratelimit import (
+    PRIORITY_MUTATION,
+    PRIORITY_READ,
+    PRIORITY_WATCH,
+    ApiRateLimiter,
+)
 from kubeutils.application import ApplicationInterface
 
 
@@ -21,6 +28,19 @@ class TestKubeApiV1(unittest.TestCase):
 
         assert isinstance(result, V1Secret)
 
+    @patch.object(KubeApiV1, "list_namespaced_secret")
+    def test_list_namespaced_secret(self, mocked_secret):
+        mocked_secret.return_value = V1SecretList(items=[V1Secret()])
+
+        result = self.api.list_namespaced_secret(
+            namespace="default",
+            label_selector="selector",
+        )
+
+        mocked_secret.assert_called_once()
+
+        assert isinstance(result, V1SecretList)
+
     @patch.object(KubeApiV1, "read_namespaced_pod")
     def test_read_namespaced_pod(self, mocked_secret):
         mocked_secret.return_value = V1Pod()
@@ -77,6 +97,116 @@ class TestKubeApiV1(unittest.TestCase):
             application=application,
         )
 
+    def test_list_and_get_custom_objects(self):
+        self.api._custom_objects_api = Mock()
+        kwargs = {
+            "group": "sparkoperator.k8s.io",
+            "version": "v1beta2",
+            "namespace": "default",
+            "plural": "sparkapplications",
+        }
+
+        self.api.list_namespaced_custom_object(**kwargs, field_selector="f")
+        self.api.get_namespaced_custom_object(**kwargs, name="app")
+
+        self.api.custom_objects_api.list_namespaced_custom_object.assert_called_once_with(
+            **kwargs,
+            field_selector="f",
+            _request_timeout=(5, 60),
+        )
+        self.api.custom_objects_api.get_namespaced_custom_object.assert_called_once_with(
+            **kwargs,
+            name="app",
+            _request_timeout=(5, 60),
+        )
+
+    def test_list_namespaced_resource_quota(self):
+        self.api._core_v1_api = Mock()
+
+        self.api.list_namespaced_resource_quota(namespace="spark")
+
+        self.api.core_v1_api.list_namespaced_resource_quota.assert_called_once_with(
+            namespace="spark",
+            _request_timeout=(5, 60),
+        )
+
+    def test_request_timeouts(self):
+        self.api = KubeApiV1(ClientConfig(connect_timeout_s=1, read_timeout_s=10))
+        self.api._core_v1_api = Mock()
+
+        self.api.read_namespaced_pod(name="pod", namespace="spark")
+        self.api.read_namespaced_pod_log(
+            name="pod",
+            namespace="spark",
+            follow=True,
+            _preload_content=False,
+        )
+        self.api.list_namespaced_pod(namespace="spark", watch=True)
+        self.api.read_namespaced_secret(
+            name="secret",
+            namespace="spark",
+            _request_timeout=3,
+        )
+
+        core_v1_api = self.api.core_v1_api
+        self.assertEqual(
+            core_v1_api.read_namespaced_pod.call_args.kwargs["_request_timeout"],
+            (1, 10),
+        )
+        # silent streams are not cut by the read timeout
+        self.assertEqual(
+            core_v1_api.read_namespaced_pod_log.call_args.kwargs["_request_timeout"],
+            (1, None),
+        )
+        self.assertEqual(
+            core_v1_api.list_namespaced_pod.call_args.kwargs["_request_timeout"],
+            (1, None),
+        )
+        self.assertEqual(
+            core_v1_api.read_namespaced_secret.call_args.kwargs["_request_timeout"],
+            3,
+        )
+
+    def test_request_priorities(self):
+        limiter = Mock(spec=ApiRateLimiter)
+        self.api = KubeApiV1(rate_limiter=limiter)
+        self.api._core_v1_api = Mock()
+        self.api._custom_objects_api = Mock()
+
+        self.api.read_namespaced_pod(name="pod", namespace="spark")
+        self.api.read_namespaced_pod_log(name="pod", namespace="spark", follow=True)
+        self.api.create_namespaced_custom_object(
+            group="sparkoperator.k8s.io",
+            version="v1beta2",
+            namespace="spark",
+            plural="sparkapplications",
+            application=Mock(return_value={}),
+        )
+
+        self.assertEqual(
+            [call.args[:2] for call in limiter.call.call_args_list],
+            [
+                (PRIORITY_READ, self.api.core_v1_api.read_namespaced_pod),
+                (PRIORITY_WATCH, self.api.core_v1_api.read_namespaced_pod_log),
+                (
+                    PRIORITY_MUTATION,
+                    self.api.custom_objects_api.create_namespaced_custom_object,
+                ),
+            ],
+        )
+
+    def test_instances_share_the_limiter(self):
+        self.assertIs(KubeApiV1().rate_limiter, self.api.rate_limiter)
+
+    def test_api_objects_share_one_client(self):
+        self.assertIs(self.api.core_v1_api.api_client, self.api.api_client)
+        self.assertIs(self.api.custom_objects_api.api_client, self.api.api_client)
+
+    def test_configuration(self):
+        api = KubeApiV1(configuration=Configuration(host="http://127.0.0.1:8001"))
+
+        self.assertEqual(api.api_client.configuration.host, "http://127.0.0.1:8001")
+
     @patch.object(
         KubeApiV1,
         "list_pod_for_all_namespaces",
@@ -169,6 +169,73 @@ class TestSparkApplicationV1(unittest.TestCase):
 
         # define_app_name sets the name in manifest metadata when manifest is present
 
+    def test_from_template_with_patch(self):
+        dirpath = tempfile.mkdtemp()
+        based_path = os.path.join(dirpath, "based.yaml")
+        app_path = os.path.join(dirpath, "app.yaml")
+        with open(based_path, "w") as file:
+            yaml.dump({"metadata": {"name": None}, "spec": {"type": "Python"}}, file)
+        with open(app_path, "w") as file:
+            yaml.dump({"spec": {"mainApplicationFile": ""}}, file)
+
+        application = SparkApplicationV1.from_template(
+            based_path,
+            app_path,
+            patch={"metadata": {"name": "app"}},
+        )
+        application.patch({"spec": {"mainApplicationFile": "s3a://spark/app.py"}})
+
+        self.assertEqual(
+            application(),
+            {
+                "metadata": {"name": "app"},
+                "spec": {"type": "Python", "mainApplicationFile": "s3a://spark/app.py"},
+            },
+        )
+        # the next application gets the template, not the patched manifest
+        self.assertIsNone(
+            SparkApplicationV1.from_template(based_path, app_path).manifest["metadata"][
+                "name"
+            ],
+        )
+
+        shutil.rmtree(dirpath)
+
+    def test_merge_manifest_does_not_write_files(self):
+        dirpath = tempfile.mkdtemp()
+        based_path = os.path.join(dirpath, "based.yaml")
+        app_path = os.path.join(dirpath, "app.yaml")
+        with open(based_path, "w") as file:
+            yaml.dump({"spec": {"driver": {"ex": 1, "name": "a"}}}, file)
+        with open(app_path, "w") as file:
+            yaml.dump({"spec": {"driver": {"ex": 3}}}, file)
+        with open(app_path) as file:
+            app_text = file.read()
+
+        application = SparkApplicationV1()
+        merged = application.merge_manifest(app_path, based_path)
+
+        self.assertEqual(merged, {"spec": {"driver": {"ex": 3, "name": "a"}}})
+        self.assertIs(application.manifest, merged)
+        with open(app_path) as file:
+            self.assertEqual(file.read(), app_text)
+
+        shutil.rmtree(dirpath)
+
+    def test_define_py_files(self):
+        application = SparkApplicationV1.default()
+
+        application.define_py_files(["s3a://spark/deps/abc.zip"])
+
+        self.assertEqual(
+            application.manifest["spec"]["deps"]["pyFiles"],
+            ["s3a://spark/deps/abc.zip"],
+        )
+
+    def test_define_py_files_without_manifest(self):
+        with self.assertRaises(TimeoutError):
+            SparkApplicationV1().define_py_files(["s3a://spark/deps/abc.zip"])
+
     # define_container_volumes sets volumes in manifest when manifest is present
     def test_define_container_volumes_sets_volumes(self):
         class MockSparkApplicationV1:
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zipfile
+
+from kubeutils.bundle import build_bundle, find_packages
+
+
+class TestBuildBundle(unittest.TestCase):
+    def setUp(self) -> None:
+        self.source_dir = tempfile.mkdtemp()
+        self.output_dir = tempfile.mkdtemp()
+        for path, content in (
+            ("helpers/__init__.py", ""),
+            ("helpers/io.py", "def read(): ...\n"),
+            ("helpers/sql/__init__.py", ""),
+            ("helpers/__pycache__/io.cpython-310.pyc", "junk"),
+            ("not_package/module.py", ""),
+            ("spark_application.py", "import helpers\n"),
+        ):
+            path = os.path.join(self.source_dir, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fh:
+                fh.write(content)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(self.output_dir)
+
+    def test_find_packages(self):
+        self.assertEqual(find_packages(self.source_dir), ["helpers"])
+
+    def test_bundle_content(self):
+        output = os.path.join(self.output_dir, "deps.zip")
+
+        build_bundle(self.source_dir, output)
+
+        with zipfile.ZipFile(output) as bundle:
+            self.assertEqual(
+                bundle.namelist(),
+                ["helpers/__init__.py", "helpers/io.py", "helpers/sql/__init__.py"],
+            )
+            self.assertEqual(bundle.read("helpers/io.py"), b"def read(): ...\n")
+
+    def test_hash_is_reproducible(self):
+        first = build_bundle(self.source_dir, os.path.join(self.output_dir, "1.zip"))
+        # a fresh checkout has other mtimes
+        later = time.time() + 3600
+        for root, _, names in os.walk(self.source_dir):
+            for name in names:
+                os.utime(os.path.join(root, name), (later, later))
+        second = build_bundle(self.source_dir, os.path.join(self.output_dir, "2.zip"))
+
+        self.assertEqual(first, second)
+
+    def test_hash_changes_with_content(self):
+        first = build_bundle(self.source_dir, os.path.join(self.output_dir, "1.zip"))
+        with open(os.path.join(self.source_dir, "helpers/io.py"), "a") as fh:
+            fh.write("# changed\n")
+
+        second = build_bundle(self.source_dir, os.path.join(self.output_dir, "2.zip"))
+
+        self.assertNotEqual(first, second)
+
+    def test_no_packages(self):
+        output = os.path.join(self.output_dir, "deps.zip")
+
+        self.assertIsNone(build_bundle(self.source_dir, output, packages=[]))
+        self.assertFalse(os.path.exists(output))
@@ -0,0 +1,119 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from kubernetes.client import V1ObjectMeta, V1Secret
+
+from kubeutils.api import ApiInterface
+from kubeutils.cache import SecretCache
+from tests.fakes import QueueWatch
+
+
+def make_secret(name: str, resource_version: str = "1") -> V1Secret:
+    return V1Secret(
+        metadata=V1ObjectMeta(name=name, resource_version=resource_version),
+        data={"key": "dmFsdWU="},
+    )
+
+
+class TestSecretCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = SecretCache(ttl_s=10, max_entries=2)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get("prefect", "s3-secret"))
+
+        secret = make_secret("s3-secret")
+        self.cache.put("prefect", "s3-secret", secret)
+
+        self.assertIs(self.cache.get("prefect", "s3-secret"), secret)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    @patch("kubeutils.cache.time.monotonic")
+    def test_ttl_expiry_without_watch(self, mocked_monotonic):
+        mocked_monotonic.return_value = 0
+        self.cache.put("prefect", "s3-secret", make_secret("s3-secret"))
+
+        mocked_monotonic.return_value = 11
+
+        self.assertIsNone(self.cache.get("prefect", "s3-secret"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_lru_eviction(self):
+        for name in ("a", "b"):
+            self.cache.put("prefect", name, make_secret(name))
+        # "a" becomes the most recently used
+        self.cache.get("prefect", "a")
+        self.cache.put("prefect", "c", make_secret("c"))
+
+        self.assertIsNone(self.cache.get("prefect", "b"))
+        self.assertIsNotNone(self.cache.get("prefect", "a"))
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_invalidate(self):
+        self.cache.put("prefect", "a", make_secret("a"))
+        self.cache.put("other", "b", make_secret("b"))
+
+        self.cache.invalidate("prefect")
+
+        self.assertEqual(self.cache.stats()["size"], 1)
+        self.assertIsNone(self.cache.get("prefect", "a"))
+
+
+class TestSecretCacheWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.watch = QueueWatch()
+        self.cache = SecretCache(
+            api=Mock(spec=ApiInterface),
+            watch=self.watch,
+            ttl_s=10,
+        )
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self.watch.stop()
+
+    def wait_for_stream(self):
+        deadline = time.monotonic() + 5
+        while not self.watch.streams and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_only_cached_secret_is_watched(self):
+        self.cache.put("prefect", "s3-secret", make_secret("s3-secret", "5"))
+        self.wait_for_stream()
+
+        self.assertEqual(self.watch.kwargs[0]["namespace"], "prefect")
+        self.assertEqual(
+            self.watch.kwargs[0]["field_selector"],
+            "metadata.name=s3-secret",
+        )
+        self.assertEqual(self.watch.kwargs[0]["resource_version"], "5")
+
+    @patch("kubeutils.cache.time.monotonic")
+    def test_expired_entry_revalidated_by_watch(self, mocked_monotonic):
+        mocked_monotonic.return_value = 0
+        secret = make_secret("s3-secret", "5")
+        self.cache.put("prefect", "s3-secret", secret)
+        self.wait_for_stream()
+
+        mocked_monotonic.return_value = 11
+
+        self.assertIs(self.cache.get("prefect", "s3-secret"), secret)
+        self.assertEqual(self.cache.revalidations, 1)
+
+    def test_changed_version_marks_entry_stale(self):
+        self.cache.put("prefect", "s3-secret", make_secret("s3-secret", "5"))
+        self.wait_for_stream()
+
+        self.watch.events.put(
+            {"type": "MODIFIED", "object": make_secret("other", "6")},
+        )
+        self.watch.events.put(
+            {"type": "MODIFIED", "object": make_secret("s3-secret", "7")},
+        )
+        deadline = time.monotonic() + 5
+        while self.cache.get("prefect", "s3-secret") and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertIsNone(self.cache.get("prefect", "s3-secret"))
@@ -0,0 +1,104 @@
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from kubernetes.client import Configuration
+
+from kubeutils.client import (
+    ClientConfig,
+    PoolMetrics,
+    build_api_client,
+    received_bytes,
+)
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientConfig(unittest.TestCase):
+    def test_keep_alive_socket_options(self):
+        options = ClientConfig(keep_alive_idle_s=30).socket_options()
+
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            self.assertIn((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30), options)
+
+    def test_keep_alive_disabled(self):
+        options = ClientConfig(keep_alive_idle_s=None).socket_options()
+
+        self.assertNotIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), options)
+
+    def test_retry_policy(self):
+        retry = ClientConfig(retries=2, retry_backoff_s=0.1).retry()
+
+        self.assertEqual(retry.total, 2)
+        self.assertEqual(retry.backoff_factor, 0.1)
+        self.assertNotIn(429, retry.status_forcelist)
+        # the response of the last attempt is raised as ApiException
+        self.assertFalse(retry.raise_on_status)
+
+
+class TestPooledApiClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.configuration = Configuration(
+            host=f"http://127.0.0.1:{self.server.server_port}",
+        )
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pool_settings(self):
+        api_client = build_api_client(
+            ClientConfig(pool_maxsize=7, pool_block=True),
+            PoolMetrics(),
+            self.configuration,
+        )
+
+        pool_manager = api_client.rest_client.pool_manager
+        self.assertEqual(pool_manager.connection_pool_kw["maxsize"], 7)
+        self.assertTrue(pool_manager.connection_pool_kw["block"])
+
+    def test_connections_are_reused(self):
+        metrics = PoolMetrics()
+        api_client = build_api_client(ClientConfig(), metrics, self.configuration)
+
+        for _ in range(4):
+            api_client.rest_client.request(
+                "GET",
+                f"{self.configuration.host}/api/v1/namespaces",
+            )
+
+        stats = metrics.stats()
+        self.assertEqual(stats["checkouts"], 4)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reuse_ratio"], 0.75)
+        self.assertGreaterEqual(stats["checkout_wait_max_s"], 0)
+
+    def test_received_bytes(self):
+        api_client = build_api_client(ClientConfig(), PoolMetrics(), self.configuration)
+        url = f"{self.configuration.host}/api/v1/namespaces"
+        received = received_bytes()
+
+        api_client.rest_client.request("GET", url)
+        # streamed bodies are counted by their readers
+        api_client.rest_client.request(
+            "GET", url, _preload_content=False
+        ).release_conn()
+
+        self.assertEqual(received_bytes() - received, 2)
@@ -0,0 +1,35 @@
+import unittest
+
+from kubeutils.framing import LineFramer
+
+
+class TestLineFramer(unittest.TestCase):
+    def test_feed_keeps_partial_line(self):
+        framer = LineFramer()
+
+        self.assertEqual(framer.feed(b"a\nb"), ["a"])
+        self.assertEqual(framer.feed(b"c"), [])
+        self.assertEqual(framer.feed(b"d\n\ne\n"), ["bcd", "", "e"])
+        self.assertEqual(framer.flush(), [])
+
+    def test_split_utf8_character(self):
+        framer = LineFramer()
+        data = "ошибка\n".encode()
+
+        lines = [
+            line for i in range(len(data)) for line in framer.feed(data[i : i + 1])
+        ]
+
+        self.assertEqual(lines, ["ошибка"])
+
+    def test_bytes_mode(self):
+        framer = LineFramer(decode=False)
+
+        self.assertEqual(framer.feed(b"a\nb"), [b"a"])
+        self.assertEqual(framer.flush(), [b"b"])
+        self.assertEqual(framer.flush(), [])
+
+    def test_invalid_bytes_replaced(self):
+        framer = LineFramer()
+
+        self.assertEqual(framer.feed(b"\xff\n"), ["�"])
@@ -0,0 +1,202 @@
+import time
+import unittest
+from logging import Logger
+from unittest.mock import Mock
+
+from kubeutils.api import ApiInterface
+from kubeutils.application import SparkApplicationV1
+from kubeutils.history import ResourceSampler, RunHistory, RunRecord
+from kubeutils.validation import pod_resources
+
+GIB = 1024**3
+
+
+def make_run(
+    started_at: float,
+    peak_executors: int = 4,
+    executor_peak_memory: int = GIB,
+    wall_time_s: float = 600,
+    succeeded: bool = True,
+) -> RunRecord:
+    return RunRecord(
+        deployment="etl",
+        script="spark_application.py",
+        started_at=started_at,
+        wall_time_s=wall_time_s,
+        succeeded=succeeded,
+        peak_executors=peak_executors,
+        driver_peak_memory=GIB // 2,
+        executor_peak_memory=executor_peak_memory,
+    )
+
+
+def make_pod_metrics(name: str, role: str, memory: str) -> dict:
+    return {
+        "metadata": {"name": name, "labels": {"spark-role": role}},
+        "containers": [{"name": "spark", "usage": {"cpu": "500m", "memory": memory}}],
+    }
+
+
+class TestRunHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.history = RunHistory(":memory:")
+
+    def tearDown(self) -> None:
+        self.history.close()
+
+    def test_runs_newest_first(self):
+        for started_at in (1, 3, 2):
+            self.history.record(make_run(started_at))
+        self.history.record(make_run(4)._replace(script="other.py"))
+
+        runs = self.history.runs("etl", "spark_application.py")
+
+        self.assertEqual([run.started_at for run in runs], [3, 2, 1])
+        self.assertEqual(runs[0], make_run(3))
+
+    def test_not_enough_runs(self):
+        self.history.record(make_run(1))
+        self.history.record(make_run(2, succeeded=False))
+
+        self.assertIsNone(
+            self.history.suggest_resources("etl", "spark_application.py", min_runs=2),
+        )
+
+    def test_suggest_resources(self):
+        self.history.record(make_run(1, peak_executors=3, executor_peak_memory=GIB))
+        self.history.record(make_run(2, peak_executors=2, executor_peak_memory=2 * GIB))
+        # failed runs are not taken into account
+        self.history.record(make_run(3, peak_executors=10, succeeded=False))
+
+        patch = self.history.suggest_resources(
+            "etl",
+            "spark_application.py",
+            min_runs=2,
+            headroom=1.25,
+        )
+
+        self.assertEqual(
+            patch,
+            {
+                "spec": {
+                    # heap of a JVM pod: peak * headroom less max(0.1 of heap, 384m)
+                    "driver": {"memory": "256m"},
+                    "executor": {"memory": "2176m", "instances": 3},
+                },
+            },
+        )
+
+    def test_dynamic_allocation(self):
+        for started_at in (1, 2, 3):
+            self.history.record(make_run(started_at, peak_executors=5))
+        manifest = {
+            "spec": {"sparkConf": {"spark.dynamicAllocation.maxExecutors": "20"}},
+        }
+
+        patch = self.history.suggest_resources(
+            "etl",
+            "spark_application.py",
+            manifest=manifest,
+        )
+
+        self.assertEqual(
+            patch["spec"]["sparkConf"],
+            {"spark.dynamicAllocation.maxExecutors": "5"},
+        )
+        self.assertNotIn("instances", patch["spec"]["executor"])
+
+    def test_executors_are_kept_if_sla_missed(self):
+        for started_at in (1, 2, 3):
+            self.history.record(make_run(started_at, peak_executors=2, wall_time_s=900))
+
+        patch = self.history.suggest_resources(
+            "etl",
+            "spark_application.py",
+            sla_s=800,
+        )
+
+        self.assertNotIn("instances", patch["spec"]["executor"])
+
+    def test_auto_tune_application(self):
+        for started_at in (1, 2, 3):
+            self.history.record(make_run(started_at, peak_executors=2))
+        application = SparkApplicationV1.default()
+
+        patch = application.auto_tune(self.history, "etl", "spark_application.py")
+
+        self.assertIsNotNone(patch)
+        self.assertEqual(application.manifest["spec"]["executor"]["instances"], 2)
+        # 1g peak * 1.25 headroom is the pod, python overhead is 384m
+        self.assertEqual(application.manifest["spec"]["executor"]["memory"], "896m")
+        # the rest of the manifest is kept
+        self.assertEqual(application.manifest["spec"]["executor"]["cores"], 1)
+
+    def test_right_sized_application_is_kept(self):
+        application = SparkApplicationV1.default()
+        # 512m heap of a python pod requests 896m, the peak uses all of it with headroom
+        pod_memory = pod_resources(application.manifest, "executor").memory
+        for started_at in (1, 2, 3):
+            self.history.record(
+                make_run(
+                    started_at,
+                    peak_executors=1,
+                    executor_peak_memory=int(pod_memory / 1.25),
+                ),
+            )
+
+        application.auto_tune(self.history, "etl", "spark_application.py")
+
+        self.assertEqual(application.manifest["spec"]["executor"]["memory"], "512m")
+        self.assertEqual(
+            pod_resources(application.manifest, "executor").memory,
+            pod_memory,
+        )
+
+
+class TestResourceSampler(unittest.TestCase):
+    def test_keeps_peaks(self):
+        api = Mock(spec=ApiInterface)
+        api.list_namespaced_custom_object.side_effect = [
+            {
+                "items": [
+                    make_pod_metrics("driver", "driver", "300Mi"),
+                    make_pod_metrics("exec-1", "executor", "1Gi"),
+                ],
+            },
+            {
+                "items": [
+                    make_pod_metrics("driver", "driver", "200Mi"),
+                    make_pod_metrics("exec-1", "executor", "512Mi"),
+                    make_pod_metrics("exec-2", "executor", "700Mi"),
+                ],
+            },
+        ]
+        sampler = ResourceSampler(api, Mock(spec=Logger), "spark", "app-name=app")
+
+        sampler.sample()
+        sampler.sample()
+        run = sampler.record("etl", "spark_application.py", succeeded=True)
+
+        self.assertEqual(run.peak_executors, 2)
+        self.assertEqual(run.driver_peak_memory, 300 * 1024**2)
+        self.assertEqual(run.executor_peak_memory, GIB)
+        api.list_namespaced_custom_object.assert_called_with(
+            group="metrics.k8s.io",
+            version="v1beta1",
+            namespace="spark",
+            plural="pods",
+            label_selector="app-name=app",
+        )
+
+    def test_errors_do_not_stop_sampling(self):
+        api = Mock(spec=ApiInterface)
+        api.list_namespaced_custom_object.side_effect = RuntimeError("no metrics")
+        logger = Mock(spec=Logger)
+        sampler = ResourceSampler(api, logger, "spark", "app-name=app", interval_s=0.01)
+
+        sampler.start()
+        time.sleep(0.05)
+        sampler.stop()
+
+        self.assertGreater(api.list_namespaced_custom_object.call_count, 1)
+        self.assertEqual(sampler.peak_executors, 0)
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import unittest
+
+# `import kubeutils.kube` takes ~0.1 s, with the kubernetes client it took ~0.5 s
+IMPORT_BUDGET_S = 0.25
+HEAVY_MODULES = ("kubernetes", "urllib3", "yaml", "http.server")
+RUNS = 3
+
+
+def import_time_s(module: str) -> tuple[float, set[str]]:
+    "Cumulative seconds of `import module` in a fresh interpreter and the modules it loaded."
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules, seconds = set(), 0.0
+    for line in result.stderr.splitlines():
+        if "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        if name.strip() == module:
+            seconds = int(cumulative) / 1e6
+    return seconds, modules
+
+
+class TestImport(unittest.TestCase):
+    def test_heavy_modules_deferred(self):
+        for module in ("kubeutils.kube", "kubeutils.api", "kubeutils.application"):
+            _, modules = import_time_s(module)
+            self.assertFalse(
+                modules.intersection(HEAVY_MODULES),
+                f"{module} imports {modules.intersection(HEAVY_MODULES)}",
+            )
+
+    def test_import_budget(self):
+        # the fastest of several runs, the first one can be slowed down by cold caches
+        seconds = min(import_time_s("kubeutils.kube")[0] for _ in range(RUNS))
+
+        self.assertGreater(seconds, 0)
+        self.assertLess(seconds, IMPORT_BUDGET_S)
@@ -0,0 +1,132 @@
+import threading
+import unittest
+from unittest.mock import Mock
+
+from kubernetes.client import (
+    V1ListMeta,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodList,
+    V1PodStatus,
+)
+
+from kubeutils.api import ApiInterface
+from kubeutils.informer import PodInformer, match_labels, parse_label_selector
+from tests.fakes import QueueWatch
+
+
+def make_pod(name: str, phase: str = "Pending", **labels) -> V1Pod:
+    return V1Pod(
+        metadata=V1ObjectMeta(name=name, labels=labels),
+        status=V1PodStatus(phase=phase),
+    )
+
+
+class TestLabelSelector(unittest.TestCase):
+    def test_parse_label_selector(self):
+        equals, others = parse_label_selector(
+            "spark-role=driver, app==a,sparkoperator.k8s.io/app-name,env!=test",
+        )
+
+        self.assertEqual(equals, {"spark-role": "driver", "app": "a"})
+        self.assertEqual(others, ["sparkoperator.k8s.io/app-name", "env!=test"])
+
+    def test_match_labels(self):
+        labels = {"app": "a", "env": "prod"}
+
+        self.assertTrue(match_labels(labels, ["app", "env!=test", "!debug"]))
+        self.assertFalse(match_labels(labels, ["missing"]))
+        self.assertFalse(match_labels(labels, ["env!=prod"]))
+        self.assertFalse(match_labels(labels, ["!app"]))
+
+
+class TestPodInformer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_api.list_namespaced_pod.return_value = V1PodList(
+            items=[make_pod("driver-a", "Running", app="a", role="driver")],
+            metadata=V1ListMeta(resource_version="10"),
+        )
+        self.watch = QueueWatch()
+        self.informer = PodInformer.acquire(self.mock_api, self.watch, "spark")
+
+    def tearDown(self) -> None:
+        while not self.informer.stopped:
+            self.informer.release()
+        self.watch.stop()
+
+    def test_acquire_shares_one_informer(self):
+        other = PodInformer.acquire(self.mock_api, self.watch, "spark")
+        self.assertIs(other, self.informer)
+
+        other.release()
+        self.assertFalse(self.informer.stopped)
+
+        self.informer.release()
+        self.assertTrue(self.informer.stopped)
+        restarted = PodInformer.acquire(self.mock_api, self.watch, "spark")
+        self.assertIsNot(restarted, self.informer)
+        restarted.release()
+
+    def test_lookups_from_list(self):
+        self.informer.wait_for(lambda: True, timeout_s=1)
+
+        self.assertEqual(self.informer.get("driver-a").status.phase, "Running")
+        self.assertEqual(
+            [pod.metadata.name for pod in self.informer.select("app=a,role")],
+            ["driver-a"],
+        )
+        self.assertEqual(self.informer.select("app=b"), [])
+        self.mock_api.list_namespaced_pod.assert_called_once()
+
+    def test_wait_for_pod_from_watch(self):
+        threading.Timer(
+            0.05,
+            self.watch.events.put,
+            args=({"type": "ADDED", "object": make_pod("driver-b", app="b")},),
+        ).start()
+
+        pods = self.informer.wait_for(
+            lambda: self.informer.select("app=b"),
+            timeout_s=5,
+        )
+
+        self.assertEqual(pods[0].metadata.name, "driver-b")
+
+    def test_wait_for_timeout(self):
+        self.assertIsNone(
+            self.informer.wait_for(lambda: self.informer.get("missing"), 0.05),
+        )
+
+    def test_deleted_pod_leaves_index(self):
+        self.informer.wait_for(lambda: True, timeout_s=1)
+        self.watch.events.put(
+            {"type": "DELETED", "object": make_pod("driver-a", app="a")},
+        )
+
+        self.informer.wait_for(lambda: not self.informer.get("driver-a"), 5)
+
+        self.assertEqual(self.informer.select("app=a"), [])
+
+    def test_phases(self):
+        self.mock_api.list_namespaced_pod.return_value = V1PodList(
+            items=[make_pod("driver-c", "Pending")],
+            metadata=V1ListMeta(resource_version="10"),
+        )
+        watch = QueueWatch()
+        informer = PodInformer.acquire(self.mock_api, watch, "other")
+        phases = informer.phases("driver-c", timeout_s=5)
+
+        self.assertEqual(next(phases), "Pending")
+        watch.events.put(
+            {"type": "MODIFIED", "object": make_pod("driver-c", "Pending")},
+        )
+        watch.events.put(
+            {"type": "MODIFIED", "object": make_pod("driver-c", "Running")},
+        )
+        self.assertEqual(next(phases), "Running")
+
+        informer.release()
+        watch.stop()
+        with self.assertRaises(LookupError):
+            next(phases)
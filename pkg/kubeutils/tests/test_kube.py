@@ -1,13 +1,40 @@
 import os
+import datetime
 import base64
+import time
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
 
 import unittest
 from unittest.mock import Mock
 import unittest.mock
 
+from kubernetes.client import (
+    V1ListMeta,
+    V1ObjectMeta,
+    V1Pod,
+    V1PodList,
+    V1PodStatus,
+    V1ResourceQuota,
+    V1ResourceQuotaSpec,
+    V1ResourceQuotaStatus,
+    V1Secret,
+    V1SecretList,
+)
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import ProtocolError
+
 from kubeutils.api import ApiInterface
-from kubeutils.kube import KubeutilsV1
+from kubeutils.application import ApplicationInterface
+from kubeutils.kube import (
+    LOG_RESUME_MARGIN_S,
+    KubeutilsV1,
+    LazyKubeutilsV1,
+    SecretsDownloadError,
+    _since_seconds,
+)
+from kubeutils.watch import WatchInterface
+from tests.fakes import LogResponse, QueueWatch, make_pod
 
 
 class TestKubeutils(unittest.TestCase):
@@ -28,10 +55,11 @@ class TestKubeutils(unittest.TestCase):
         self.assertIs(self.kubeutils_instance.api, self.mock_api)
 
     def test_download_multiple_secrets_async(self):
-        self.mock_api.read_namespaced_secret.side_effect = [
-            Mock(data={"key1": base64.b64encode(b"value1").decode("utf-8")}),
-            Mock(data={"key2": base64.b64encode(b"value2").decode("utf-8")}),
-        ]
+        # threads read secrets in any order
+        self.mock_api.read_namespaced_secret.side_effect = lambda name, namespace: {
+            "secret1": Mock(data={"key1": base64.b64encode(b"value1").decode("utf-8")}),
+            "secret2": Mock(data={"key2": base64.b64encode(b"value2").decode("utf-8")}),
+        }[name]
         secret_dict = {
             "namespace1": {
                 "secret1": ["key1"],
@@ -77,3 +105,932 @@ class TestKubeutils(unittest.TestCase):
         secret_dict = {}
         result = self.kubeutils_instance.download_secrets(secret_dict)
         assert result == []
+
+    def test_download_secrets_reads_each_secret_once(self):
+        self.mock_api.read_namespaced_secret.return_value = Mock(
+            data={
+                key: base64.b64encode(value.encode()).decode("utf-8")
+                for key, value in [("key1", "value1"), ("key2", "value2")]
+            },
+        )
+        secret_dict = {"namespace1": {"secret1": ["key1", "key2"]}}
+
+        for materialize in (False, True):
+            self.mock_api.read_namespaced_secret.reset_mock()
+
+            result = self.kubeutils_instance.download_secrets(
+                secret_dict,
+                materialize=materialize,
+            )
+
+            self.assertEqual(
+                result,
+                [["namespace1", "key1", "value1"], ["namespace1", "key2", "value2"]],
+            )
+            self.mock_api.read_namespaced_secret.assert_called_once_with(
+                name="secret1",
+                namespace="namespace1",
+            )
+
+    def test_download_secrets_gathers_failures_per_secret(self):
+        def read_secret(name, namespace):
+            if name == "missing":
+                raise ApiException(status=404)
+            return Mock(data={"key1": base64.b64encode(b"value1").decode("utf-8")})
+
+        self.mock_api.read_namespaced_secret.side_effect = read_secret
+        secret_dict = {
+            "namespace1": {
+                "secret1": ["key1"],
+                "missing": ["key1"],
+                "no-key": ["key2"],
+            },
+        }
+
+        for materialize in (False, True):
+            with self.assertRaises(SecretsDownloadError) as raised:
+                self.kubeutils_instance.download_secrets(
+                    secret_dict,
+                    materialize=materialize,
+                )
+
+            errors = raised.exception.errors
+            self.assertEqual(
+                set(errors),
+                {("namespace1", "missing"), ("namespace1", "no-key")},
+            )
+            self.assertIsInstance(errors[("namespace1", "missing")], ApiException)
+            self.assertIsInstance(errors[("namespace1", "no-key")], KeyError)
+
+    def test_download_secrets_concurrently_in_input_order(self):
+        secrets = 8
+        latency_s = 0.05
+
+        def read_secret(name, namespace):
+            # the first secret is the slowest one
+            time.sleep(latency_s * (2 if name == "secret0" else 1))
+            return Mock(data={name: base64.b64encode(name.encode()).decode("utf-8")})
+
+        self.mock_api.read_namespaced_secret.side_effect = read_secret
+        secret_dict = {
+            "namespace1": {f"secret{i}": [f"secret{i}"] for i in range(secrets)},
+        }
+
+        start = time.monotonic()
+        result = self.kubeutils_instance.download_secrets(
+            secret_dict,
+            max_workers=secrets,
+        )
+        concurrent_s = time.monotonic() - start
+
+        self.assertEqual(
+            result,
+            [["namespace1", f"secret{i}", f"secret{i}"] for i in range(secrets)],
+        )
+        # sequential reads take (secrets + 1) * latency_s
+        self.assertLess(concurrent_s, 4 * latency_s)
+
+    def test_download_secrets_from_cache(self):
+        self.mock_api.read_namespaced_secret.return_value = Mock(
+            data={"key1": base64.b64encode(b"value1").decode("utf-8")},
+        )
+        secret_dict = {"namespace1": {"secret1": ["key1"]}}
+        cache = self.kubeutils_instance.enable_secret_cache(ttl_s=60)
+
+        first = self.kubeutils_instance.download_secrets(secret_dict)
+        second = self.kubeutils_instance.download_secrets(secret_dict)
+        value = self.kubeutils_instance.download_secret("secret1", "key1", "namespace1")
+
+        self.assertEqual(first, second)
+        self.assertEqual(value, "value1")
+        self.mock_api.read_namespaced_secret.assert_called_once()
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+
+    def test_download_secrets_with_label_selector(self):
+        def secret(name, key, value):
+            return V1Secret(
+                metadata=V1ObjectMeta(name=name),
+                data={key: base64.b64encode(value.encode()).decode("utf-8")},
+            )
+
+        self.mock_api.list_namespaced_secret.return_value = V1SecretList(
+            items=[secret("secret1", "key1", "value1"), secret("other", "x", "y")],
+        )
+        self.mock_api.read_namespaced_secret.side_effect = [
+            secret("secret2", "key2", "value2"),
+            secret("secret3", "key3", "value3"),
+        ]
+        secret_dict = {
+            "namespace1": {"secret1": ["key1"], "secret2": ["key2"]},
+            "namespace2": {"secret3": ["key3"]},
+        }
+
+        result = self.kubeutils_instance.download_secrets(
+            secret_dict,
+            materialize=True,
+            label_selector="app=flow",
+        )
+
+        self.assertEqual(
+            result,
+            [
+                ["namespace1", "key1", "value1"],
+                ["namespace1", "key2", "value2"],
+                ["namespace2", "key3", "value3"],
+            ],
+        )
+        # only namespace with several secrets is listed, missing secrets are read
+        self.mock_api.list_namespaced_secret.assert_called_once_with(
+            namespace="namespace1",
+            label_selector="app=flow",
+        )
+        self.assertEqual(self.mock_api.read_namespaced_secret.call_count, 2)
+
+
+def make_quota(hard: dict[str, str], used: dict[str, str]) -> V1ResourceQuota:
+    return V1ResourceQuota(
+        spec=V1ResourceQuotaSpec(hard=hard),
+        status=V1ResourceQuotaStatus(hard=hard, used=used),
+    )
+
+
+class TestKubeutilsResources(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_api = Mock(spec=ApiInterface)
+        self.kubeutils_instance = KubeutilsV1.new(Mock(spec=Logger), self.mock_api)
+
+    def test_smallest_remainder(self):
+        self.mock_api.list_namespaced_resource_quota.return_value = Mock(
+            items=[
+                make_quota(
+                    {"requests.cpu": "10", "requests.memory": "20Gi"},
+                    {"requests.cpu": "2500m", "requests.memory": "4Gi"},
+                ),
+                make_quota({"cpu": "6"}, {"cpu": "0"}),
+            ],
+        )
+
+        quota = self.kubeutils_instance.get_namespace_quota("spark")
+
+        self.assertEqual(quota.cpu, 6)
+        self.assertEqual(quota.memory, 16 * 1024**3)
+        self.mock_api.list_namespaced_resource_quota.assert_called_once_with(
+            namespace="spark",
+        )
+
+    def test_sample_resources(self):
+        self.mock_api.list_namespaced_custom_object.return_value = {"items": []}
+
+        with self.kubeutils_instance.sample_resources(
+            "spark",
+            "app-name=app",
+            interval_s=60,
+        ) as sampler:
+            pass
+
+        self.assertFalse(sampler._thread.is_alive())
+        self.mock_api.list_namespaced_custom_object.assert_called_once()
+
+    def test_no_quota(self):
+        self.mock_api.list_namespaced_resource_quota.return_value = Mock(
+            items=[make_quota({"pods": "10"}, {"pods": "1"})],
+        )
+
+        self.assertIsNone(self.kubeutils_instance.get_namespace_quota("spark"))
+
+
+class TestKubeutilsWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_watch = Mock(spec=WatchInterface)
+
+        self.kubeutils_instance = KubeutilsV1.new(
+            self.mock_logger,
+            self.mock_api,
+            self.mock_watch,
+        )
+        self.empty_pod_list = V1PodList(
+            items=[],
+            metadata=V1ListMeta(resource_version="100"),
+        )
+
+    def test_get_pod_name_already_allocated(self):
+        self.mock_api.list_namespaced_pod.return_value = V1PodList(
+            items=[V1Pod(metadata=V1ObjectMeta(name="driver"))],
+            metadata=V1ListMeta(resource_version="100"),
+        )
+
+        result = self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+        self.assertEqual(result, "driver")
+        self.mock_watch.stream.assert_not_called()
+
+    def test_get_pod_name_from_watch_stream(self):
+        self.mock_api.list_namespaced_pod.return_value = self.empty_pod_list
+        self.mock_watch.stream.return_value = iter(
+            [{"type": "ADDED", "object": V1Pod(metadata=V1ObjectMeta(name="driver"))}],
+        )
+
+        result = self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+        self.assertEqual(result, "driver")
+        self.mock_api.list_namespaced_pod.assert_called_once()
+        kwargs = self.mock_watch.stream.call_args.kwargs
+        self.assertEqual(kwargs["resource_version"], "100")
+        self.assertEqual(kwargs["label_selector"], "app=a")
+
+    def test_get_pod_name_relists_on_expired_watch(self):
+        self.mock_api.list_namespaced_pod.return_value = self.empty_pod_list
+        self.mock_watch.stream.side_effect = [
+            ApiException(status=410),
+            iter(
+                [
+                    {
+                        "type": "ADDED",
+                        "object": V1Pod(metadata=V1ObjectMeta(name="driver")),
+                    },
+                ],
+            ),
+        ]
+
+        result = self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+        self.assertEqual(result, "driver")
+        self.assertEqual(self.mock_api.list_namespaced_pod.call_count, 2)
+
+    def test_get_pod_name_raises_other_api_errors(self):
+        self.mock_api.list_namespaced_pod.return_value = self.empty_pod_list
+        self.mock_watch.stream.side_effect = ApiException(status=403)
+
+        with self.assertRaises(ApiException):
+            self.kubeutils_instance.get_pod_name("spark", "app=a")
+
+    def test_get_pod_name_watch_timeout(self):
+        self.mock_api.list_namespaced_pod.return_value = self.empty_pod_list
+        self.mock_watch.stream.side_effect = lambda *args, **kwargs: iter([])
+
+        with unittest.mock.patch(
+            "kubeutils.kube.time.monotonic",
+            side_effect=[0, 0, 5, 11],
+        ):
+            with self.assertRaises(TimeoutError):
+                self.kubeutils_instance.get_pod_name("spark", "app=a", timeout_s=10)
+
+        self.assertEqual(self.mock_watch.stream.call_count, 2)
+
+
+class TestKubeutilsWhileRunningWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_watch = Mock(spec=WatchInterface)
+        self.func = Mock(return_value="logs")
+
+        self.kubeutils_instance = KubeutilsV1.new(
+            self.mock_logger,
+            self.mock_api,
+            self.mock_watch,
+        )
+
+    def test_runs_func_as_soon_as_pod_is_running(self):
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Pending")
+        self.mock_watch.stream.return_value = iter(
+            [
+                {"type": "MODIFIED", "object": make_pod("Pending", "2")},
+                {"type": "MODIFIED", "object": make_pod("Running", "3")},
+            ],
+        )
+
+        result = self.kubeutils_instance.while_running(
+            func=self.func,
+            pending_timeout_s=3600,
+            pod_name="driver",
+            namespace="spark",
+        )
+
+        self.assertEqual(result, "logs")
+        self.func.assert_called_once_with(pod_name="driver", namespace="spark")
+        kwargs = self.mock_watch.stream.call_args.kwargs
+        self.assertEqual(kwargs["field_selector"], "metadata.name=driver")
+        self.assertEqual(kwargs["resource_version"], "1")
+
+    def test_raises_as_soon_as_pod_failed(self):
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Pending")
+        self.mock_watch.stream.return_value = iter(
+            [{"type": "MODIFIED", "object": make_pod("Failed", "2")}],
+        )
+
+        with self.assertRaises(ChildProcessError):
+            self.kubeutils_instance.while_running(
+                func=self.func,
+                pending_timeout_s=3600,
+                pod_name="driver",
+                namespace="spark",
+            )
+        self.func.assert_not_called()
+
+    def test_raises_if_pod_deleted(self):
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Pending")
+        self.mock_watch.stream.return_value = iter(
+            [{"type": "DELETED", "object": make_pod("Pending", "2")}],
+        )
+
+        with self.assertRaises(ChildProcessError):
+            self.kubeutils_instance.while_running(
+                func=self.func,
+                pending_timeout_s=3600,
+                pod_name="driver",
+                namespace="spark",
+            )
+
+    def test_rereads_pod_on_expired_watch(self):
+        self.mock_api.read_namespaced_pod.side_effect = [
+            make_pod("Pending"),
+            make_pod("Running", "5"),
+        ]
+        self.mock_watch.stream.side_effect = ApiException(status=410)
+
+        result = self.kubeutils_instance.while_running(
+            func=self.func,
+            pending_timeout_s=3600,
+            pod_name="driver",
+            namespace="spark",
+        )
+
+        self.assertEqual(result, "logs")
+        self.assertEqual(self.mock_api.read_namespaced_pod.call_count, 2)
+
+    def test_pending_timeout(self):
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Pending")
+        self.mock_watch.stream.side_effect = lambda *args, **kwargs: iter([])
+
+        with unittest.mock.patch(
+            "kubeutils.kube.time.monotonic",
+            side_effect=[0, 5, 11],
+        ):
+            with self.assertRaises(TimeoutError):
+                self.kubeutils_instance.while_running(
+                    func=self.func,
+                    pending_timeout_s=10,
+                    pod_name="driver",
+                    namespace="spark",
+                )
+
+    def test_start_latency_watch_against_polling(self):
+        # polling: pod is already running, but the phase is read after a fixed sleep
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Running")
+        polling = KubeutilsV1.new(self.mock_logger, self.mock_api)
+        with unittest.mock.patch("kubeutils.kube.time.sleep") as mocked_sleep:
+            polling.while_running(
+                func=self.func,
+                pending_timeout_s=3600,
+                pod_name="driver",
+                namespace="spark",
+            )
+        polling_latency_s = sum(call.args[0] for call in mocked_sleep.call_args_list)
+
+        # watch: pod goes Running right after the stream is opened
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Pending")
+        self.mock_watch.stream.return_value = iter(
+            [{"type": "MODIFIED", "object": make_pod("Running", "2")}],
+        )
+        start = time.monotonic()
+        self.kubeutils_instance.while_running(
+            func=self.func,
+            pending_timeout_s=3600,
+            pod_name="driver",
+            namespace="spark",
+        )
+        watch_latency_s = time.monotonic() - start
+
+        self.assertEqual(polling_latency_s, 30)
+        self.assertLess(watch_latency_s, 0.5)
+
+
+class TestKubeutilsInformer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_api.list_namespaced_pod.return_value = V1PodList(
+            items=[
+                V1Pod(
+                    metadata=V1ObjectMeta(name="driver", labels={"app": "a"}),
+                    status=V1PodStatus(phase="Pending"),
+                ),
+            ],
+            metadata=V1ListMeta(resource_version="100"),
+        )
+        self.watch = QueueWatch()
+        self.func = Mock(return_value="logs")
+
+        self.kubeutils_instance = KubeutilsV1.new(
+            self.mock_logger,
+            self.mock_api,
+            self.watch,
+        )
+
+    def tearDown(self) -> None:
+        self.watch.stop()
+
+    def test_use_informer_requires_watch(self):
+        kubeutils_instance = KubeutilsV1.new(self.mock_logger, self.mock_api)
+
+        with self.assertRaises(LookupError):
+            with kubeutils_instance.use_informer("spark"):
+                pass
+
+    def test_lookups_served_from_informer(self):
+        with self.kubeutils_instance.use_informer("spark") as informer:
+            self.assertIs(self.kubeutils_instance.informers["spark"], informer)
+
+            pod_name = self.kubeutils_instance.get_pod_name("spark", "app=a")
+            phase = self.kubeutils_instance.get_pod_phase(pod_name, "spark")
+
+            self.watch.events.put(
+                {
+                    "type": "MODIFIED",
+                    "object": V1Pod(
+                        metadata=V1ObjectMeta(name="driver", labels={"app": "a"}),
+                        status=V1PodStatus(phase="Running"),
+                    ),
+                },
+            )
+            result = self.kubeutils_instance.while_running(
+                func=self.func,
+                pending_timeout_s=5,
+                pod_name=pod_name,
+                namespace="spark",
+            )
+
+        self.assertEqual(pod_name, "driver")
+        self.assertEqual(phase, "Pending")
+        self.assertEqual(result, "logs")
+        self.assertTrue(informer.stopped)
+        self.assertNotIn("spark", self.kubeutils_instance.informers)
+        # one list for the whole namespace, no reads of the pod
+        self.mock_api.list_namespaced_pod.assert_called_once()
+        self.mock_api.read_namespaced_pod.assert_not_called()
+
+    def test_many_users_share_informer(self):
+        other = KubeutilsV1.new(self.mock_logger, self.mock_api, self.watch)
+
+        with self.kubeutils_instance.use_informer("spark") as informer:
+            with other.use_informer("spark") as other_informer:
+                self.assertIs(informer, other_informer)
+            self.assertFalse(informer.stopped)
+        self.assertTrue(informer.stopped)
+
+
+class TestKubeutilsLogResume(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.kubeutils_instance = KubeutilsV1.new(self.mock_logger, self.mock_api)
+
+    def test_stream_pod_log_without_reconnects(self):
+        self.mock_api.read_namespaced_pod_log.return_value = LogResponse(
+            b"line 1\n",
+            error=ProtocolError("Connection broken"),
+        )
+
+        logs = self.kubeutils_instance.stream_pod_log("driver", "spark")
+
+        self.assertEqual(next(logs), "line 1")
+        with self.assertRaises(ProtocolError):
+            next(logs)
+
+    def test_stream_pod_log_frames_lines(self):
+        self.mock_api.read_namespaced_pod_log.return_value = LogResponse(
+            b"24/05/01 INFO first\n24/05/01 WARN \xd0",
+            b"\xbf\xd1\x80\xd0\xb8\n24/05/01 INFO la",
+            b"st",
+        )
+
+        logs = self.kubeutils_instance.stream_pod_log("driver", "spark")
+
+        self.assertEqual(
+            list(logs),
+            ["24/05/01 INFO first", "24/05/01 WARN при", "24/05/01 INFO last"],
+        )
+
+    def test_stream_pod_log_bytes(self):
+        self.mock_api.read_namespaced_pod_log.return_value = LogResponse(
+            b"line 1\nli",
+            b"ne 2\n",
+        )
+
+        logs = self.kubeutils_instance.stream_pod_log("driver", "spark", decode=False)
+
+        self.assertEqual(list(logs), [b"line 1", b"line 2"])
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_stream_pod_log_resumes_after_drop(self, mock_sleep):
+        self.mock_api.read_namespaced_pod_log.side_effect = [
+            LogResponse(
+                b"2024-05-01T10:00:00.1Z line 1\n2024-05-01T10:00:01Z line 2\n",
+                b"2024-05-01T10:00:01Z line 3\n2024-05-01T10:00:02.5Z li",
+                error=ProtocolError("Connection broken"),
+            ),
+            ConnectionResetError(),
+            LogResponse(
+                # since_seconds repeats the lines of the last second
+                b"2024-05-01T10:00:01Z line 2\n2024-05-01T10:00:01Z line 3\n",
+                b"2024-05-01T10:00:01Z line 4\n2024-05-01T10:00:02.5Z line 5\n",
+                b"2024-05-01T10:00:03Z line 6",
+            ),
+        ]
+
+        logs = list(
+            self.kubeutils_instance.stream_pod_log(
+                "driver",
+                "spark",
+                max_reconnects=3,
+                backoff_s=2,
+            ),
+        )
+
+        self.assertEqual(
+            logs,
+            ["line 1", "line 2", "line 3", "line 4", "line 5", "line 6"],
+        )
+        calls = self.mock_api.read_namespaced_pod_log.call_args_list
+        self.assertTrue(calls[0].kwargs["timestamps"])
+        self.assertNotIn("since_seconds", calls[0].kwargs)
+        self.assertGreater(calls[2].kwargs["since_seconds"], 0)
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list],
+            [2, 4],
+        )
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_stream_pod_log_gives_up(self, mock_sleep):
+        self.mock_api.read_namespaced_pod_log.side_effect = ApiException(status=503)
+
+        with self.assertRaises(ApiException):
+            list(
+                self.kubeutils_instance.stream_pod_log(
+                    "driver",
+                    "spark",
+                    max_reconnects=2,
+                ),
+            )
+
+        self.assertEqual(self.mock_api.read_namespaced_pod_log.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_since_seconds_overlaps_the_last_line(self):
+        # the last line was logged just now by a kubelet clock ahead of the local one
+        ahead = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
+            seconds=2
+        )
+
+        self.assertEqual(
+            _since_seconds(ahead.strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
+            LOG_RESUME_MARGIN_S,
+        )
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_stream_pod_log_pauses_count_against_timeout(self, mock_sleep):
+        self.mock_api.read_namespaced_pod_log.side_effect = ApiException(status=503)
+
+        with self.assertRaises(TimeoutError):
+            list(
+                self.kubeutils_instance.stream_pod_log(
+                    "driver",
+                    "spark",
+                    timeout_s=5,
+                    max_reconnects=5,
+                    backoff_s=2,
+                ),
+            )
+
+        # sleep is mocked, so no time passes and the third pause (8 s) is the first one over 5 s
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.call_args_list],
+            [2, 4],
+        )
+
+    def test_stream_pod_log_client_error_not_retried(self):
+        self.mock_api.read_namespaced_pod_log.side_effect = ApiException(status=404)
+
+        with self.assertRaises(ApiException):
+            list(
+                self.kubeutils_instance.stream_pod_log(
+                    "driver",
+                    "spark",
+                    max_reconnects=2,
+                ),
+            )
+
+        self.mock_api.read_namespaced_pod_log.assert_called_once()
+
+    def test_stream_pods_logs(self):
+        self.mock_api.list_namespaced_pod.return_value = V1PodList(
+            items=[
+                V1Pod(
+                    metadata=V1ObjectMeta(name=name),
+                    status=V1PodStatus(phase="Succeeded"),
+                )
+                for name in ("driver", "exec-1")
+            ],
+        )
+        self.mock_api.read_namespaced_pod_log.side_effect = (
+            lambda name, **kwargs: LogResponse(f"{name} 1\n{name} 2\n".encode())
+        )
+
+        logs = self.kubeutils_instance.stream_pods_logs(
+            "spark",
+            "sparkoperator.k8s.io/app-name=app",
+            pod_name="driver",
+            discovery_interval_s=0.01,
+        )
+
+        self.assertCountEqual(
+            list(logs),
+            [
+                ("driver", "driver 1"),
+                ("driver", "driver 2"),
+                ("exec-1", "exec-1 1"),
+                ("exec-1", "exec-1 2"),
+            ],
+        )
+
+
+def make_application(state: str | None, resource_version: str = "1", **status) -> dict:
+    application = {"metadata": {"name": "app", "resourceVersion": resource_version}}
+    if state is not None:
+        application["status"] = {"applicationState": {"state": state, **status}}
+    return application
+
+
+class TestKubeutilsApplicationWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_watch = Mock(spec=WatchInterface)
+        self.mock_api.get_namespaced_custom_object.return_value = make_application(None)
+
+        self.kubeutils_instance = KubeutilsV1.new(
+            self.mock_logger,
+            self.mock_api,
+            self.mock_watch,
+        )
+
+    def test_wait_for_application_completed(self):
+        self.mock_watch.stream.return_value = iter(
+            [
+                {"type": "MODIFIED", "object": make_application("SUBMITTED", "2")},
+                {"type": "MODIFIED", "object": make_application("RUNNING", "3")},
+                {"type": "MODIFIED", "object": make_application("COMPLETED", "4")},
+            ],
+        )
+
+        state = self.kubeutils_instance.wait_for_application("app", "spark")
+
+        self.assertEqual(state, "COMPLETED")
+        self.mock_watch.stream.assert_called_once()
+        args, kwargs = self.mock_watch.stream.call_args
+        self.assertIs(args[0], self.mock_api.list_namespaced_custom_object)
+        self.assertEqual(kwargs["field_selector"], "metadata.name=app")
+        self.assertEqual(kwargs["resource_version"], "1")
+        self.assertEqual(kwargs["plural"], "sparkapplications")
+
+    def test_wait_for_application_until_running(self):
+        self.mock_api.get_namespaced_custom_object.return_value = make_application(
+            "RUNNING",
+        )
+
+        state = self.kubeutils_instance.wait_for_application(
+            "app",
+            "spark",
+            until=("RUNNING",),
+        )
+
+        self.assertEqual(state, "RUNNING")
+        self.mock_watch.stream.assert_not_called()
+
+    def test_wait_for_application_submission_failed(self):
+        self.mock_watch.stream.return_value = iter(
+            [
+                {
+                    "type": "MODIFIED",
+                    "object": make_application(
+                        "SUBMISSION_FAILED",
+                        errorMessage="failed to run spark-submit",
+                    ),
+                },
+            ],
+        )
+
+        with self.assertRaisesRegex(ChildProcessError, "spark-submit"):
+            self.kubeutils_instance.wait_for_application(
+                "app",
+                "spark",
+                until=("RUNNING",),
+            )
+
+    def test_wait_for_application_deleted(self):
+        self.mock_watch.stream.return_value = iter(
+            [{"type": "DELETED", "object": make_application("RUNNING")}],
+        )
+
+        with self.assertRaises(LookupError):
+            self.kubeutils_instance.wait_for_application("app", "spark")
+
+    def test_wait_for_application_expired_watch(self):
+        self.mock_api.get_namespaced_custom_object.side_effect = [
+            make_application("RUNNING", "1"),
+            make_application("COMPLETED", "5"),
+        ]
+        self.mock_watch.stream.side_effect = ApiException(status=410)
+
+        state = self.kubeutils_instance.wait_for_application("app", "spark")
+
+        self.assertEqual(state, "COMPLETED")
+        self.assertEqual(self.mock_api.get_namespaced_custom_object.call_count, 2)
+
+    def test_wait_for_application_timeout(self):
+        self.mock_watch.stream.side_effect = lambda *args, **kwargs: iter([])
+
+        with self.assertRaises(TimeoutError):
+            self.kubeutils_instance.wait_for_application("app", "spark", timeout_s=0)
+
+    def test_wait_for_application_without_watch(self):
+        self.kubeutils_instance.watch = None
+
+        with self.assertRaises(LookupError):
+            self.kubeutils_instance.wait_for_application("app", "spark")
+
+
+def make_spark_application(name: str, namespace: str | None = None) -> Mock:
+    application = Mock(spec=ApplicationInterface)
+    application.return_value = {"metadata": {"name": name, "namespace": namespace}}
+    return application
+
+
+class TestKubeutilsSubmitMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.kubeutils_instance = KubeutilsV1.new(self.mock_logger, self.mock_api)
+
+    def test_submit_many_in_order(self):
+        self.mock_api.create_namespaced_custom_object.side_effect = (
+            lambda application, **kwargs: application()["metadata"]["name"]
+        )
+        applications = [make_spark_application(f"app-{i}") for i in range(20)]
+        applications[3] = make_spark_application("app-3", namespace="other")
+
+        results = self.kubeutils_instance.submit_many(
+            applications,
+            namespace="spark",
+            max_in_flight=4,
+            qps=1000,
+        )
+
+        self.assertEqual([r.response for r in results], [f"app-{i}" for i in range(20)])
+        self.assertTrue(all(r.ok and r.attempts == 1 for r in results))
+        self.assertEqual(results[3].namespace, "other")
+        self.assertEqual(results[4].namespace, "spark")
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_submit_many_retries(self, mock_sleep):
+        self.mock_api.create_namespaced_custom_object.side_effect = [
+            ApiException(status=429),
+            ApiException(status=503),
+            {"metadata": {"name": "app"}},
+        ]
+
+        (result,) = self.kubeutils_instance.submit_many(
+            [make_spark_application("app")],
+            namespace="spark",
+            qps=1000,
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertGreaterEqual(result.latency_s, 0)
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_submit_many_honours_retry_after(self, mock_sleep):
+        error = ApiException(status=429)
+        error.headers = {"Retry-After": "7"}
+        self.mock_api.create_namespaced_custom_object.side_effect = [error, {}]
+
+        self.kubeutils_instance.submit_many(
+            [make_spark_application("app")],
+            namespace="spark",
+            qps=1000,
+        )
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_submit_many_already_created_by_retried_request(self, mock_sleep):
+        self.mock_api.create_namespaced_custom_object.side_effect = [
+            ApiException(status=504),
+            ApiException(status=409),
+        ]
+
+        (result,) = self.kubeutils_instance.submit_many(
+            [make_spark_application("app")],
+            namespace="spark",
+            qps=1000,
+        )
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.attempts, 2)
+
+    @unittest.mock.patch("kubeutils.kube.time.sleep")
+    def test_submit_many_gathers_failures(self, mock_sleep):
+        def create(application, **kwargs):
+            name = application()["metadata"]["name"]
+            if name == "ok":
+                return {}
+            raise {
+                "invalid": ApiException(status=422),
+                "down": ApiException(status=500),
+            }[name]
+
+        self.mock_api.create_namespaced_custom_object.side_effect = create
+
+        results = self.kubeutils_instance.submit_many(
+            [make_spark_application(name) for name in ("ok", "invalid", "down")],
+            namespace="spark",
+            qps=1000,
+            max_retries=2,
+        )
+
+        self.assertEqual([r.ok for r in results], [True, False, False])
+        self.assertEqual(results[1].error.status, 422)
+        self.assertEqual(results[1].attempts, 1)
+        self.assertEqual(results[2].attempts, 3)
+
+    def test_submit_many_application_without_manifest(self):
+        self.mock_api.create_namespaced_custom_object.return_value = {}
+        broken = Mock(spec=ApplicationInterface)
+        broken.side_effect = TimeoutError("download manifest first")
+
+        results = self.kubeutils_instance.submit_many(
+            [make_spark_application("a"), broken, make_spark_application("b")],
+            namespace="spark",
+            qps=1000,
+        )
+
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertIsInstance(results[1].error, TimeoutError)
+        self.assertEqual(results[1].attempts, 0)
+        self.assertEqual(self.mock_api.create_namespaced_custom_object.call_count, 2)
+
+
+class TestLazyKubeutils(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.setup = Mock()
+        self.kubeutils_lazy = KubeutilsV1.lazy(
+            self.mock_logger,
+            self.mock_api,
+            setup=self.setup,
+        )
+
+    def test_loads_on_first_use(self):
+        self.assertIsInstance(self.kubeutils_lazy, LazyKubeutilsV1)
+        self.assertFalse(self.kubeutils_lazy.loaded)
+        self.setup.assert_not_called()
+
+        self.assertIs(self.kubeutils_lazy.api, self.mock_api)
+
+        self.assertTrue(self.kubeutils_lazy.loaded)
+        instance = self.kubeutils_lazy.load()
+        self.assertIsInstance(instance, KubeutilsV1)
+        self.setup.assert_called_once_with(instance)
+
+    def test_set_attribute(self):
+        logger = Mock(spec=Logger)
+
+        self.kubeutils_lazy.logger = logger
+
+        self.assertIs(self.kubeutils_lazy.load().logger, logger)
+
+    def test_setup_raised(self):
+        self.setup.side_effect = [ConnectionError(), None]
+
+        with self.assertRaises(ConnectionError):
+            self.kubeutils_lazy.get_pod_phase
+        self.assertFalse(self.kubeutils_lazy.loaded)
+
+        self.kubeutils_lazy.load()
+        self.assertEqual(self.setup.call_count, 2)
+
+    def test_loads_once(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instances = set(
+                executor.map(lambda _: self.kubeutils_lazy.load(), range(32))
+            )
+
+        self.assertEqual(len(instances), 1)
+        self.setup.assert_called_once()
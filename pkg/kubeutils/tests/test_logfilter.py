@@ -0,0 +1,108 @@
+import unittest
+
+from kubeutils.logfilter import LogFilter, LogRecord, parse_log4j
+
+LOG = [
+    "24/05/01 10:00:00 INFO SparkContext: Running Spark version 3.5.1",
+    "24/05/01 10:00:01 INFO DAGScheduler: Job 0 finished, ERROR count 0",
+    "24/05/01 10:00:02 WARN TaskSetManager: Lost task 1.0 in stage 3.0",
+    "24/05/01 10:00:03 INFO TaskSetManager: Starting task 1.1 in stage 3.0",
+    "24/05/01 10:00:04 INFO TaskSetManager: Finished task 1.1 in stage 3.0",
+    "24/05/01 10:00:05 ERROR app: ORA-01017: invalid username/password",
+    "\tat oracle.jdbc.driver.T4CTTIoer11.processError(T4CTTIoer11.java:509)",
+    "24/05/01 10:00:06 INFO SparkContext: Successfully stopped SparkContext",
+]
+
+
+class TestParseLog4j(unittest.TestCase):
+    def test_parse_log4j(self):
+        self.assertEqual(
+            parse_log4j(LOG[5]),
+            LogRecord(
+                "24/05/01 10:00:05",
+                "ERROR",
+                "app",
+                "ORA-01017: invalid username/password",
+            ),
+        )
+
+    def test_parse_not_log4j(self):
+        self.assertIsNone(parse_log4j(LOG[6]))
+
+
+class TestLogFilter(unittest.TestCase):
+    def test_levels_match_level_field_only(self):
+        log_filter = LogFilter(levels=["WARN", "ERROR"])
+
+        self.assertEqual(list(log_filter.filter(LOG)), [LOG[2], LOG[5]])
+
+    def test_levels_of_lines_without_log4j_layout(self):
+        log_filter = LogFilter(levels=["WARN", "ERROR"])
+        lines = [
+            "ERROR: could not connect to oracle",
+            "2024-05-01 10:00:07,123 WARNING root: retrying",
+            "Traceback (most recent call last):",
+            "print of an error in lower case",
+        ]
+
+        self.assertEqual(
+            list(log_filter.filter(LOG + lines)), [LOG[2], LOG[5], *lines[:2]]
+        )
+
+    def test_custom_layout(self):
+        log_filter = LogFilter(levels=["ERROR"], layout=r"\[[^\]]+\] ")
+        lines = [
+            "[2024-05-01T10:00:05] ERROR app: ORA-01017: invalid username/password",
+            "[2024-05-01T10:00:06] INFO app: ERROR count 0",
+        ]
+
+        self.assertEqual(list(log_filter.filter(lines)), lines[:1])
+
+    def test_patterns(self):
+        log_filter = LogFilter(patterns=["ORA-", "version 3.5"])
+
+        self.assertEqual(list(log_filter.filter(LOG)), [LOG[0], LOG[5]])
+
+    def test_regex_patterns(self):
+        log_filter = LogFilter(patterns=[r"task \d\.1"], regex=True)
+
+        self.assertEqual(list(log_filter.filter(LOG)), [LOG[3], LOG[4]])
+
+    def test_context(self):
+        log_filter = LogFilter(levels=["ERROR"], context=1)
+
+        self.assertEqual(list(log_filter.filter(LOG)), LOG[4:7])
+
+    def test_context_of_close_matches_yielded_once(self):
+        log_filter = LogFilter(levels=["WARN", "ERROR"], context=2)
+
+        self.assertEqual(list(log_filter.filter(LOG)), LOG[0:8])
+
+    def test_bytes_lines(self):
+        log_filter = LogFilter(levels=["WARN"], patterns=["ошибка"])
+        lines = [line.encode() for line in LOG] + ["ошибка".encode()]
+
+        self.assertEqual(
+            list(log_filter.filter(lines)),
+            [LOG[2].encode(), "ошибка".encode()],
+        )
+
+    def test_empty_filter(self):
+        with self.assertRaises(ValueError):
+            LogFilter()
+
+    def test_filter_sources_keeps_context_per_source(self):
+        log_filter = LogFilter(levels=["ERROR"], context=1)
+        items = [
+            ("driver", LOG[4]),
+            ("exec-1", LOG[0]),
+            ("exec-1", LOG[5]),
+            ("driver", LOG[6]),
+            ("exec-1", LOG[6]),
+            ("exec-1", LOG[7]),
+        ]
+
+        self.assertEqual(
+            list(log_filter.filter_sources(items)),
+            [("exec-1", LOG[0]), ("exec-1", LOG[5]), ("exec-1", LOG[6])],
+        )
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import yaml
+
+from kubeutils.manifest import (
+    ManifestCache,
+    copy_manifest,
+    merge_manifests,
+    patch_manifest,
+)
+
+
+class TestCopyManifest(unittest.TestCase):
+    def test_copy_is_independent(self):
+        manifest = {"spec": {"driver": {"env": [{"name": "A"}]}}}
+
+        copy = copy_manifest(manifest)
+        copy["spec"]["driver"]["env"][0]["name"] = "B"
+
+        self.assertEqual(manifest["spec"]["driver"]["env"][0]["name"], "A")
+
+    def test_ordered_dict_becomes_dict(self):
+        copy = copy_manifest(OrderedDict(spec=OrderedDict(type="Python")))
+
+        self.assertIs(type(copy), dict)
+        self.assertIs(type(copy["spec"]), dict)
+
+
+class TestPatchManifest(unittest.TestCase):
+    def test_dicts_are_merged_and_lists_replaced(self):
+        manifest = {
+            "metadata": {"name": None, "namespace": "default"},
+            "spec": {"deps": {"files": ["a"]}},
+        }
+        patch = {"metadata": {"name": "app"}, "spec": {"deps": {"files": ["b"]}}}
+
+        patch_manifest(manifest, patch)
+
+        self.assertEqual(
+            manifest,
+            {
+                "metadata": {"name": "app", "namespace": "default"},
+                "spec": {"deps": {"files": ["b"]}},
+            },
+        )
+
+    def test_patch_is_not_shared(self):
+        env = [{"name": "A", "value": "1"}]
+        manifest = {"spec": {}}
+
+        patch_manifest(manifest, {"spec": {"env": env}})
+        env.append({"name": "B", "value": "2"})
+
+        self.assertEqual(len(manifest["spec"]["env"]), 1)
+
+
+class TestMergeManifests(unittest.TestCase):
+    def test_lists_are_replaced(self):
+        based = {
+            "spec": {"driver": {"cores": 1, "tolerations": [{"value": "spark-app"}]}}
+        }
+        app = {"spec": {"driver": {"tolerations": [{"value": "spark-app-hl"}]}}}
+
+        merged = merge_manifests(based, app)
+
+        self.assertEqual(
+            merged,
+            {
+                "spec": {
+                    "driver": {"cores": 1, "tolerations": [{"value": "spark-app-hl"}]}
+                }
+            },
+        )
+
+    def test_arguments_are_not_changed(self):
+        based = {"spec": {"driver": {"cores": 1}}}
+        app = {"spec": {"driver": {"cores": 2}}}
+
+        merged = merge_manifests(based, app)
+        merged["spec"]["driver"]["memory"] = "1g"
+
+        self.assertEqual(based, {"spec": {"driver": {"cores": 1}}})
+        self.assertEqual(app, {"spec": {"driver": {"cores": 2}}})
+
+    def test_merge_is_idempotent(self):
+        based = {"spec": {"deps": {"files": ["a"]}, "type": "Python"}}
+        app = {"spec": {"deps": {"files": ["b"]}}}
+
+        merged = merge_manifests(based, app)
+
+        self.assertEqual(merge_manifests(merged, app), merged)
+
+    def test_empty_manifest(self):
+        self.assertEqual(merge_manifests({"spec": {}}, None), {"spec": {}})
+
+
+class TestManifestCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dirpath = tempfile.mkdtemp()
+        self.based_path = os.path.join(self.dirpath, "based.yaml")
+        self.app_path = os.path.join(self.dirpath, "app.yaml")
+        self.write(self.based_path, {"spec": {"driver": {"cores": 1, "memory": "1g"}}})
+        self.write(self.app_path, {"spec": {"driver": {"cores": 2}}})
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.dirpath)
+
+    @staticmethod
+    def write(path: str, manifest: dict) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            yaml.dump(manifest, fh)
+
+    def test_merges_once(self):
+        cache = ManifestCache()
+
+        first = cache.get(self.based_path, self.app_path)
+        second = cache.get(self.based_path, self.app_path)
+
+        self.assertEqual(first, {"spec": {"driver": {"cores": 2, "memory": "1g"}}})
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_changed_file_is_compiled_again(self):
+        cache = ManifestCache()
+        cache.get(self.based_path, self.app_path)
+
+        self.write(self.app_path, {"spec": {"driver": {"cores": 4}}})
+
+        self.assertEqual(
+            cache.get(self.based_path, self.app_path)["spec"]["driver"]["cores"],
+            4,
+        )
+        self.assertEqual(cache.misses, 2)
+
+    def test_copies_do_not_change_template(self):
+        cache = ManifestCache()
+
+        cache.get(self.based_path)["spec"]["driver"]["cores"] = 8
+
+        self.assertEqual(cache.get(self.based_path)["spec"]["driver"]["cores"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = ManifestCache(max_entries=1)
+        cache.get(self.based_path)
+        cache.get(self.app_path)
+
+        cache.get(self.based_path)
+
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
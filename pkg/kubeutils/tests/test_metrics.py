@@ -0,0 +1,265 @@
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import Logger
+from unittest.mock import Mock
+
+from kubernetes.client import Configuration
+from kubernetes.client.rest import ApiException
+
+from kubeutils.api import ApiInterface, KubeApiV1
+from kubeutils.client import ClientConfig, build_api_client
+from kubeutils.kube import KubeutilsV1
+from kubeutils.metrics import (
+    API_REQUEST_DURATION,
+    API_REQUESTS,
+    API_RESPONSE_BYTES,
+    API_RETRIES,
+    LOG_BYTES,
+    NOOP_EXPORTER,
+    PHASE_DURATION,
+    PrometheusExporter,
+    count_bytes,
+    record_call,
+    record_phase,
+)
+from kubeutils.ratelimit import ApiRateLimiter
+from kubeutils.watch import WatchInterface
+from tests.fakes import LogResponse, make_pod
+
+SECRET_LIST = b'{"kind": "SecretList", "items": []}'
+
+
+class SecretListHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(SECRET_LIST)))
+        self.end_headers()
+        self.wfile.write(SECRET_LIST)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPrometheusExporter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = PrometheusExporter()
+
+    def test_render_counters_and_histograms(self):
+        self.exporter.inc(API_REQUESTS, labels={"method": "read", "status": "ok"})
+        self.exporter.inc(API_REQUESTS, 2, {"method": "read", "status": "ok"})
+        self.exporter.observe(API_REQUEST_DURATION, 0.02, {"method": "read"})
+        self.exporter.observe(API_REQUEST_DURATION, 20, {"method": "read"})
+
+        text = self.exporter.render()
+
+        self.assertIn(f"# TYPE {API_REQUESTS} counter", text)
+        self.assertIn(f'{API_REQUESTS}{{method="read",status="ok"}} 3.0', text)
+        self.assertIn(f"# TYPE {API_REQUEST_DURATION} histogram", text)
+        self.assertIn(
+            f'{API_REQUEST_DURATION}_bucket{{method="read",le="0.01"}} 0',
+            text,
+        )
+        self.assertIn(
+            f'{API_REQUEST_DURATION}_bucket{{method="read",le="0.025"}} 1',
+            text,
+        )
+        self.assertIn(
+            f'{API_REQUEST_DURATION}_bucket{{method="read",le="+Inf"}} 2',
+            text,
+        )
+        self.assertIn(f'{API_REQUEST_DURATION}_sum{{method="read"}} 20.02', text)
+        self.assertIn(f'{API_REQUEST_DURATION}_count{{method="read"}} 2', text)
+
+    def test_render_escapes_labels_and_collects_gauges(self):
+        self.exporter.inc("events_total", labels={"reason": 'say "hi"\n'})
+        self.exporter.collect(lambda: {"pool_reuse_ratio": 0.75})
+
+        text = self.exporter.render()
+
+        self.assertIn('events_total{reason="say \\"hi\\"\\n"} 1.0', text)
+        self.assertIn("# TYPE pool_reuse_ratio gauge\npool_reuse_ratio 0.75", text)
+
+    def test_spans(self):
+        self.exporter.span("pending", 100.0, 42.0, {"pod": "driver"})
+
+        self.assertEqual(self.exporter.spans[0].labels, {"pod": "driver"})
+        # pod names are kept in spans only
+        self.assertIn(
+            f'{PHASE_DURATION}_bucket{{phase="pending",le="60.0"}} 1',
+            self.exporter.render(),
+        )
+
+    def test_record_phase_when_raised(self):
+        with self.assertRaises(TimeoutError):
+            with record_phase(self.exporter, "allocating", {"namespace": "spark"}):
+                raise TimeoutError()
+
+        span = self.exporter.spans[0]
+        self.assertEqual(span.name, "allocating")
+        self.assertGreaterEqual(span.duration_s, 0)
+
+    def test_record_call_of_generator(self):
+        def lines():
+            yield "line 1"
+            yield "line 2"
+
+        logs = record_call(self.exporter, "running", None, lines)
+        self.assertEqual(len(self.exporter.spans), 0)
+        next(logs)
+        logs.close()
+
+        self.assertEqual(self.exporter.spans[0].name, "running")
+
+    def test_count_bytes(self):
+        chunks = [b"abc", b"de"]
+
+        self.assertIs(count_bytes(NOOP_EXPORTER, LOG_BYTES, chunks), chunks)
+        self.assertEqual(list(count_bytes(self.exporter, LOG_BYTES, chunks)), chunks)
+        self.assertIn(f"{LOG_BYTES} 5.0", self.exporter.render())
+
+    def test_serve(self):
+        self.exporter.inc("events_total")
+        server = self.exporter.serve(port=0, addr="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_port}"
+            with urllib.request.urlopen(f"{url}/metrics") as response:
+                self.assertTrue(
+                    response.headers["Content-Type"].startswith("text/plain")
+                )
+                self.assertIn(b"events_total 1.0", response.read())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestInstrumentedApi(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = PrometheusExporter()
+        self.limiter = ApiRateLimiter(default_retry_after_s=0)
+        self.api = KubeApiV1(rate_limiter=self.limiter, exporter=self.exporter)
+
+    def test_disabled_by_default(self):
+        self.assertIs(KubeApiV1().exporter, NOOP_EXPORTER)
+
+    def test_instrument_again(self):
+        self.api.instrument(self.exporter)
+
+        self.assertEqual(
+            self.exporter.render().count("# TYPE kubeutils_api_throttled gauge"),
+            1,
+        )
+
+    def test_retries_and_errors(self):
+        self.api._core_v1_api = Mock()
+        read = self.api.core_v1_api.read_namespaced_pod
+        read.__name__ = "read_namespaced_pod"
+        read.side_effect = [ApiException(status=429), "pod", ApiException(status=404)]
+
+        self.api.read_namespaced_pod(name="driver", namespace="spark")
+        with self.assertRaises(ApiException):
+            self.api.read_namespaced_pod(name="driver", namespace="spark")
+
+        text = self.exporter.render()
+        self.assertIn(
+            f'{API_REQUESTS}{{method="read_namespaced_pod",status="ok"}} 1.0',
+            text,
+        )
+        self.assertIn(
+            f'{API_REQUESTS}{{method="read_namespaced_pod",status="404"}} 1.0',
+            text,
+        )
+        self.assertIn(f'{API_RETRIES}{{method="read_namespaced_pod"}} 1.0', text)
+        self.assertIn(
+            f'{API_REQUEST_DURATION}_count{{method="read_namespaced_pod"}} 2', text
+        )
+        self.assertIn("kubeutils_api_throttled 1.0", text)
+
+    def test_response_bytes(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SecretListHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            self.api._api_client = build_api_client(
+                ClientConfig(),
+                self.api.pool_metrics,
+                Configuration(host=f"http://127.0.0.1:{server.server_port}"),
+            )
+
+            self.api.list_namespaced_secret(namespace="spark")
+            self.api.list_namespaced_secret(namespace="spark")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        text = self.exporter.render()
+        self.assertIn(
+            f'{API_RESPONSE_BYTES}{{method="list_namespaced_secret"}} '
+            f"{2.0 * len(SECRET_LIST)}",
+            text,
+        )
+        self.assertIn("kubeutils_pool_reuse_ratio 0.5", text)
+
+
+class TestKubeutilsPhases(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_api = Mock(spec=ApiInterface)
+        self.mock_watch = Mock(spec=WatchInterface)
+        self.kubeutils_instance = KubeutilsV1.new(
+            Mock(spec=Logger),
+            self.mock_api,
+            self.mock_watch,
+        )
+        self.exporter = self.kubeutils_instance.enable_metrics(PrometheusExporter())
+
+    def test_pod_phases(self):
+        self.mock_api.list_namespaced_pod.return_value = Mock(
+            items=[make_pod("Pending")]
+        )
+        self.mock_api.read_namespaced_pod.return_value = make_pod("Running")
+
+        def stream_logs(**kwargs):
+            # consumed after while_running returned, like the logs in the template
+            for line in ("line 1", "line 2"):
+                time.sleep(0.05)
+                yield line
+
+        pod_name = self.kubeutils_instance.get_pod_name("spark", "spark-role=driver")
+        logs = self.kubeutils_instance.while_running(
+            func=stream_logs,
+            pending_timeout_s=60,
+            pod_name=pod_name,
+            namespace="spark",
+        )
+        self.assertEqual(len(self.exporter.spans), 2)
+        self.assertEqual(list(logs), ["line 1", "line 2"])
+
+        self.assertEqual(
+            [(span.name, span.labels) for span in self.exporter.spans],
+            [
+                (
+                    "allocating",
+                    {"namespace": "spark", "label_selector": "spark-role=driver"},
+                ),
+                ("pending", {"namespace": "spark", "pod": "driver"}),
+                ("running", {"namespace": "spark", "pod": "driver"}),
+            ],
+        )
+        self.assertGreaterEqual(self.exporter.spans[2].duration_s, 0.1)
+
+    def test_log_bytes(self):
+        self.mock_api.read_namespaced_pod_log.return_value = LogResponse(
+            b"line 1\nli",
+            b"ne 2\n",
+        )
+
+        list(self.kubeutils_instance.stream_pod_log("driver", "spark"))
+
+        self.assertIn(f"{LOG_BYTES} 14.0", self.exporter.render())
@@ -0,0 +1,141 @@
+import threading
+import time
+import unittest
+from logging import Logger
+from unittest.mock import Mock
+
+from kubernetes.client import V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+
+from kubeutils.api import ApiInterface
+from kubeutils.multiplex import LogMultiplexer
+
+
+def make_pods(**phases) -> V1PodList:
+    return V1PodList(
+        items=[
+            V1Pod(
+                metadata=V1ObjectMeta(name=name.replace("_", "-")),
+                status=V1PodStatus(phase=phase),
+            )
+            for name, phase in phases.items()
+        ],
+    )
+
+
+class TestLogMultiplexer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_logger = Mock(spec=Logger)
+        self.mock_api = Mock(spec=ApiInterface)
+        self.logs = {
+            "driver": ["d1", "d2"],
+            "exec-1": ["e1"],
+        }
+
+    def stream(self, pod_name, namespace, timeout_s, **kwargs):
+        yield from self.logs[pod_name]
+
+    def multiplexer(self, **kwargs) -> LogMultiplexer:
+        return LogMultiplexer(
+            self.mock_api,
+            self.stream,
+            self.mock_logger,
+            "spark",
+            "sparkoperator.k8s.io/app-name=app",
+            discovery_interval_s=0.01,
+            timeout_s=5,
+            **kwargs,
+        )
+
+    def test_merges_pods_logs(self):
+        self.mock_api.list_namespaced_pod.return_value = make_pods(
+            driver="Running",
+            exec_1="Running",
+        )
+
+        result = list(self.multiplexer(pod_name="driver"))
+
+        self.assertCountEqual(
+            result, [("driver", "d1"), ("driver", "d2"), ("exec-1", "e1")]
+        )
+        self.assertEqual(
+            [line for pod, line in result if pod == "driver"],
+            ["d1", "d2"],
+        )
+
+    def test_attaches_executor_started_later(self):
+        executor_logged = threading.Event()
+        self.mock_api.list_namespaced_pod.side_effect = [
+            make_pods(driver="Running", exec_1="Pending"),
+            make_pods(driver="Running", exec_1="Pending"),
+        ] + [make_pods(driver="Running", exec_1="Running")] * 1000
+
+        def stream(pod_name, namespace, timeout_s, **kwargs):
+            if pod_name == "driver":
+                yield "d1"
+                executor_logged.wait(5)
+                yield "d2"
+            else:
+                yield "e1"
+                executor_logged.set()
+
+        self.stream = stream
+        result = list(self.multiplexer(pod_name="driver"))
+
+        self.assertEqual(result, [("driver", "d1"), ("exec-1", "e1"), ("driver", "d2")])
+
+    def test_ends_without_live_pods(self):
+        self.mock_api.list_namespaced_pod.return_value = make_pods(
+            driver="Succeeded",
+            exec_1="Failed",
+            exec_2="Pending",
+        )
+        self.mock_api.list_namespaced_pod.side_effect = [
+            self.mock_api.list_namespaced_pod.return_value,
+        ] + [make_pods(driver="Succeeded")] * 1000
+
+        result = list(self.multiplexer())
+
+        self.assertEqual(len(result), 3)
+
+    def test_detaches_removed_pod(self):
+        self.mock_api.list_namespaced_pod.side_effect = [
+            make_pods(driver="Running", exec_1="Running"),
+        ] + [make_pods(driver="Running")] * 1000
+
+        def stream(pod_name, namespace, timeout_s, **kwargs):
+            if pod_name == "driver":
+                # the driver outlives the removed executor
+                while "exec-1" not in multiplexer.readers:
+                    time.sleep(0.01)
+                while "exec-1" in multiplexer.readers:
+                    time.sleep(0.01)
+                yield "d1"
+                return
+            while True:
+                yield "e"
+                time.sleep(0.01)
+
+        self.stream = stream
+        multiplexer = self.multiplexer(pod_name="driver")
+        result = list(multiplexer)
+
+        self.assertEqual(result[-1], ("driver", "d1"))
+        self.assertEqual(multiplexer.readers, {})
+
+    def test_bounded_queue_blocks_chatty_pod(self):
+        self.mock_api.list_namespaced_pod.return_value = make_pods(driver="Running")
+        produced = []
+
+        def stream(pod_name, namespace, timeout_s, **kwargs):
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        self.stream = stream
+        lines = iter(self.multiplexer(pod_name="driver", queue_size=2))
+        next(lines)
+        time.sleep(0.1)
+
+        # consumed + queue + one line waiting for a free slot
+        self.assertLessEqual(len(produced), 4)
+        self.assertEqual(len(list(lines)), 99)
@@ -0,0 +1,154 @@
+import email.utils
+import math
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from kubernetes.client.rest import ApiException
+
+from kubeutils.ratelimit import (
+    PRIORITY_MUTATION,
+    PRIORITY_READ,
+    ApiRateLimiter,
+    Histogram,
+    TokenBucket,
+    retry_after_s,
+)
+
+
+def make_throttled(retry_after: str | None = None) -> ApiException:
+    e = ApiException(status=429, reason="Too Many Requests")
+    e.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return e
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_delay_seconds(self):
+        self.assertEqual(retry_after_s(make_throttled("3")), 3)
+
+    def test_http_date(self):
+        date = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+        self.assertAlmostEqual(retry_after_s(make_throttled(date)), 30, delta=2)
+
+    def test_http_date_in_the_past(self):
+        self.assertEqual(
+            retry_after_s(make_throttled("Wed, 21 Oct 2015 07:28:00 GMT")),
+            0,
+        )
+
+    def test_invalid_or_missing(self):
+        self.assertIsNone(retry_after_s(make_throttled("soon")))
+        self.assertIsNone(retry_after_s(make_throttled()))
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_without_wait(self):
+        bucket = TokenBucket(rate=1, burst=3)
+
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0, 0, 0])
+
+    def test_rate_limits_callers(self):
+        bucket = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # the first token is in the bucket, 5 more are refilled in 10 ms each
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+
+    def test_timeout_takes_nothing(self):
+        bucket = TokenBucket(rate=1, burst=1)
+        bucket.acquire()
+
+        with self.assertRaises(TimeoutError):
+            bucket.acquire(timeout_s=0.1)
+        self.assertLess(bucket.acquire(timeout_s=1.1), 1.1)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestHistogram(unittest.TestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["buckets"], {0.1: 2, 1: 3, math.inf: 4})
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["sum"], 3.65)
+
+
+class TestApiRateLimiter(unittest.TestCase):
+    def test_priorities_have_separate_budgets(self):
+        limiter = ApiRateLimiter(
+            limits={PRIORITY_READ: (1, 1), PRIORITY_MUTATION: (1, 1)},
+        )
+        limiter.acquire(PRIORITY_READ)
+
+        # reads are out of tokens, a mutation is not delayed by them
+        self.assertLess(limiter.acquire(PRIORITY_MUTATION), 0.01)
+        self.assertGreater(limiter.acquire(PRIORITY_READ), 0.5)
+        self.assertEqual(limiter.stats()["waits"][PRIORITY_READ]["count"], 2)
+
+    def test_throttled_request_is_retried_after_retry_after(self):
+        limiter = ApiRateLimiter(limits={PRIORITY_READ: (1000, 1000)})
+        func = Mock(side_effect=[make_throttled("1"), "ok"])
+        limiter.max_retry_after_s = 0.05
+        start = time.monotonic()
+
+        result = limiter.call(PRIORITY_READ, func, name="pod")
+
+        self.assertEqual(result, "ok")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(func.call_count, 2)
+        func.assert_called_with(name="pod")
+        self.assertEqual(limiter.throttled, 1)
+
+    def test_throttling_pauses_other_priorities(self):
+        limiter = ApiRateLimiter()
+        limiter.pause(0.05)
+
+        self.assertGreaterEqual(limiter.acquire(PRIORITY_MUTATION), 0.04)
+
+    def test_gives_up_after_max_retries(self):
+        limiter = ApiRateLimiter(max_retries=1, default_retry_after_s=0.01)
+        func = Mock(side_effect=make_throttled())
+
+        with self.assertRaises(ApiException):
+            limiter.call(PRIORITY_READ, func)
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_mutations_are_not_retried(self):
+        limiter = ApiRateLimiter(default_retry_after_s=0.05)
+        func = Mock(side_effect=make_throttled())
+
+        with self.assertRaises(ApiException):
+            limiter.call(PRIORITY_MUTATION, func)
+
+        func.assert_called_once()
+        self.assertEqual(limiter.throttled, 1)
+        # other requests still wait for the server
+        self.assertGreaterEqual(limiter.acquire(PRIORITY_READ), 0.04)
+
+    def test_other_errors_are_not_retried(self):
+        limiter = ApiRateLimiter()
+        func = Mock(side_effect=ApiException(status=500))
+
+        with self.assertRaises(ApiException):
+            limiter.call(PRIORITY_READ, func)
+
+        func.assert_called_once()
+
+    def test_shared(self):
+        self.assertIs(ApiRateLimiter.shared(), ApiRateLimiter.shared())
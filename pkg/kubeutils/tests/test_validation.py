@@ -0,0 +1,187 @@
+import unittest
+
+from kubeutils.application import SparkApplicationV1
+from kubeutils.validation import (
+    ManifestValidationError,
+    QuotaExceededError,
+    Resources,
+    check_quota,
+    format_memory,
+    heap_memory,
+    normalize_quantities,
+    parse_memory,
+    parse_quantity,
+    pod_resources,
+    requested_resources,
+    validate_manifest,
+)
+
+GIB = 1024**3
+MIB = 1024**2
+
+
+def make_manifest() -> dict:
+    manifest = SparkApplicationV1.default()()
+    manifest["metadata"].update(name="spark-app", namespace="spark")
+    manifest["spec"]["mainApplicationFile"] = "s3a://spark/scripts/app.py"
+    return manifest
+
+
+class TestQuantities(unittest.TestCase):
+    def test_parse_memory(self):
+        for value in ("512m", "512mb", "512Mi", "512M", "0.5g", 512 * MIB):
+            self.assertEqual(parse_memory(value), 512 * MIB, value)
+
+    def test_parse_memory_invalid(self):
+        for value in ("512 megabytes", "m512", "", "1.5.1g"):
+            with self.assertRaises(ValueError):
+                parse_memory(value)
+
+    def test_format_memory(self):
+        self.assertEqual(format_memory(2 * GIB), "2g")
+        self.assertEqual(format_memory(1536 * MIB), "1536m")
+        self.assertEqual(format_memory(1000), "1k")
+
+    def test_parse_quantity(self):
+        self.assertEqual(parse_quantity("500m"), 0.5)
+        self.assertEqual(parse_quantity("10Gi"), 10 * GIB)
+        self.assertEqual(parse_quantity("1G"), 1e9)
+        self.assertEqual(parse_quantity(4), 4.0)
+
+    def test_normalize_quantities(self):
+        manifest = {
+            "spec": {
+                "driver": {"memory": "2Gi"},
+                "executor": {"memory": "1.5g", "memoryOverhead": "512mb"},
+            },
+        }
+
+        normalize_quantities(manifest)
+
+        self.assertEqual(manifest["spec"]["driver"]["memory"], "2g")
+        self.assertEqual(manifest["spec"]["executor"]["memory"], "1536m")
+        self.assertEqual(manifest["spec"]["executor"]["memoryOverhead"], "512m")
+
+    def test_normalize_invalid_memory(self):
+        with self.assertRaisesRegex(ValueError, "spec.executor.memory"):
+            normalize_quantities({"spec": {"executor": {"memory": "lots"}}})
+
+
+class TestValidateManifest(unittest.TestCase):
+    def test_default_manifest_is_valid(self):
+        validate_manifest(make_manifest())
+
+    def test_typo_in_executor(self):
+        manifest = make_manifest()
+        manifest["spec"]["executor"]["instance"] = 2
+
+        with self.assertRaises(ManifestValidationError) as error:
+            validate_manifest(manifest)
+
+        self.assertEqual(len(error.exception.errors), 1)
+        self.assertIn("spec.executor", error.exception.errors[0])
+        self.assertIn("instance", error.exception.errors[0])
+
+    def test_all_errors_are_reported(self):
+        manifest = make_manifest()
+        del manifest["spec"]["mainApplicationFile"]
+        manifest["spec"]["driver"]["cores"] = 0
+
+        with self.assertRaises(ManifestValidationError) as error:
+            validate_manifest(manifest)
+
+        self.assertEqual(len(error.exception.errors), 2)
+        self.assertIn("mainApplicationFile", str(error.exception))
+
+
+class TestResources(unittest.TestCase):
+    def test_requested_resources(self):
+        manifest = {
+            "spec": {
+                "type": "Python",
+                "driver": {"cores": 1, "memory": "1g"},
+                "executor": {"cores": 2, "memory": "2g", "memoryOverhead": "1g"},
+            },
+        }
+
+        requested = requested_resources(manifest, executors=3)
+
+        # python overhead of the driver is 0.4 of its memory
+        self.assertEqual(requested.cpu, 1 + 2 * 3)
+        self.assertEqual(requested.memory, int(1.4 * GIB) + 3 * 3 * GIB)
+
+    def test_minimal_overhead(self):
+        manifest = {
+            "spec": {
+                "type": "Scala",
+                "driver": {"cores": 1, "memory": "512m"},
+                "executor": {"cores": 1, "memory": "512m"},
+            },
+        }
+
+        requested = requested_resources(manifest, executors=1)
+
+        self.assertEqual(requested.memory, 2 * (512 + 384) * MIB)
+
+    def test_heap_memory(self):
+        manifest = {
+            "spec": {
+                "type": "Python",
+                "driver": {"memory": "4g"},
+                "executor": {"memory": "512m", "memoryOverhead": "1g"},
+            },
+        }
+
+        for role in ("driver", "executor"):
+            pod_memory = pod_resources(manifest, role).memory
+            self.assertEqual(
+                heap_memory(manifest, role, pod_memory),
+                parse_memory(manifest["spec"][role]["memory"]),
+                role,
+            )
+        # the minimal overhead doesn't fit
+        self.assertEqual(heap_memory(manifest, "driver", 256 * MIB), 0)
+
+    def test_check_quota(self):
+        check_quota(Resources(4, 8 * GIB), Resources(4, 8 * GIB))
+
+        with self.assertRaisesRegex(QuotaExceededError, "memory 9g > 8g"):
+            check_quota(Resources(4, 9 * GIB), Resources(8, 8 * GIB))
+
+        # memory of the namespace quota
+        with self.assertRaisesRegex(QuotaExceededError, "memory 20g > 10g$"):
+            check_quota(
+                Resources(4, 20 * GIB),
+                Resources(8, parse_quantity("10Gi")),
+            )
+
+
+class TestSparkApplicationValidate(unittest.TestCase):
+    def test_validate(self):
+        application = SparkApplicationV1.default()
+        application.patch(
+            {
+                "metadata": {"name": "spark-app", "namespace": "spark"},
+                "spec": {
+                    "mainApplicationFile": "s3a://spark/scripts/app.py",
+                    "executor": {"memory": "1Gi"},
+                },
+            },
+        )
+
+        requested = application.validate(quota=Resources(8, 16 * GIB))
+
+        self.assertEqual(application.manifest["spec"]["executor"]["memory"], "1g")
+        self.assertEqual(requested.cpu, 2)
+
+    def test_validate_quota_exceeded(self):
+        application = SparkApplicationV1.default()
+        application.patch(
+            {
+                "metadata": {"name": "spark-app", "namespace": "spark"},
+                "spec": {"mainApplicationFile": "s3a://spark/scripts/app.py"},
+            },
+        )
+
+        with self.assertRaisesRegex(QuotaExceededError, "cpu 2 > 1"):
+            application.validate(quota=Resources(1, 16 * GIB))
@@ -0,0 +1,40 @@
+import unittest
+from unittest.mock import patch, Mock
+
+from kubeutils.watch import KubeWatch
+
+
+class TestKubeWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.watch = KubeWatch()
+
+    @patch("kubernetes.watch.Watch")
+    def test_stream_passes_return_type_and_kwargs(self, mocked_watch):
+        mocked_watch.return_value.stream.return_value = iter([{"type": "ADDED"}])
+        func = Mock()
+
+        result = list(
+            self.watch.stream(func, return_type="V1Pod", namespace="default"),
+        )
+
+        self.assertEqual(result, [{"type": "ADDED"}])
+        mocked_watch.assert_called_once_with(return_type="V1Pod")
+        mocked_watch.return_value.stream.assert_called_once_with(
+            func,
+            namespace="default",
+        )
+
+    @patch("kubernetes.watch.Watch")
+    def test_stop_stops_active_streams(self, mocked_watch):
+        mocked_watch.return_value.stream.return_value = iter([{}, {}])
+
+        stream = self.watch.stream(Mock())
+        next(stream)
+        self.watch.stop()
+
+        mocked_watch.return_value.stop.assert_called_once()
+
+        # finished streams are forgotten
+        list(stream)
+        self.watch.stop()
+        mocked_watch.return_value.stop.assert_called_once()
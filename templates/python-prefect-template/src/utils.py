@@ -17,3 +17,5 @@ kutils = KubeutilsV1.new(
     api=KubeApiV1(),
     watch=KubeWatch(),
 )
+# секреты хранятся в памяти между запусками flow в одном процессе
+kutils.enable_secret_cache()
@@ -25,6 +25,21 @@ SPARK_APP_SCRIPT_NAME_BODY = "spark_application"
 SPARK_APP_BASED_NAME = f"{DEPLOYMENT_NAME}"
 SPARK_APP_PATH = "/opt/prefect/src/application"
 SPARK_APP_CONFIG_PATH = "/opt/prefect/src/manifests"
+## driver + executors resources are checked against the namespace ResourceQuota
+## before submission, False skips the check (manifest is validated anyway)
+SPARK_APP_CHECK_QUOTA = True
+## peak usage of runs is kept in the history, with AUTO_TUNE the manifest
+## resources are replaced by the ones suggested from the latest runs
+## flow-run pods are ephemeral: without a volume mounted at the history path
+## every run starts with an empty history, it never reaches min_runs (3)
+## and AUTO_TUNE changes nothing
+SPARK_APP_HISTORY_PATH = os.getenv(
+    "SPARK_APP_HISTORY_PATH",
+    "/opt/prefect/spark_history.sqlite",
+)
+SPARK_APP_AUTO_TUNE = False
+SPARK_APP_SLA_S = None  # executors are not reduced if a run took longer
+SPARK_APP_SAMPLE_INTERVAL_S = 15
 ## env vars that can be passed directly
 SPARK_APP_ENV_VARS = [
     {"name": "FLOW_NAME", "value": FLOW_NAME},
@@ -36,7 +51,13 @@ SPARK_APP_ENV_FROM_VARS = [
 ]
 
 # OTHER
-LOG_LEVELS = ["WARNING", "ERROR"]  # INFO | WARNING | ERROR
+## levels of the driver log: the log4j level field, or a level word in other lines
+## (python print/logging, custom log4j layouts), WARN also matches WARNING
+LOG_LEVELS = ["WARN", "ERROR"]  # INFO | WARN | ERROR
+LOG_CONTEXT_LINES = 3  # lines printed around every matched line
+LOG_RECONNECTS = 5  # resume pod log stream after connection drops
+## prometheus /metrics of the flow process (API requests, pod phases), 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
 ## kubernetes secrets uploaded to prefect job environment
 KUBE_SECRETS = {
     "prefect": {
@@ -49,6 +70,14 @@ KUBE_SECRETS = {
     },
 }
 
+# S3 UPLOADS
+## files larger than the threshold are uploaded by parts in parallel
+S3_MULTIPART_THRESHOLD_MB = 16
+S3_MULTIPART_CHUNKSIZE_MB = 16
+S3_MAX_CONCURRENCY = 8
+## helper packages of src/application, the key is the sha256 of the zip
+S3_DEPS_PREFIX = "spark/deps"
+
 # S3 Persisting
 S3_BLOCK_NAME = "yandex-object-storage"
 S3_BLOCK = S3Bucket.load(S3_BLOCK_NAME)
@@ -3,17 +3,29 @@ Based flow file
 """
 
 import os
+import tempfile
+
+from kubeutils.application import SparkApplicationV1
+from kubeutils.bundle import build_bundle
 from prefect import flow, get_run_logger, task
+from prefect.artifacts import create_table_artifact
 
 import src.config as config
 from src.utils import (
+    application_patch,
     generate_task_name,
     get_object_name,
+    get_run_history,
+    get_s3_uploader,
     extract_postfix_from_apllication_script_name,
     make_application_name_k8s_compatible,
     kutils,
-    s3_client,
-    spark_app,
+    log_filter,
+    order_application_scripts,
+    phase_timings,
+    record_run,
+    resolve_application_scripts,
+    serve_metrics,
 )
 
 
@@ -22,18 +34,53 @@ def upload_script_to_s3(
     application_script_name: str,
 ) -> None:
     """
-    Загружает скрипт в yandex object storage
+    Загружает скрипт в yandex object storage, если содержимое скрипта изменилось
 
     application_name:str - имя скрипта в src/application/
     """
     script_path = f"{config.SPARK_APP_PATH}/{application_script_name}"
     object_name = get_object_name(application_script_name)
+    s3_uploader = get_s3_uploader()
 
-    s3_client.upload_file(
+    uploaded = s3_uploader.upload(
         script_path,
         os.getenv("S3_BUCKET_NAME"),
         f"spark/scripts/{object_name}",
     )
+    kutils.logger.info(
+        f"{application_script_name} {'uploaded' if uploaded else 'is up to date'}, "
+        f"upload cache hit rate {s3_uploader.hit_rate:.0%}",
+    )
+
+
+@task
+def bundle_dependencies() -> str | None:
+    """
+    Собирает пакеты из src/application в zip и загружает его в yandex object storage.
+
+    Архив детерминированный, поэтому ключ по sha256 архива меняется только вместе с кодом пакетов \
+        и архив загружается один раз на версию кода, а не на каждый запуск.
+
+    Returns:
+        str | None: s3a путь к архиву для spec.deps.pyFiles или None, если пакетов нет.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bundle_path = os.path.join(tmp_dir, "deps.zip")
+        sha256 = build_bundle(config.SPARK_APP_PATH, bundle_path)
+        if sha256 is None:
+            kutils.logger.info("No helper packages to bundle.")
+            return None
+
+        key = f"{config.S3_DEPS_PREFIX}/{sha256}.zip"
+        uploaded = get_s3_uploader().upload(
+            bundle_path,
+            os.getenv("S3_BUCKET_NAME"),
+            key,
+        )
+    kutils.logger.info(
+        f"dependencies bundle {key} {'uploaded' if uploaded else 'is up to date'}",
+    )
+    return f"s3a://{key}"
 
 
 @task
@@ -43,6 +90,8 @@ def create_spark_application(
     application_manifest_name: str | None,
     based_manifest_name: str | None,
     application_name: str,
+    env_vars: list[dict[str, str]],
+    py_files: list[str] | None = None,
 ) -> None:
     """
     Creates and deploys a Spark application on Kubernetes using the specified application
@@ -58,55 +107,58 @@ def create_spark_application(
         based_manifest_name (str | None): The name of the base manifest for merging.
         application_name (str): The name of the Spark application.
         env_vars (list[dict[str, str]]): A list of environment variables for the application.
+        py_files (list[str] | None): s3a paths of zips added to PYTHONPATH of the application.
 
     Returns:
         None
     """
     object_name = get_object_name(application_script_name)
-    app = spark_app
 
     if application_manifest_name:
         kutils.logger.info("Use custom manifest.")
-        if based_manifest_name:
-            app.merge_and_update_manifest(
-                f"{config.SPARK_APP_CONFIG_PATH}/{application_manifest_name}",
-                f"{config.SPARK_APP_CONFIG_PATH}/{based_manifest_name}",
-            )
-        app.download_manifest(
-            f"{config.SPARK_APP_CONFIG_PATH}/{application_manifest_name}",
-        )
+        manifest_paths = [
+            f"{config.SPARK_APP_CONFIG_PATH}/{name}"
+            for name in (based_manifest_name, application_manifest_name)
+            if name
+        ]
+        # manifests are parsed and merged once per content, every application gets a copy
+        app = SparkApplicationV1.from_template(*manifest_paths)
     else:
         kutils.logger.info("Use default manifest.")
-        app = spark_app.default()
-    app.define_script_path(f"s3a://spark/scripts/{object_name}")
-    app.define_hadoop_manifest(
-        {
-            "fs.s3a.access.key": f'{os.getenv("S3_ACCESS_KEY")}',
-            "fs.s3a.secret.key": f'{os.getenv("S3_SECRET_KEY")}',
-            "fs.s3a.endpoint": f'{os.getenv("S3_ENDPOINT_URL")}/{os.getenv("S3_BUCKET_NAME")}',
-            "fs.s3a.connection.ssl.enabled": "true",
-            "fs.s3a.path.style.access": "true",
-        },
+        app = SparkApplicationV1.default()
+
+    if config.SPARK_APP_AUTO_TUNE:
+        # before NUM_EXECUTORS is taken from the manifest
+        tuned = app.auto_tune(
+            get_run_history(),
+            config.DEPLOYMENT_NAME,
+            application_script_name,
+            sla_s=config.SPARK_APP_SLA_S,
+        )
+        kutils.logger.info(f"Auto-tuned resources: {tuned}.")
+
+    app.patch(
+        application_patch(
+            application_name,
+            application_namespace,
+            object_name,
+            env_vars,
+            app.get_executor_num,
+        ),
     )
-    app.define_app_name(application_name)
-    app.define_app_name(application_name)
-    app.define_namespace(application_namespace)
-    # Env vars here
-    app.define_container_env_from(
-        config.SPARK_APP_ENV_FROM_VARS,
+    if py_files:
+        app.define_py_files(py_files)
+
+    # invalid manifests and quota overruns fail here instead of waiting for a driver pod
+    quota = (
+        kutils.get_namespace_quota(application_namespace)
+        if config.SPARK_APP_CHECK_QUOTA
+        else None
     )
-    app.define_container_env(
-        [
-            *config.SPARK_APP_ENV_VARS,
-            {
-                "name": "DATE",
-                "value": config.CURRENT_MSK_DATE,
-            },
-            {
-                "name": "NUM_EXECUTORS",
-                "value": str(app.get_executor_num),
-            },
-        ],
+    requested = app.validate(quota=quota)
+    kutils.logger.info(
+        f"{application_name} requests {requested.cpu:g} cores "
+        f"and {requested.memory / 1024**3:.1f}Gi of memory",
     )
 
     kutils.create_namespaced_custom_object(
@@ -124,14 +176,15 @@ def monitor_spark_application(
     application_name: str,
     running_timeout_s: int,
     pending_timeout_s: int,
+    application_script_name: str,
 ) -> None:
     """
     Monitors a Spark application running on Kubernetes by streaming its pod logs.
 
     This task retrieves the pod name of the Spark application using the specified
-    namespace and application name, then continuously streams the pod logs while
-    the application is running. It also handles timeouts for both running and
-    pending states.
+    namespace and application name, then continuously streams the driver and
+    executors logs while the application is running. It also handles timeouts
+    for both running and pending states.
 
     Args:
         application_namespace (str): \
@@ -141,24 +194,68 @@ def monitor_spark_application(
             The timeout in seconds for the application to be in a running state.
         pending_timeout_s (int): \
             The timeout in seconds for the application to be in a pending state.
+        application_script_name (str): \
+            The name of the application script, the run is recorded to the run history under it.
     """
-    selector = "spark-role=driver,sparkoperator.k8s.io/app-name"
-    label_selector = f"{selector}={application_name}"
+    selector = "sparkoperator.k8s.io/app-name"
+    application_selector = f"{selector}={application_name}"
 
-    pod_name = kutils.get_pod_name(
-        namespace=application_namespace,
-        label_selector=label_selector,
-    )
-
-    for log in kutils.while_running(
-        func=kutils.stream_pod_log,
-        pending_timeout_s=pending_timeout_s,
-        pod_name=pod_name,
-        namespace=application_namespace,
-        timeout_s=running_timeout_s,
+    # peak usage of the pods is recorded to the run history, failed runs too
+    with record_run(
+        application_namespace,
+        application_selector,
+        application_script_name,
     ):
-        if any(exceptions in log for exceptions in config.LOG_LEVELS):
-            print(log)
+        # submission failures are raised here, before any driver pod exists
+        kutils.wait_for_application(
+            application_name,
+            application_namespace,
+            timeout_s=pending_timeout_s,
+            until=("RUNNING",),
+        )
+
+        # one shared pod cache for all applications monitored by this worker process
+        with kutils.use_informer(application_namespace, label_selector=selector):
+            driver_selector = f"spark-role=driver,{application_selector}"
+            pod_name = kutils.get_pod_name(
+                namespace=application_namespace,
+                label_selector=driver_selector,
+            )
+
+            try:
+                # driver and executors logs, executors are attached as they start
+                logs = kutils.while_running(
+                    func=kutils.stream_pods_logs,
+                    pending_timeout_s=pending_timeout_s,
+                    pod_name=pod_name,
+                    namespace=application_namespace,
+                    label_selector=application_selector,
+                    timeout_s=running_timeout_s,
+                    max_reconnects=config.LOG_RECONNECTS,
+                    # lines are decoded only if they pass the filter
+                    decode=False,
+                )
+                # None if the application has finished before its logs were followed
+                for pod, log in log_filter.filter_sources(logs or ()):
+                    print(f"{pod}: {log.decode('utf-8', 'replace')}")
+            finally:
+                # where the time went, failed runs too
+                create_table_artifact(
+                    key=f"{application_name}-phases",
+                    table=phase_timings(
+                        application_namespace,
+                        driver_selector,
+                        pod_name,
+                    ),
+                    description=f"Driver pod phases of {application_name}",
+                )
+
+        # raises ChildProcessError if the application has failed
+        kutils.wait_for_application(
+            application_name,
+            application_namespace,
+            timeout_s=running_timeout_s,
+        )
 
 
 @task(
@@ -177,6 +274,7 @@ def create_and_monitor_spark_application(
     based_manifest_name: str | None,
     running_timeout_s: int,
     pending_timeout_s: int,
+    py_files: list[str] | None = None,
 ) -> str:
     """
     Creates and monitors a Spark application on Kubernetes.
@@ -194,12 +292,11 @@ def create_and_monitor_spark_application(
         based_manifest_name (str | None): The name of the base manifest for merging.
         running_timeout_s (int): Timeout in seconds for the application to be in a running state.
         pending_timeout_s (int): Timeout in seconds for the application to be in a pending state.
-        env_vars (list[dict[str, str]]): A list of environment variables for the application.
+        py_files (list[str] | None): s3a paths of zips added to PYTHONPATH of the application.
 
     Returns:
         str: A success message indicating the task completion.
     """
-    env_vars = config.SPARK_APP_ENV_VARS
     postfix = extract_postfix_from_apllication_script_name(
         application_script_name,
         config.SPARK_APP_SCRIPT_NAME_BODY,
@@ -208,9 +305,11 @@ def create_and_monitor_spark_application(
     if postfix:
         app_specific_name = f"{config.SPARK_APP_NAME_K8S}-{postfix}"
     logger_name = app_specific_name.title().replace("-", "")  # To Camel Case
-    env_vars.append(
+    # a copy, config list is shared by applications of the flow run
+    env_vars = [
+        *config.SPARK_APP_ENV_VARS,
         {"name": "LOGGER_NAME", "value": logger_name},
-    )
+    ]
     task_name_addition = f"_{postfix}" if postfix else ""
     application_name_valid = make_application_name_k8s_compatible(
         base_name=config.SPARK_APP_BASED_NAME,
@@ -225,6 +324,8 @@ def create_and_monitor_spark_application(
         application_manifest_name,
         based_manifest_name,
         application_name_valid,
+        env_vars,
+        py_files,
     )
     monitor_spark_application.with_options(
         task_run_name=f"monitor_spark_application{task_name_addition}",
@@ -233,6 +334,7 @@ def create_and_monitor_spark_application(
         application_name_valid,
         running_timeout_s,
         pending_timeout_s,
+        application_script_name,
     )
     return "Success"  # To persist result
 
@@ -243,7 +345,7 @@ def create_and_monitor_spark_application(
 )
 def spark_kubernetes_flow(
     # Scripts
-    application_script_name: str,
+    application_script_name: str | list[str],
     application_namespace: str,
     # Manifests
     based_manifest_name: str | None,
@@ -251,30 +353,63 @@ def spark_kubernetes_flow(
     # Additional params
     running_timeout_s: int,
     pending_timeout_s: int,
+    application_dependencies: dict[str, list[str]] | None = None,
 ) -> None:
     """
-    Executes a flow to deploy and monitor a Spark application on Kubernetes.
+    Executes a flow to deploy and monitor Spark applications on Kubernetes.
 
-    This flow handles the uploading of the application script to S3, and the
-    creation and monitoring of the Spark application using Kubernetes. It
-    configures environment variables and manages the flow execution with
-    logging enabled.
+    This flow handles the uploading of the application scripts to S3, and the
+    creation and monitoring of the Spark applications using Kubernetes. Scripts
+    are uploaded and applications are submitted concurrently, an application
+    waits only for its own script and the applications it depends on. All
+    applications are monitored through one shared pod informer.
 
     Args:
-        application_script_name (str): The name of the application script.
+        application_script_name (str | list[str]): The name of the application script, \
+            a glob over src/application (f.e. `spark_application_*.py`) or a list of them.
         application_namespace (str): The Kubernetes namespace for the application.
         based_manifest_name (str | None): The name of the base manifest for merging.
         application_manifest_name (str | None): The name of the custom application manifest.
         running_timeout_s (int): Timeout in seconds for the application to be in a running state.
         pending_timeout_s (int): Timeout in seconds for the application to be in a pending state.
+        application_dependencies (dict[str, list[str]] | None): \
+            Script name -> scripts whose applications have to succeed before it.
     """
+    serve_metrics()
     kutils.logger = get_run_logger()
-    upload_script_to_s3(application_script_name)
-    create_and_monitor_spark_application(
-        application_script_name=application_script_name,
-        application_manifest_name=application_manifest_name,
-        based_manifest_name=based_manifest_name,
-        application_namespace=application_namespace,
-        running_timeout_s=running_timeout_s,
-        pending_timeout_s=pending_timeout_s,
+    scripts = order_application_scripts(
+        resolve_application_scripts(application_script_name),
+        application_dependencies,
     )
+    dependencies = application_dependencies or {}
+
+    uploads = {script: upload_script_to_s3.submit(script) for script in scripts}
+    # one bundle of helper packages for all applications of the run
+    bundle = bundle_dependencies()
+    py_files = [bundle] if bundle else None
+    applications = {}
+    # the same informer is acquired by every monitor task, so it is kept
+    # alive for the whole flow run instead of one per application
+    with kutils.use_informer(
+        application_namespace,
+        label_selector="sparkoperator.k8s.io/app-name",
+    ):
+        for script in scripts:
+            applications[script] = create_and_monitor_spark_application.submit(
+                application_script_name=script,
+                application_manifest_name=application_manifest_name,
+                based_manifest_name=based_manifest_name,
+                application_namespace=application_namespace,
+                running_timeout_s=running_timeout_s,
+                pending_timeout_s=pending_timeout_s,
+                py_files=py_files,
+                wait_for=[
+                    uploads[script],
+                    *(
+                        applications[upstream]
+                        for upstream in dependencies.get(script, [])
+                    ),
+                ],
+            )
+        for application in applications.values():
+            application.wait()
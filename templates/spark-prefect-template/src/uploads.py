@@ -0,0 +1,96 @@
+"""
+Content-addressed uploads to S3
+"""
+
+import hashlib
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+
+# object metadata key with the sha256 of the uploaded file
+CONTENT_HASH_KEY = "sha256"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """
+    Hashes a file by blocks, so large archives are not read into memory.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        str: Hex sha256 of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ContentAddressedUploader:
+    """
+    Uploads files to S3 only if the object has different content.
+
+    The sha256 of the file is kept in the object metadata and compared with one HEAD request. \
+        ETag is not used: it is not the md5 of the content for multipart uploads.
+
+    Attributes:
+        s3_client: boto3 S3 client.
+        transfer_config (TransferConfig): multipart threshold, part size and parallel parts.
+        hits (int): uploads skipped because S3 had the same content.
+        uploads (int): files uploaded.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        transfer_config: TransferConfig | None = None,
+    ) -> None:
+        self.s3_client = s3_client
+        self.transfer_config = transfer_config or TransferConfig()
+        self.hits = 0
+        self.uploads = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.uploads
+        return self.hits / total if total else 0.0
+
+    def remote_sha256(self, bucket: str, key: str) -> str | None:
+        "Returns the content hash of the object or None if there is no object or hash."
+        try:
+            head = self.s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return head.get("Metadata", {}).get(CONTENT_HASH_KEY)
+
+    def upload(self, path: str, bucket: str, key: str) -> bool:
+        """
+        Uploads the file unless the object already has the same content.
+
+        Args:
+            path: The path of the local file.
+            bucket: The S3 bucket.
+            key: The object key.
+
+        Returns:
+            bool: True if the file was uploaded, False if the upload was skipped.
+        """
+        sha256 = file_sha256(path)
+        if self.remote_sha256(bucket, key) == sha256:
+            self.hits += 1
+            return False
+
+        self.s3_client.upload_file(
+            path,
+            bucket,
+            key,
+            ExtraArgs={"Metadata": {CONTENT_HASH_KEY: sha256}},
+            Config=self.transfer_config,
+        )
+        self.uploads += 1
+        return True
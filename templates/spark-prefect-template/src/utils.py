@@ -2,37 +2,219 @@
 Utils for flow run
 """
 
+import contextlib
+import datetime
+import functools
+import glob
+import graphlib
 import logging
 import hashlib
 import os
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from kubeutils.api import KubeApiV1
+from kubeutils.history import RunHistory
 from kubeutils.kube import KubeutilsV1
+from kubeutils.logfilter import LogFilter
+from kubeutils.metrics import PrometheusExporter
+from kubeutils.watch import KubeWatch
 from prefect.runtime import task_run
-from kubeutils.application import SparkApplicationV1
 
 import src.config as config
+from src.uploads import ContentAddressedUploader
 
 
 # initialization
 logger = logging.Logger(__name__)
-kutils = KubeutilsV1.new(
+# API requests and pod phases, phase timings are attached to flow runs as artifacts
+exporter = PrometheusExporter()
+
+
+@functools.cache
+def serve_metrics() -> None:
+    "Serves /metrics of the exporter once per process if METRICS_PORT is set."
+    if config.METRICS_PORT:
+        exporter.serve(config.METRICS_PORT)
+
+
+def setup_kutils(kutils: KubeutilsV1) -> None:
+    """
+    Called on the first use of kutils, not at import of the flow module.
+
+    Called again with a new instance if it raised (f.e. secrets download failed), \
+        so it can be repeated.
+    """
+    kutils.enable_metrics(exporter)
+    # secrets are kept in memory between flow runs of the worker process
+    kutils.enable_secret_cache()
+    # download secrets to env
+    kutils.download_secrets(config.KUBE_SECRETS, to_env=True)
+
+
+# kube config is loaded and secrets are downloaded on first use,
+# so importing flows (f.e. by Prefect to read parameters) doesn't touch the cluster
+kutils = KubeutilsV1.lazy(
     logger=logger,
     api=KubeApiV1(),
+    watch=KubeWatch(),
+    setup=setup_kutils,
 )
-# download secrets to env
-kutils.download_secrets(config.KUBE_SECRETS, to_env=True)
-
-# initialize all other secondary flow dependences
-s3_client = boto3.client(
-    "s3",
-    endpoint_url=os.getenv("S3_ENDPOINT_URL"),
-    aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
-    aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+
+
+@functools.cache
+def get_s3_uploader() -> ContentAddressedUploader:
+    """
+    S3 uploader of the flow process, created on first use.
+
+    The credentials are read from env, so the secrets are downloaded first.
+    """
+    kutils.load()
+    s3_client = boto3.client(
+        "s3",
+        endpoint_url=os.getenv("S3_ENDPOINT_URL"),
+        aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
+        aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+    )
+    # skips uploads of files which are already in s3
+    return ContentAddressedUploader(
+        s3_client,
+        TransferConfig(
+            multipart_threshold=config.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=config.S3_MULTIPART_CHUNKSIZE_MB * 1024 * 1024,
+            max_concurrency=config.S3_MAX_CONCURRENCY,
+        ),
+    )
+
+
+log_filter = LogFilter(
+    levels=config.LOG_LEVELS,
+    context=config.LOG_CONTEXT_LINES,
 )
 
-spark_app = SparkApplicationV1()
+
+@functools.cache
+def get_run_history() -> RunHistory:
+    """
+    Peak usage of every run, source of the auto-tuned resources.
+
+    Opened on first use, so importing flows doesn't need the history volume.
+    """
+    return RunHistory(config.SPARK_APP_HISTORY_PATH)
+
+
+@contextlib.contextmanager
+def record_run(
+    namespace: str,
+    label_selector: str,
+    application_script_name: str,
+):
+    """
+    Samples peak usage of the application pods and records the run to the history on exit.
+
+    The run is recorded as failed if the body raised.
+    """
+    succeeded = False
+    with kutils.sample_resources(
+        namespace,
+        label_selector,
+        interval_s=config.SPARK_APP_SAMPLE_INTERVAL_S,
+    ) as sampler:
+        try:
+            yield sampler
+            succeeded = True
+        finally:
+            get_run_history().record(
+                sampler.record(
+                    config.DEPLOYMENT_NAME,
+                    application_script_name,
+                    succeeded,
+                ),
+            )
+
+
+def phase_timings(namespace: str, label_selector: str, pod_name: str) -> list[dict]:
+    """
+    Phases of the driver pod recorded by kutils: allocating, pending and running.
+
+    Args:
+        namespace: The namespace of the pod.
+        label_selector: The selector the driver pod was looked up with.
+        pod_name: The name of the driver pod.
+
+    Returns:
+        list[dict]: Rows of the table artifact, in the order of the phases.
+    """
+    return [
+        {
+            "phase": span.name,
+            "started_at": datetime.datetime.fromtimestamp(
+                span.started_at,
+                datetime.timezone.utc,
+            ).isoformat(timespec="seconds"),
+            "duration_s": round(span.duration_s, 1),
+        }
+        for span in exporter.spans
+        if span.labels.get("namespace") == namespace
+        and (
+            span.labels.get("pod") == pod_name
+            or span.labels.get("label_selector") == label_selector
+        )
+    ]
+
+
+def application_patch(
+    application_name: str,
+    application_namespace: str,
+    object_name: str,
+    env_vars: list[dict[str, str]],
+    executor_num: int,
+) -> dict:
+    """
+    Patch of the application manifest applied by the flow to every application.
+
+    Args:
+        application_name: The name of the Spark application.
+        application_namespace: The Kubernetes namespace for the application.
+        object_name: The s3 object name of the application script.
+        env_vars: Environment variables of the driver and executors.
+        executor_num: Executor instances, passed to the application as NUM_EXECUTORS.
+
+    Returns:
+        dict: The patch for SparkApplicationV1.patch().
+    """
+    containers_env = {
+        "envFrom": config.SPARK_APP_ENV_FROM_VARS,
+        "env": [
+            *env_vars,
+            {
+                "name": "DATE",
+                "value": config.CURRENT_MSK_DATE,
+            },
+            {
+                "name": "NUM_EXECUTORS",
+                "value": str(executor_num),
+            },
+        ],
+    }
+    return {
+        "metadata": {
+            "name": application_name,
+            "namespace": application_namespace,
+        },
+        "spec": {
+            "mainApplicationFile": f"s3a://spark/scripts/{object_name}",
+            "hadoopConf": {
+                "fs.s3a.access.key": f'{os.getenv("S3_ACCESS_KEY")}',
+                "fs.s3a.secret.key": f'{os.getenv("S3_SECRET_KEY")}',
+                "fs.s3a.endpoint": f'{os.getenv("S3_ENDPOINT_URL")}/{os.getenv("S3_BUCKET_NAME")}',
+                "fs.s3a.connection.ssl.enabled": "true",
+                "fs.s3a.path.style.access": "true",
+            },
+            "driver": containers_env,
+            "executor": containers_env,
+        },
+    }
 
 
 def make_application_name_k8s_compatible(
@@ -154,3 +336,69 @@ def generate_task_name() -> str:
     if postfix:
         task_name = f"{task_name}_{postfix}"
     return task_name
+
+
+def resolve_application_scripts(
+    application_script_name: str | list[str],
+    scripts_path: str = config.SPARK_APP_PATH,
+) -> list[str]:
+    """
+    Resolves script names and glob patterns (f.e. `spark_application_*.py`) over the scripts directory.
+
+    Args:
+        application_script_name: The name of the script, a glob pattern or a list of them.
+        scripts_path: The directory of application scripts.
+
+    Returns:
+        list[str]: Unique script names in the order they were passed, globs are sorted.
+    """
+    names = (
+        [application_script_name]
+        if isinstance(application_script_name, str)
+        else application_script_name
+    )
+    scripts = []
+    for name in names:
+        if glob.has_magic(name):
+            found = sorted(
+                os.path.basename(path)
+                for path in glob.glob(os.path.join(scripts_path, name))
+            )
+            if not found:
+                raise FileNotFoundError(f"No application scripts match {name}.")
+        else:
+            found = [name]
+        scripts.extend(script for script in found if script not in scripts)
+    return scripts
+
+
+def order_application_scripts(
+    scripts: list[str],
+    dependencies: dict[str, list[str]] | None = None,
+) -> list[str]:
+    """
+    Orders scripts so that every script goes after the scripts it depends on.
+
+    Args:
+        scripts: The names of application scripts.
+        dependencies: Script name -> names of scripts that have to succeed before it.
+
+    Returns:
+        list[str]: Scripts in a topological order.
+    """
+    dependencies = dependencies or {}
+    unknown = {
+        name
+        for script, upstream in dependencies.items()
+        for name in (script, *upstream)
+    } - set(scripts)
+    if unknown:
+        raise ValueError(f"Dependencies of unknown scripts: {sorted(unknown)}.")
+
+    sorter = graphlib.TopologicalSorter({script: () for script in scripts})
+    for script, upstream in dependencies.items():
+        sorter.add(script, *upstream)
+    try:
+        return list(sorter.static_order())
+    except graphlib.CycleError as e:
+        raise ValueError(f"Scripts dependencies have a cycle: {e.args[1]}.") from e
@@ -1,4 +1,7 @@
+import pytest
+
 from src.flows.flow import make_application_name_k8s_compatible
+from src.utils import order_application_scripts, resolve_application_scripts
 
 
 class TestMakeApplicationNameK8sCompatible:
@@ -44,3 +47,42 @@ class TestMakeApplicationNameK8sCompatible:
 
         assert len(result) <= max_allowed_length
         assert result.startswith("a" * (63 - ui_postfix_len - hash_len - 1))
+
+
+class TestResolveApplicationScripts:
+    # Expands globs over the scripts directory and keeps names unique
+    def test_globs_and_names(self, tmp_path):
+        for name in ("spark_application_b.py", "spark_application_a.py", "other.py"):
+            (tmp_path / name).touch()
+
+        result = resolve_application_scripts(
+            ["spark_application_b.py", "spark_application_*.py"],
+            scripts_path=str(tmp_path),
+        )
+
+        assert result == ["spark_application_b.py", "spark_application_a.py"]
+
+    def test_glob_without_scripts(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            resolve_application_scripts("spark_application_*.py", str(tmp_path))
+
+
+class TestOrderApplicationScripts:
+    # Dependencies go before their dependents
+    def test_dependencies_first(self):
+        result = order_application_scripts(
+            ["a.py", "b.py", "c.py"],
+            {"a.py": ["c.py"], "b.py": ["a.py"]},
+        )
+
+        assert result == ["c.py", "a.py", "b.py"]
+
+    def test_cycle(self):
+        with pytest.raises(ValueError):
+            order_application_scripts(
+                ["a.py", "b.py"], {"a.py": ["b.py"], "b.py": ["a.py"]}
+            )
+
+    def test_unknown_script(self):
+        with pytest.raises(ValueError):
+            order_application_scripts(["a.py"], {"a.py": ["x.py"]})
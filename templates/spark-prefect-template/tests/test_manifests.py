@@ -0,0 +1,47 @@
+import os
+
+import pytest
+from kubeutils.application import SparkApplicationV1
+
+import src.config as config
+from src.utils import application_patch
+
+MANIFESTS_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "manifests")
+
+
+def patched(app: SparkApplicationV1) -> SparkApplicationV1:
+    app.patch(
+        application_patch(
+            "spark-app-a1b2c3",
+            "spark",
+            "pool/deployment/spark_application.py",
+            config.SPARK_APP_ENV_VARS,
+            app.get_executor_num,
+        ),
+    )
+    return app
+
+
+class TestShippedManifests:
+    # The kubeutils default manifest, used without application_manifest_name
+    def test_default_manifest_is_valid(self):
+        requested = patched(SparkApplicationV1.default()).validate()
+
+        assert requested.cpu > 0
+
+    # Every base manifest of src/manifests, merged with an application manifest like in the flow
+    @pytest.mark.parametrize(
+        "based_manifest_name",
+        [name for name in os.listdir(MANIFESTS_PATH) if name.endswith(".yaml")],
+    )
+    def test_based_manifest_is_valid(self, based_manifest_name, tmp_path):
+        app_manifest_path = tmp_path / "app.yaml"
+        app_manifest_path.write_text("spec:\n  executor:\n    instances: 2\n")
+
+        app = SparkApplicationV1.from_template(
+            os.path.join(MANIFESTS_PATH, based_manifest_name),
+            str(app_manifest_path),
+        )
+        requested = patched(app).validate()
+
+        assert requested.cpu > 0
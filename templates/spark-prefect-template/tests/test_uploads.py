@@ -0,0 +1,80 @@
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from moto import mock_aws
+
+from src.uploads import CONTENT_HASH_KEY, ContentAddressedUploader, file_sha256
+
+BUCKET = "spark-bucket"
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "spark_application.py"
+    path.write_text("print('spark')\n")
+    return path
+
+
+class TestContentAddressedUploader:
+    # Uploads once and skips the same content on the next runs
+    def test_skips_same_content(self, s3_client, script):
+        uploader = ContentAddressedUploader(s3_client)
+
+        assert uploader.upload(str(script), BUCKET, "scripts/app.py")
+        assert not uploader.upload(str(script), BUCKET, "scripts/app.py")
+        assert not uploader.upload(str(script), BUCKET, "scripts/app.py")
+
+        head = s3_client.head_object(Bucket=BUCKET, Key="scripts/app.py")
+        assert head["Metadata"][CONTENT_HASH_KEY] == file_sha256(str(script))
+        assert (uploader.uploads, uploader.hits) == (1, 2)
+        assert uploader.hit_rate == pytest.approx(2 / 3)
+
+    # Changed content is uploaded again
+    def test_uploads_changed_content(self, s3_client, script):
+        uploader = ContentAddressedUploader(s3_client)
+        uploader.upload(str(script), BUCKET, "scripts/app.py")
+
+        script.write_text("print('changed')\n")
+
+        assert uploader.upload(str(script), BUCKET, "scripts/app.py")
+        body = s3_client.get_object(Bucket=BUCKET, Key="scripts/app.py")["Body"]
+        assert body.read() == b"print('changed')\n"
+
+    # Objects uploaded without the hash are replaced once
+    def test_object_without_hash(self, s3_client, script):
+        s3_client.put_object(Bucket=BUCKET, Key="scripts/app.py", Body=b"old")
+        uploader = ContentAddressedUploader(s3_client)
+
+        assert uploader.upload(str(script), BUCKET, "scripts/app.py")
+        assert not uploader.upload(str(script), BUCKET, "scripts/app.py")
+
+    # Large archives go by parts and keep the hash
+    def test_multipart_upload(self, s3_client, tmp_path):
+        archive = tmp_path / "deps.zip"
+        archive.write_bytes(b"0123456789abcdef" * 700_000)
+        uploader = ContentAddressedUploader(
+            s3_client,
+            TransferConfig(
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=5 * 1024 * 1024,
+                max_concurrency=4,
+            ),
+        )
+
+        assert uploader.upload(str(archive), BUCKET, "deps/deps.zip")
+
+        head = s3_client.head_object(Bucket=BUCKET, Key="deps/deps.zip")
+        # multipart etag is not md5 of the content, the hash is in metadata
+        assert "-" in head["ETag"]
+        assert not uploader.upload(str(archive), BUCKET, "deps/deps.zip")
+
+    def test_hit_rate_without_uploads(self, s3_client):
+        assert ContentAddressedUploader(s3_client).hit_rate == 0.0